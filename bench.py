@@ -0,0 +1,305 @@
+import argparse
+import concurrent.futures
+import copy
+import io
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+import gen
+
+# benchmark harness for gen.py
+# every case runs in a fresh process, so peak rss is measured per case
+
+# every string the rule tables mention, names in here change how a node is generated
+def collect_rule_names(obj, names):
+    if isinstance(obj, str):
+        names.add(obj)
+    elif isinstance(obj, dict):
+        for key, value in obj.items():
+            collect_rule_names(key, names)
+            collect_rule_names(value, names)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for value in obj:
+            collect_rule_names(value, names)
+
+    return names
+
+# give every name the rule tables don't look up a suffix, references to renamed types get the same suffix
+# the suffix keeps prefixes intact, so enum constants still match the same prefix tables
+def rename_copy(obj, suffix, rule_names):
+    if isinstance(obj, list):
+        for value in obj:
+            rename_copy(value, suffix, rule_names)
+    elif isinstance(obj, dict):
+        name = obj.get("name")
+
+        if isinstance(name, str) and name != "" and name not in rule_names and gen.prefix_trim_oc(name) not in rule_names:
+            obj["name"] = name + suffix
+
+        for value in obj.values():
+            if isinstance(value, (dict, list)):
+                rename_copy(value, suffix, rule_names)
+
+# replicate every top-level module scale times, copies beyond the first get a fresh module name
+# names inside the copies get a suffix unless a rule table looks them up, so the copies take the same code path
+# as the originals but miss the name memos and walk the enum prefix trie like new names of a real api.json would
+def scale_api(api_desc, scale):
+    result = list(api_desc)
+    rule_names = collect_rule_names(gen.get_rule_tables(), set())
+
+    for index in range(1, scale):
+        for module in api_desc:
+            module_copy = copy.deepcopy(module)
+            rename_copy(module_copy["contents"], f"_x{index}", rule_names)
+            module_copy["name"] = f"{module['name']} x{index}"
+            result.append(module_copy)
+
+    return result
+
+# count every object node of the api description
+def count_nodes(obj):
+    if isinstance(obj, list):
+        return sum(count_nodes(child) for child in obj)
+
+    if isinstance(obj, dict):
+        return 1 + sum(count_nodes(value) for value in obj.values() if isinstance(value, (dict, list)))
+
+    return 0
+
+# resolution memos live for the whole process, clear them so each repeat starts cold
+def reset_memos():
+    gen.type_memo.clear()
+    gen.typename_index.clear()
+    gen.enum_name_memo.clear()
+
+# walk the built modules and collect the nodes each emitter renders
+def collect_nodes(module, nodes):
+    for node in module.contents:
+        if isinstance(node, gen.Module):
+            collect_nodes(node, nodes)
+        elif isinstance(node, gen.Struct):
+            nodes["gen_struct"].append(node)
+
+            for field in node.fields or ():
+                if isinstance(field.type, gen.Union):
+                    nodes["gen_union_fields"].append(field.type)
+        elif isinstance(node, gen.Enum):
+            nodes["gen_enum"].append(node)
+
+    nodes["gen_proc"].extend(module.procs)
+
+# emitters that are timed on their own, called with a node and the output list
+emitters = {
+    "gen_struct": lambda node, out: gen.gen_struct(node, out, 0, False),
+    "gen_enum": lambda node, out: gen.gen_enum(node, out, 0),
+    "gen_proc": lambda node, out: gen.gen_proc(node, True, out, 1),
+    "gen_union_fields": lambda node, out: gen.gen_union_fields(node, out, 1),
+}
+
+# full run like gen.py, parsing included but written into memory
+def generate(api_text):
+    odin_file = io.StringIO()
+    gen.write_package(odin_file, gen.get_native_imports(None))
+    gen.write_unicode_constants(odin_file)
+    gen.write_helpers(odin_file)
+    gen.gen_modules(gen.iter_api_module_texts(io.StringIO(api_text)), odin_file, None, 1)
+    return odin_file.getvalue()
+
+# best of repeats, each repeat starts with cold memos
+def time_best(func, repeats):
+    best = None
+
+    for _ in range(repeats):
+        reset_memos()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best
+
+# runs in its own process
+def run_case(api_path, scale, repeats):
+    with open(api_path, "r") as api_file:
+        api_desc = scale_api(json.load(api_file), scale)
+
+    api_text = json.dumps(api_desc)
+    node_count = count_nodes(api_desc)
+    result = {
+        "scale": scale,
+        "nodes": node_count,
+        "output_bytes": 0,
+        "emitters": {},
+    }
+
+    result["output_bytes"] = len(generate(api_text))
+    wall_time = time_best(lambda: generate(api_text), repeats)
+
+    reset_memos()
+    modules = [gen.build_module(module, None) for module in api_desc]
+
+    result["wall_time"] = wall_time
+    result["nodes_per_second"] = node_count / wall_time
+
+    nodes = {name: [] for name in emitters}
+    for module in modules:
+        collect_nodes(module, nodes)
+
+    for name, emitter in emitters.items():
+        emitter_nodes = nodes[name]
+
+        def render_all():
+            out = []
+            for node in emitter_nodes:
+                emitter(node, out)
+
+        result["emitters"][name] = {
+            "nodes": len(emitter_nodes),
+            "time": time_best(render_all, repeats),
+        }
+
+    # kilobytes on linux
+    result["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+# generate every api.json once, like gen.py --batch when batch is set, otherwise without sharing
+# runs in its own process, a single path without batch is one independent gen.py run
+def run_versions(api_paths, batch):
+    cache = None
+    if batch:
+        cache = gen.ModuleCache(None, None)
+
+    start = time.perf_counter()
+    output_bytes = 0
+
+    for api_path in api_paths:
+        odin_path = os.path.join(os.path.dirname(api_path), "orca.odin")
+        files = gen.generate_files(api_path, odin_path, cache, 1, False)
+        output_bytes += sum(len(text) for text in files.values())
+
+    result = {
+        "generate_time": time.perf_counter() - start,
+        "output_bytes": output_bytes,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+    if cache is not None:
+        result["modules_reused"] = cache.hits
+
+    return result
+
+# wall time includes starting the process and importing gen, which every separate gen.py run pays
+def run_process(api_paths, batch, context):
+    start = time.perf_counter()
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        result = executor.submit(run_versions, api_paths, batch).result()
+
+    result["wall_time"] = time.perf_counter() - start
+    return result
+
+# N independent runs in sequence against one batch run over the same api.json files
+def compare_versions(api_paths, context):
+    independent = [run_process([api_path], False, context) for api_path in api_paths]
+    batch = run_process(api_paths, True, context)
+
+    return {
+        "apis": api_paths,
+        "independent": {
+            "wall_time": sum(run["wall_time"] for run in independent),
+            "generate_time": sum(run["generate_time"] for run in independent),
+            "peak_rss_kb": max(run["peak_rss_kb"] for run in independent),
+            "output_bytes": sum(run["output_bytes"] for run in independent),
+        },
+        "batch": batch,
+    }
+
+# compare wall times against a stored baseline, returns the failed cases
+# differences below min_delta seconds are treated as noise
+def compare_baseline(results, baseline, tolerance, min_delta):
+    failures = []
+    baseline_cases = {case["scale"]: case for case in baseline["cases"]}
+
+    for case in results["cases"]:
+        base = baseline_cases.get(case["scale"])
+        if base is None:
+            continue
+
+        limit = max(base["wall_time"] * (1 + tolerance), base["wall_time"] + min_delta)
+        if case["wall_time"] > limit:
+            failures.append(f"scale {case['scale']}: {case['wall_time']:.4f}s > {limit:.4f}s")
+
+        for name, emitter in case["emitters"].items():
+            base_emitter = base["emitters"].get(name)
+            if base_emitter is None:
+                continue
+
+            limit = max(base_emitter["time"] * (1 + tolerance), base_emitter["time"] + min_delta)
+            if emitter["time"] > limit:
+                failures.append(f"scale {case['scale']} {name}: {emitter['time']:.4f}s > {limit:.4f}s")
+
+    return failures
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark gen.py on the real and synthetic scaled api.json")
+    parser.add_argument("--api", default="api.json", help="api description to benchmark")
+    parser.add_argument("--scales", default="1,10,100", help="comma separated replication factors")
+    parser.add_argument("--repeats", type=int, default=3, help="best of N per measurement")
+    parser.add_argument("--out", default="bench_output.json", help="where the results are written")
+    parser.add_argument("--baseline", metavar="PATH", help="results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against the baseline")
+    parser.add_argument("--versions", metavar="PATHS", help="comma separated api.json files, compare independent runs against gen.py --batch instead")
+    parser.add_argument("--min-delta", type=float, default=0.001, help="slowdowns below this many seconds are ignored")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    scales = [int(scale) for scale in args.scales.split(",")]
+    results = {
+        "python": sys.version.split()[0],
+        "cases": [],
+    }
+
+    context = multiprocessing.get_context("spawn")
+
+    if args.versions:
+        versions = compare_versions(args.versions.split(","), context)
+
+        for name in ("independent", "batch"):
+            run = versions[name]
+            print(f"{name:<12} {run['wall_time']:.4f}s wall, {run['generate_time']:.4f}s generating, {run['peak_rss_kb']} KB peak rss")
+
+        with open(args.out, "w") as out_file:
+            json.dump(versions, out_file, indent=1)
+
+        sys.exit(0)
+
+    for scale in scales:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            case = executor.submit(run_case, args.api, scale, args.repeats).result()
+
+        results["cases"].append(case)
+        print(f"scale {scale:>4}: {case['wall_time']:.4f}s, {case['nodes_per_second']:.0f} nodes/s, {case['peak_rss_kb']} KB peak rss")
+
+        for name, emitter in case["emitters"].items():
+            print(f"    {name:<18} {emitter['time']:.4f}s for {emitter['nodes']} nodes")
+
+    with open(args.out, "w") as out_file:
+        json.dump(results, out_file, indent=1)
+
+    if args.baseline:
+        with open(args.baseline, "r") as baseline_file:
+            baseline = json.load(baseline_file)
+
+        failures = compare_baseline(results, baseline, args.tolerance, args.min_delta)
+        for failure in failures:
+            print(f"slower than baseline: {failure}")
+
+        if len(failures) != 0:
+            sys.exit(1)
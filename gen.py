@@ -1,5 +1,83 @@
-import json
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import cProfile
+import functools
+import hashlib
 import io
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+
+# intermediate representation built once from api.json and rendered by the gen_* procedures
+# types are already resolved to their odin spelling, docs are a string or a list of lines
+
+@dataclass(slots=True)
+class Param:
+    name: str
+    type: str
+
+@dataclass(slots=True)
+class Proc:
+    name: str
+    params: list
+    ret: str | None # None for void, "!" for procs that dont return
+    doc: object = None
+    body: str | None = None # native odin implementation instead of a foreign declaration
+
+@dataclass(slots=True)
+class Field:
+    name: str
+    type: object # odin type string, Struct or Union for inline types
+    doc: object = None
+    tag: str | None = None
+
+@dataclass(slots=True)
+class Struct:
+    name: str
+    fields: list | None # None when api.json has no fields
+    doc: object = None
+
+@dataclass(slots=True)
+class Union:
+    fields: list
+
+@dataclass(slots=True)
+class Constant:
+    name: str
+    value: object
+    doc: object = None
+
+@dataclass(slots=True)
+class Enum:
+    name: str
+    sizing: str | None
+    constants: list
+    singleton: bool
+    bit_set: list | None = None # entry of enum_bit_sets_list
+    truncated: bool = False # stopped early at an OC_UI_STYLE constant
+    doc: object = None
+
+# name :: type, type None only writes the doc
+@dataclass(slots=True)
+class Typedef:
+    name: str
+    type: str | None
+    doc: object = None
+
+@dataclass(slots=True)
+class Module:
+    name: str
+    brief: str
+    contents: list = field(default_factory=list) # nested modules and types in order
+    procs: list = field(default_factory=list) # written into the foreign block
+    key: str | None = None # cache key of the subtree
+    text: str | None = None # already generated text from the cache
+    extras: str | None = None # helpers and generated code, set when --roots prunes the module
 
 # TODO API NOT EXISTING
 # ui_menu_bar_begin _str8 version
@@ -15,19 +93,62 @@ def prefix_trim_oc(name):
 
     return name
 
+# symbol table of api.json typenames to their odin names
+# filled while typenames are built, forward references are entered on first use
+typename_index = {}
+
+def get_typename(name):
+    result = typename_index.get(name)
+
+    if result is None:
+        result = prefix_trim_oc(name) # names need to be trimmed
+        typename_index[name] = result
+
+    return result
+
 def get_type_name_or_kind(obj):
     result = obj["kind"] # basic identifiers like f32, int, etc land here
     
     # if it contains an orca name, use that one instead
     if "name" in obj:
-        result = prefix_trim_oc(obj["name"]) # names need to be trimmed
+        result = get_typename(obj["name"])
+
+    return result
+
+# field names whose pointers stay multipointers to their type
+buffer_field_names = {
+    "buffer",
+    "pixels",
+}
+
+# resolved odin types keyed by the parts of a type node get_inner_kind looks at
+type_memo = {}
+
+# resolve a type node to its odin spelling, cached by its structure and the field name class
+def get_inner_kind(obj, field_name):
+    kind = obj["kind"]
+    inner_key = None
+
+    # only pointers and named types look one level deeper
+    if kind == "pointer" or kind == "namedType":
+        inner_type = obj.get("type")
+
+        if inner_type is not None:
+            inner_key = (inner_type["kind"], inner_type.get("name"))
+
+    key = (kind, obj.get("name"), inner_key, field_name in buffer_field_names)
+    result = type_memo.get(key)
+
+    if result is None:
+        result = resolve_inner_kind(obj, field_name)
+        type_memo[key] = result
 
     return result
 
 # try using the object kind
 # if kind is namedType -> get the namedType name
 # if its a pointer do a pointer type or rawptr
-def get_inner_kind(obj, field_name):
+def resolve_inner_kind(obj, field_name):
     result = get_type_name_or_kind(obj)
     output = result
 
@@ -40,7 +161,7 @@ def get_inner_kind(obj, field_name):
             output = "rawptr"
         else:
             # keep "buffers" as multipointers to their type
-            if field_name == "buffer" or field_name == "pixels":
+            if field_name in buffer_field_names:
                 output = "[^]" + result
             else:
                 output = "^" + result
@@ -59,15 +180,14 @@ def get_inner_kind(obj, field_name):
 
     return output
 
-# generate a single field key & value pair
-def gen_param(obj, file):
+# build a single parameter key & value pair
+def build_param(obj):
     name = check_field_name(obj["name"]) # can be ... !
     
     # convert variadic-param to odin #c_vararg args: ..any
     variable_output = get_inner_kind(obj["type"], name)
     if name == "..." or variable_output == "va_list":
-        file.write("#c_vararg args: ..any")
-        return
+        return Param("#c_vararg args", "..any")
 
     if name == "context": # context is a keyword in odin
         name = "_context" 
@@ -83,23 +203,45 @@ def gen_param(obj, file):
         name = "#by_ptr defaultStyle"
         variable_output = "ui_style"
 
-    file.write(f"{name}: {variable_output}")
+    return Param(name, variable_output)
+
+# generate a single field key & value pair
+def gen_param(param, out):
+    out.append(f"{param.name}: {param.type}")
+
+# name of a param without the directive in front of it, e.g. style for "#by_ptr style"
+def get_param_name(param):
+    return param.name.rpartition(" ")[2]
+
+# arguments passing the params of a proc on to a proc with the same params, variadic ones are spread
+def get_forwarded_args(params):
+    args = []
+
+    for param in params:
+        name = get_param_name(param)
+
+        if param.type.startswith(".."):
+            name = ".." + name
+
+        args.append(name)
+
+    return ", ".join(args)
 
 # generate a multi or single line doc dependant on whats provided
-def gen_doc(obj, file, indent):
+def gen_doc(doc, out, indent):
     indent_str = indent_string(indent)
-    if isinstance(obj, list):
-        file.write(f"{indent_str}/*\n")
-        for line in obj:
-            file.write(f"{indent_str}{line}\n")
-        file.write(f"{indent_str}*/\n")
+    if isinstance(doc, list):
+        out.append(f"{indent_str}/*\n")
+        for line in doc:
+            out.append(f"{indent_str}{line}\n")
+        out.append(f"{indent_str}*/\n")
     else:
-        file.write(f"{indent_str}// {obj}\n")
+        out.append(f"{indent_str}// {doc}\n")
 
 # if the doc exists write it
-def try_gen_doc(obj, file, indent):
-    if "doc" in obj:
-        gen_doc(obj["doc"], file, indent)
+def try_gen_doc(doc, out, indent):
+    if doc is not None:
+        gen_doc(doc, out, indent)
 
 # if a proc begins with abort or assert return true
 def proc_contains_panic(name):
@@ -114,539 +256,2622 @@ proc_ignore_list = {
     "str8_pushf",
 }
 
-# generate a procedure declation with the parameters and its return type
-def gen_proc(obj, name, write_foreign_finish, file, indent):
-    kind = obj["kind"]
+# generator switches that change the output, set from the command line
+# the defaults keep every proc a foreign call and add no helpers
+# algebra: "native", "simd" or "foreign", see native_algebra_procs
+# input: "native" or "foreign", see native_input_procs
+# utf8: "native" or "foreign", see native_utf8_procs
+# calls: "foreign" or "counted", see gen_counted_proc
+# the remaining switches add generated or hand-written helpers, see module_helper_options and module_generators
+gen_options = {
+    "algebra": "foreign",
+    "input": "foreign",
+    "utf8": "foreign",
+    "calls": "foreign",
+    "transform_helpers": False,
+    "canvas_recorder": False,
+    "font_cache": False,
+    "event_ring": False,
+    "file_io": False,
+}
+
+# native odin implementations of the algebra procs, matching the host implementations
+# they are contextless and inlined, so tiny math ops dont cross the wasm import boundary
+native_algebra_procs = {
+    "vec2_equal": """\treturn v0 == v1
+""",
+    "vec2_mul": """\treturn f * v
+""",
+    "vec2_add": """\treturn v0 + v1
+""",
+    "mat2x3_mul": """\treturn {
+\t\tp.x * m[0] + p.y * m[1] + m[2],
+\t\tp.x * m[3] + p.y * m[4] + m[5],
+\t}
+""",
+    "mat2x3_mul_m": """\treturn {
+\t\tlhs[0] * rhs[0] + lhs[1] * rhs[3],
+\t\tlhs[0] * rhs[1] + lhs[1] * rhs[4],
+\t\tlhs[0] * rhs[2] + lhs[1] * rhs[5] + lhs[2],
+\t\tlhs[3] * rhs[0] + lhs[4] * rhs[3],
+\t\tlhs[3] * rhs[1] + lhs[4] * rhs[4],
+\t\tlhs[3] * rhs[2] + lhs[4] * rhs[5] + lhs[5],
+\t}
+""",
+    "mat2x3_inv": """\tres: mat2x3
+\tres[0] = x[4] / (x[0] * x[4] - x[1] * x[3])
+\tres[1] = x[1] / (x[1] * x[3] - x[0] * x[4])
+\tres[3] = x[3] / (x[1] * x[3] - x[0] * x[4])
+\tres[4] = x[0] / (x[0] * x[4] - x[1] * x[3])
+\tres[2] = -(x[2] * res[0] + x[5] * res[1])
+\tres[5] = -(x[2] * res[3] + x[5] * res[4])
+\treturn res
+""",
+    "mat2x3_rotate": """\tsin_rot := math.sin_f32(radians)
+\tcos_rot := math.cos_f32(radians)
+\treturn {cos_rot, -sin_rot, 0, sin_rot, cos_rot, 0}
+""",
+    "mat2x3_translate": """\treturn {1, 0, x, 0, 1, y}
+""",
+    "mat2x3_scale": """\treturn {x, 0, 0, 0, y, 0}
+""",
+}
+
+# #simd variants used with --algebra simd, the additions keep the order of the scalar versions
+native_algebra_simd_procs = {
+    "mat2x3_mul": """\trow := #simd[4]f32{p.x, p.y, 1, 0}
+\tx := transmute([4]f32)(row * #simd[4]f32{m[0], m[1], m[2], 0})
+\ty := transmute([4]f32)(row * #simd[4]f32{m[3], m[4], m[5], 0})
+\treturn {x[0] + x[1] + x[2], y[0] + y[1] + y[2]}
+""",
+    "mat2x3_mul_m": """\tr0 := #simd[4]f32{rhs[0], rhs[1], rhs[2], 0}
+\tr1 := #simd[4]f32{rhs[3], rhs[4], rhs[5], 0}
+\ttop := r0 * #simd[4]f32{lhs[0], lhs[0], lhs[0], lhs[0]} + r1 * #simd[4]f32{lhs[1], lhs[1], lhs[1], lhs[1]} + #simd[4]f32{0, 0, lhs[2], 0}
+\tbottom := r0 * #simd[4]f32{lhs[3], lhs[3], lhs[3], lhs[3]} + r1 * #simd[4]f32{lhs[4], lhs[4], lhs[4], lhs[4]} + #simd[4]f32{0, 0, lhs[5], 0}
+\ta := transmute([4]f32)top
+\tb := transmute([4]f32)bottom
+\treturn {a[0], a[1], a[2], b[0], b[1], b[2]}
+""",
+}
+
+# native odin implementations of the input queries, matching the host implementations
+# the input state is odin memory already, so queries read it directly instead of calling into the host
+native_input_procs = {
+    "input_process_event": """\t#partial switch event.type {
+\tcase .KEYBOARD_KEY:
+\t\tinput_update_key_state(state, &state.keyboard.keys[int(event.key.keyCode)], event.key.action)
+\t\tstate.keyboard.mods = event.key.mods
+\tcase .KEYBOARD_CHAR:
+\t\tinput_update_text(state, event.character.codepoint)
+\tcase .KEYBOARD_MODS:
+\t\tstate.keyboard.mods = event.key.mods
+\tcase .MOUSE_MOVE:
+\t\tinput_update_mouse_frame(state)
+\t\tstate.mouse.posValid = true
+\t\tstate.mouse.pos = {event.mouse.x, event.mouse.y}
+\t\tstate.mouse.delta += {event.mouse.deltaX, event.mouse.deltaY}
+\tcase .MOUSE_WHEEL:
+\t\tinput_update_mouse_frame(state)
+\t\tstate.mouse.wheel += {event.mouse.deltaX, event.mouse.deltaY}
+\tcase .MOUSE_BUTTON:
+\t\tbutton := &state.mouse.buttons[int(event.key.button)]
+\t\tinput_update_key_state(state, button, event.key.action)
+
+\t\tif event.key.action == .PRESS {
+\t\t\tif event.key.clickCount >= 1 {
+\t\t\t\tbutton.sysClicked = true
+\t\t\t}
+\t\t\tif event.key.clickCount >= 2 {
+\t\t\t\tbutton.sysDoubleClicked = true
+\t\t\t}
+\t\t\tif event.key.clickCount >= 3 {
+\t\t\t\tbutton.sysTripleClicked = true
+\t\t\t}
+\t\t}
+\t\tstate.keyboard.mods = event.key.mods
+\tcase .CLIPBOARD_PASTE:
+\t\t// only the host can read the clipboard
+\t\thost_input_process_event(arena, state, event)
+\t}
+""",
+    "input_next_frame": """\tstate.frameCounter += 1
+""",
+    "key_down": """\treturn state.keyboard.keys[int(key)].down
+""",
+    "key_press_count": """\treturn input_key_press_count(state, &state.keyboard.keys[int(key)])
+""",
+    "key_release_count": """\treturn input_key_release_count(state, &state.keyboard.keys[int(key)])
+""",
+    "key_repeat_count": """\tentry := &state.keyboard.keys[int(key)]
+\tif entry.lastUpdate != state.frameCounter {
+\t\treturn 0
+\t}
+\treturn u8(entry.repeatCount)
+""",
+    "mouse_down": """\treturn state.mouse.buttons[int(button)].down
+""",
+    "mouse_pressed": """\treturn input_key_press_count(state, &state.mouse.buttons[int(button)])
+""",
+    "mouse_released": """\treturn input_key_release_count(state, &state.mouse.buttons[int(button)])
+""",
+    "mouse_clicked": """\tbutton_state := &state.mouse.buttons[int(button)]
+\treturn button_state.lastUpdate == state.frameCounter && button_state.sysClicked
+""",
+    "mouse_double_clicked": """\tbutton_state := &state.mouse.buttons[int(button)]
+\treturn button_state.lastUpdate == state.frameCounter && button_state.sysDoubleClicked
+""",
+    "mouse_position": """\treturn state.mouse.pos
+""",
+    "mouse_delta": """\tif state.mouse.lastUpdate != state.frameCounter {
+\t\treturn {}
+\t}
+\treturn state.mouse.delta
+""",
+    "mouse_wheel": """\tif state.mouse.lastUpdate != state.frameCounter {
+\t\treturn {}
+\t}
+\treturn state.mouse.wheel
+""",
+    "clipboard_pasted": """\treturn state.clipboard.lastUpdate == state.frameCounter
+""",
+    "clipboard_pasted_text": """\tif state.clipboard.lastUpdate != state.frameCounter {
+\t\treturn ""
+\t}
+\treturn state.clipboard.pastedText
+""",
+    "key_mods": """\treturn state.keyboard.mods
+""",
+}
+
+# native odin implementations of the utf8 procs, matching the host implementations
+# runs of ascii are handled 8 bytes at a time with unaligned u64 loads
+native_utf8_procs = {
+    "utf8_size_from_leading_char": """\tswitch {
+\tcase leadingChar < 0xc0:
+\t\treturn 1
+\tcase leadingChar < 0xe0:
+\t\treturn 2
+\tcase leadingChar < 0xf0:
+\t\treturn 3
+\tcase leadingChar < 0xf8:
+\t\treturn 4
+\tcase leadingChar < 0xfc:
+\t\treturn 5
+\t}
+\treturn 6
+""",
+    "utf8_codepoint_size": """\tswitch u32(codePoint) {
+\tcase 0 ..< 0x80:
+\t\treturn 1
+\tcase 0x80 ..< 0x800:
+\t\treturn 2
+\tcase 0x800 ..< 0x10000:
+\t\treturn 3
+\tcase 0x10000 ..< 0x110000:
+\t\treturn 4
+\t}
+\treturn 0
+""",
+    "utf8_codepoint_count_for_string": """\tbytes := transmute([]u8)string
+\tcount: u64 = 0
+\toffset := 0
+
+\tfor offset < len(bytes) {
+\t\t// ascii without zero bytes, the count stops at the first zero like the host
+\t\tfor offset + 8 <= len(bytes) {
+\t\t\tword := intrinsics.unaligned_load((^u64)(&bytes[offset]))
+\t\t\tif word & 0x8080808080808080 != 0 || (word - 0x0101010101010101) & ~word & 0x8080808080808080 != 0 {
+\t\t\t\tbreak
+\t\t\t}
+\t\t\tcount += 8
+\t\t\toffset += 8
+\t\t}
+
+\t\tif offset >= len(bytes) || bytes[offset] == 0 {
+\t\t\tbreak
+\t\t}
+\t\toffset += int(utf8_decode_at(string, u64(offset)).size)
+\t\tcount += 1
+\t}
+\treturn count
+""",
+    "utf8_byte_count_for_codepoints": """\tcount: u64 = 0
+\tfor codePoint in codePoints {
+\t\tcount += u64(utf8_codepoint_size(codePoint))
+\t}
+\treturn count
+""",
+    "utf8_next_offset": """\tif byteOffset >= u64(len(string)) {
+\t\treturn u64(len(string))
+\t}
+\treturn min(byteOffset + u64(utf8_size_from_leading_char(string[byteOffset])), u64(len(string)))
+""",
+    "utf8_prev_offset": """\tif byteOffset > u64(len(string)) {
+\t\treturn u64(len(string))
+\t}
+
+\toffset := byteOffset
+\tif offset > 0 {
+\t\toffset -= 1
+\t\tfor offset > 0 && string[offset] & 0xc0 == 0x80 {
+\t\t\toffset -= 1
+\t\t}
+\t}
+\treturn offset
+""",
+    "utf8_decode": """\treturn utf8_decode_at(string, 0)
+""",
+    "utf8_decode_at": """\tif offset >= u64(len(string)) {
+\t\treturn {status = .OUT_OF_BOUNDS}
+\t}
+
+\tbytes := transmute([]u8)(string[offset:])
+\tlead := bytes[0]
+\tif lead < 0x80 {
+\t\treturn {codepoint = utf32(lead), size = 1}
+\t}
+
+\tsize: u32
+\tcodepoint: utf32
+\tmin_codepoint: utf32
+\tswitch {
+\tcase lead & 0xc0 == 0x80:
+\t\treturn {status = .UNEXPECTED_CONTINUATION_BYTE, size = 1}
+\tcase lead & 0xe0 == 0xc0:
+\t\tsize, codepoint, min_codepoint = 2, utf32(lead & 0x1f), 0x80
+\tcase lead & 0xf0 == 0xe0:
+\t\tsize, codepoint, min_codepoint = 3, utf32(lead & 0x0f), 0x800
+\tcase lead & 0xf8 == 0xf0:
+\t\tsize, codepoint, min_codepoint = 4, utf32(lead & 0x07), 0x10000
+\tcase:
+\t\treturn {status = .INVALID_BYTE, size = 1}
+\t}
+
+\tfor i in 1 ..< size {
+\t\tif int(i) >= len(bytes) {
+\t\t\treturn {status = .OUT_OF_BOUNDS, size = i}
+\t\t}
+\t\tif bytes[i] & 0xc0 != 0x80 {
+\t\t\treturn {status = .UNEXPECTED_LEADING_BYTE, size = i}
+\t\t}
+\t\tcodepoint = codepoint << 6 | utf32(bytes[i] & 0x3f)
+\t}
+
+\tif codepoint < min_codepoint {
+\t\treturn {status = .OVERLONG_ENCODING, codepoint = codepoint, size = size}
+\t}
+\tif codepoint > 0x10ffff || (codepoint >= 0xd800 && codepoint <= 0xdfff) {
+\t\treturn {status = .INVALID_CODEPOINT, codepoint = codepoint, size = size}
+\t}
+\treturn {codepoint = codepoint, size = size}
+""",
+    "utf8_encode": """\tbytes := ([^]u8)(dst)
+\tcp := u32(codePoint)
+
+\tswitch cp {
+\tcase 0 ..< 0x80:
+\t\tbytes[0] = u8(cp)
+\t\treturn str8(bytes[:1])
+\tcase 0x80 ..< 0x800:
+\t\tbytes[0] = u8(cp >> 6) | 0xc0
+\t\tbytes[1] = u8(cp & 0x3f) | 0x80
+\t\treturn str8(bytes[:2])
+\tcase 0x800 ..< 0x10000:
+\t\tbytes[0] = u8(cp >> 12) | 0xe0
+\t\tbytes[1] = u8((cp >> 6) & 0x3f) | 0x80
+\t\tbytes[2] = u8(cp & 0x3f) | 0x80
+\t\treturn str8(bytes[:3])
+\tcase 0x10000 ..< 0x110000:
+\t\tbytes[0] = u8(cp >> 18) | 0xf0
+\t\tbytes[1] = u8((cp >> 12) & 0x3f) | 0x80
+\t\tbytes[2] = u8((cp >> 6) & 0x3f) | 0x80
+\t\tbytes[3] = u8(cp & 0x3f) | 0x80
+\t\treturn str8(bytes[:4])
+\t}
+\treturn str8(bytes[:0])
+""",
+    "utf8_to_codepoints": """\tbytes := transmute([]u8)string
+\tcodepoints := ([^]utf32)(backing)
+\tcount: u64 = 0
+\toffset := 0
+
+\tfor count < maxCount && offset < len(bytes) {
+\t\t// ascii without zero bytes, the string ends at the first zero like in utf8_codepoint_count_for_string
+\t\tfor count + 8 <= maxCount && offset + 8 <= len(bytes) {
+\t\t\tword := intrinsics.unaligned_load((^u64)(&bytes[offset]))
+\t\t\tif word & 0x8080808080808080 != 0 || (word - 0x0101010101010101) & ~word & 0x8080808080808080 != 0 {
+\t\t\t\tbreak
+\t\t\t}
+\t\t\tfor i in 0 ..< 8 {
+\t\t\t\tcodepoints[count + u64(i)] = utf32(bytes[offset + i])
+\t\t\t}
+\t\t\tcount += 8
+\t\t\toffset += 8
+\t\t}
+
+\t\tif count >= maxCount || offset >= len(bytes) || bytes[offset] == 0 {
+\t\t\tbreak
+\t\t}
+\t\tdec := utf8_decode_at(string, u64(offset))
+\t\tcodepoints[count] = dec.codepoint
+\t\tcount += 1
+\t\toffset += int(dec.size)
+\t}
+\treturn str32(codepoints[:count])
+""",
+}
+
+# packages the native implementations of a module import
+native_module_imports = {
+    "Algebra": ["core:math"],
+    "UTF8": ["base:intrinsics"],
+}
+
+# option of gen_options that switches the native procs of a module
+native_module_options = {
+    "Algebra": "algebra",
+    "Input": "input",
+    "UTF8": "utf8",
+}
+
+# get the native odin body of a proc for the current options, None keeps it foreign
+def get_native_body(name):
+    algebra = gen_options["algebra"]
+
+    if algebra == "simd" and name in native_algebra_simd_procs:
+        return native_algebra_simd_procs[name]
+
+    if algebra != "foreign" and name in native_algebra_procs:
+        return native_algebra_procs[name]
+
+    if gen_options["input"] != "foreign" and name in native_input_procs:
+        return native_input_procs[name]
+
+    if gen_options["utf8"] != "foreign" and name in native_utf8_procs:
+        return native_utf8_procs[name]
+
+    return None
+
+# imports needed by the native implementations, of a single module or of all modules when None
+def get_native_imports(module_name):
+    names = [module_name] if module_name is not None else native_module_imports.keys()
+    paths = set()
+
+    for name in names:
+        if name in native_module_imports and gen_options[native_module_options[name]] != "foreign":
+            paths.update(native_module_imports[name])
+
+    return sorted(paths)
+
+# build a procedure with its parameters and return type, None for ignored procs
+def build_proc(obj, name):
     name = prefix_trim_oc(name)
 
     if name in proc_ignore_list:
-        return
+        return None
+
+    params = [build_param(param) for param in obj["params"]]
+
+    ret = obj["return"]
+    ret_kind = None
+    if ret["kind"] == "void" and proc_contains_panic(name):
+        ret_kind = "!"
+    elif ret["kind"] != "void":
+        ret_kind = get_inner_kind(ret, "")
+
+    return Proc(name, params, ret_kind, obj.get("doc"), get_native_body(name))
 
-    try_gen_doc(obj, file, indent)
+# generate a procedure declation with the parameters and its return type
+def gen_proc(proc, write_foreign_finish, out, indent):
+    try_gen_doc(proc.doc, out, indent)
     indent_str = indent_string(indent)
-    file.write(f"{indent_str}{name} :: proc")
+    out.append(f"{indent_str}{proc.name} :: proc")
 
     # append proc "c" to typedef procs
     if indent == 0:
-        file.write(" \"c\" ")
+        out.append(" \"c\" ")
 
     # write params
-    param_count = 0
-    file.write("(")
-    for param in obj["params"]:
-        if param_count > 0:
-            file.write(", ")
+    out.append("(")
+    for index, param in enumerate(proc.params):
+        if index > 0:
+            out.append(", ")
 
-        gen_param(param, file)
-        param_count += 1
+        gen_param(param, out)
 
-    file.write(")")
+    out.append(")")
 
     # write return type
-    ret = obj["return"]
-    if ret["kind"] == "void" and proc_contains_panic(name):
-        file.write(" -> !")
-    elif ret["kind"] != "void":
-        ret_kind = get_inner_kind(ret, "")
-        file.write(f" -> {ret_kind}")
+    if proc.ret is not None:
+        out.append(f" -> {proc.ret}")
 
     # finish
     if write_foreign_finish:
-        file.write(" ---\n")
+        out.append(" ---\n")
     else:
-        file.write("\n")
+        out.append("\n")
 
-# add indentation 
-def indent_string(indent):
-    return "\t" * indent
+# generate a native odin implementation in place of a foreign declaration
+def gen_native_proc(proc, out):
+    try_gen_doc(proc.doc, out, 0)
 
-# write spacers and actual module docs
-def gen_module_doc(obj, file):
-    brief = obj["brief"]
-    spacer = "//" * 40
-    file.write(spacer + "\n")
-    file.write(f"// {brief}\n")
-    file.write(spacer + "\n" * 2)
+    # only the small algebra leaf procs are forced inline, the others are left to the optimizer
+    if proc.name in native_algebra_procs or proc.name in native_algebra_simd_procs:
+        out.append(f"{proc.name} :: #force_inline proc \"contextless\" (")
+    else:
+        out.append(f"{proc.name} :: proc \"contextless\" (")
 
-# easier builtins instead of struct+unions
-type_builtins = {
-    "vec2": "[2]f32",
-    "vec3": "[3]f32",
-    "vec2i": "[2]i32",
-    "vec4": "[4]f32",
-    "mat2x3": "[6]f32",
-    "rect": "struct { x, y, w, h: f32 }",
-    "color": "struct { using c: [4]f32, colorSpace: color_space }",
+    for index, param in enumerate(proc.params):
+        if index > 0:
+            out.append(", ")
 
-    "ui_layout_align": "[2]ui_align",
-    "ui_box_size": "[2]ui_size",
-    "ui_box_floating": "[2]bool",
-    
-    "mat2x3": "[6]f32",
-    
-    "utf32": "rune",
-    "str8": "string",
-    "str16": "distinct []u16",
-    "str32": "distinct []rune",
+        gen_param(param, out)
+
+    out.append(")")
+
+    if proc.ret is not None:
+        out.append(f" -> {proc.ret}")
+
+    out.append(" {\n")
+    out.append(proc.body)
+    out.append("}\n\n")
+
+# switch of gen_options that enables the helpers of a module
+module_helper_options = {
+    "Algebra": "transform_helpers",
+    "Canvas": "font_cache",
 }
 
-# generate a default builtin instead of complex xy or xywh C struct+union pairs
-def gen_type_builtins(name, file, indent):
-    if name in type_builtins:
-        indent_str = indent_string(indent)
-        output = type_builtins[name]
-        file.write(f"{indent_str}{name} :: {output}\n\n")
-        return True
+def has_module_helpers(name):
+    return name in module_helpers and gen_options[module_helper_options[name]]
 
-    return False
+# hand-written odin helpers appended to a module, they only use that modules types
+module_helpers = {
+    "Algebra": """// Transform every point of `src` by `m` into `dst`, only `min(len(src), len(dst))` points are written.
+// Two points are transformed per iteration.
+mat2x3_transform_points :: proc "contextless" (m: mat2x3, src: []vec2, dst: []vec2) {
+\tcount := min(len(src), len(dst))
+\tmx := #simd[4]f32{m[0], m[3], m[0], m[3]}
+\tmy := #simd[4]f32{m[1], m[4], m[1], m[4]}
+\tmt := #simd[4]f32{m[2], m[5], m[2], m[5]}
 
-# get the enum size (u64, i32, etc)
-def get_enum_sizing(obj):
-    return obj["type"]["kind"]
+\ti := 0
+\tfor i + 2 <= count {
+\t\tpx := #simd[4]f32{src[i].x, src[i].x, src[i + 1].x, src[i + 1].x}
+\t\tpy := #simd[4]f32{src[i].y, src[i].y, src[i + 1].y, src[i + 1].y}
+\t\tr := transmute([4]f32)(px * mx + py * my + mt)
+\t\tdst[i] = {r[0], r[1]}
+\t\tdst[i + 1] = {r[2], r[3]}
+\t\ti += 2
+\t}
 
-# since prefixes dont always match the enum name, the table is easier
-enum_prefixes_specific = {
-    "OC_UI_OVERFLOW_",
-    "OC_UI_MASK_",
-    "OC_UI_DRAW_MASK_",
-    "OC_LOG_LEVEL_",
-    "OC_EVENT_",
-    "OC_KEY_",
-    "OC_SCANCODE_",
-    "OC_KEYMOD_",
-    "OC_MOUSE_",
-    "OC_FILE_DIALOG_",
-    "OC_FILE_OPEN_",
-    "OC_FILE_ACCESS_",
-    "OC_FILE_SEEK_",
-    "OC_IO_ERR_",
-    "OC_GRADIENT_BLEND_",
-    "OC_COLOR_SPACE_",
-    "OC_JOINT_",
-    "OC_CAP_",
-    "OC_INPUT_TEXT_",
-    "OC_UI_AXIS_",
-    "OC_UI_ALIGN_",
-    "OC_UI_SIZE_",
-    "OC_UI_STYLE_",
-    "OC_UI_SEL_",
-    "OC_UI_FLAG_",
-    "OC_UI_FLAG_",
-    "OC_UI_EDIT_MOVE_",
-    "OC_UTF8_",
-    "OC_CLOCK_",
+\tfor i < count {
+\t\tp := src[i]
+\t\tdst[i] = {
+\t\t\tp.x * m[0] + p.y * m[1] + m[2],
+\t\t\tp.x * m[3] + p.y * m[4] + m[5],
+\t\t}
+\t\ti += 1
+\t}
 }
 
-enum_prefixes_fully = {
-    "OC_UI_OVERFLOW_X",
-    "OC_UI_OVERFLOW_Y",
-    "OC_UI_ALIGN_X",
-    "OC_UI_ALIGN_Y",
+// Transform the corners of every rect of `src` by `m` and write their axis-aligned bounds into `dst`.
+// Only `min(len(src), len(dst))` rects are written.
+rects_transform :: proc "contextless" (m: mat2x3, src: []rect, dst: []rect) {
+\tcount := min(len(src), len(dst))
+
+\tfor i in 0 ..< count {
+\t\tr := src[i]
+\t\txs := [4]f32{r.x, r.x + r.w, r.x, r.x + r.w}
+\t\tys := [4]f32{r.y, r.y, r.y + r.h, r.y + r.h}
+\t\tcx := xs * m[0] + ys * m[1] + m[2]
+\t\tcy := xs * m[3] + ys * m[4] + m[5]
+
+\t\tmin_x := min(cx[0], cx[1], cx[2], cx[3])
+\t\tmin_y := min(cy[0], cy[1], cy[2], cy[3])
+\t\tmax_x := max(cx[0], cx[1], cx[2], cx[3])
+\t\tmax_y := max(cy[0], cy[1], cy[2], cy[3])
+\t\tdst[i] = {min_x, min_y, max_x - min_x, max_y - min_y}
+\t}
 }
 
-# since the hashset above is unsorted these should be checked last
-enum_prefixes_broad = {
-    "OC_FILE_",
-    "OC_UI_",
-    "OC_IO_",
+""",
+    "Canvas": """// Entries of a `font_cache` bucket, the least recently used entry of a bucket is evicted.
+FONT_CACHE_WAYS :: 8
+
+// A cached text measurement or glyph index lookup.
+font_cache_entry :: struct {
+\tfont: font,
+\tkind: font_cache_kind,
+\tsize: f32,
+\thash: u64,
+\t// Frame of the last use, 0 for empty entries.
+\tframe: u64,
+\tmetrics: text_metrics,
+\tglyph_start: u64,
+\tglyph_count: int,
+\t// Glyph indices were stored in the ring.
+\thas_glyphs: bool,
 }
 
-# fixup enum names based on prefixes
-def simplify_enum_name(name):
-    full_base = "OC_UI_"
-    for prefix in enum_prefixes_fully:
-        if name.startswith(prefix):
-            return name[len(full_base):]
+// Cache of text metrics and glyph indices keyed by font, font size and a hash of the text.
+// Memory is fixed at `font_cache_init`, glyph indices live in a ring and expire when it wraps over them.
+font_cache :: struct {
+\tentries: []font_cache_entry,
+\tglyphs: []u32,
+\tglyph_head: u64,
+\tframe: u64,
+\thits: u64,
+\tmisses: u64,
+\tevictions: u64,
+}
 
-    for prefix in enum_prefixes_specific:
-        if name.startswith(prefix):
-            return name[len(prefix):]
+// Initialize a cache with at least `entry_count` entries and room for `glyph_count` glyph indices pushed onto `arena`.
+// The glyph ring holds at least one index.
+font_cache_init :: proc "contextless" (cache: ^font_cache, arena: ^arena, entry_count: int, glyph_count: int) {
+\tglyph_count := max(glyph_count, 1)
+\tcount := FONT_CACHE_WAYS
+\tfor count < entry_count {
+\t\tcount *= 2
+\t}
 
-    # check last
-    for prefix in enum_prefixes_broad:
-        if name.startswith(prefix):
-            return name[len(prefix):]
+\tcache^ = {}
+\tcache.entries = arena_push_array(arena, font_cache_entry, u64(count))
+\tcache.glyphs = arena_push_array(arena, u32, u64(glyph_count))
+\tcache.frame = 1
 
-    return name
+\tfor &entry in cache.entries {
+\t\tentry = {}
+\t}
+}
 
-# safety check since enum field names cant be only numbers
-# 0 would be turned to _0
-def check_enum_name_decimal(name):
-    if name.isdecimal():
-        return "_" + name
+// Advance the frame used to age entries, call once per frame.
+font_cache_next_frame :: proc "contextless" (cache: ^font_cache) {
+\tcache.frame += 1
+}
 
-    return name
+// Drop every entry of `font`, handles of destroyed fonts can be reused by the host.
+font_cache_invalidate_font :: proc "contextless" (cache: ^font_cache, font: font) {
+\tfor &entry in cache.entries {
+\t\tif entry.frame != 0 && entry.font == font {
+\t\t\tentry = {}
+\t\t}
+\t}
+}
 
-# enums that should be converted to bit_set backing enums for nicer odin interop
-# [0] = the wanted enum name
-# [1] = the output bit_set name (may be used in parameters or fields types)
-# [2] = bit_set sizing (can't rely on the enum size)
-enum_bit_sets_list = {
-    "keymod_flags": ["keymod_flag", "keymod_flags", "u32", 0],
-    "file_dialog_flags": ["file_dialog_flag", "file_dialog_flags", "u32", 0],
-    "file_open_flags_enum": ["file_open_flag", "file_open_flags", "u16", 0],
-    "file_access_enum": ["file_access_flag", "file_access", "u16", 0],
-    "file_perm_enum": ["file_perm_flag", "file_perm", "u16", 0],
+// Destroy `font` and drop its cached entries.
+cached_font_destroy :: proc "contextless" (cache: ^font_cache, font: font) {
+\tfont_cache_invalidate_font(cache, font)
+\tfont_destroy(font)
 }
 
-def gen_enum_bit_set_combo(obj, file, name, indent):
-    is_bitset = name in enum_bit_sets_list
-    if not is_bitset:
-        return False
+// FNV-1a hash of the key of a cache entry.
+font_cache_hash :: proc "contextless" (kind: font_cache_kind, font: font, size: f32, data: rawptr, len: int) -> u64 {
+\thash: u64 = 0xcbf29ce484222325
+\thash = (hash ~ u64(kind)) * 0x100000001b3
+\thash = (hash ~ u64(font)) * 0x100000001b3
+\thash = (hash ~ u64(transmute(u32)size)) * 0x100000001b3
+\thash = (hash ~ u64(len)) * 0x100000001b3
 
-    indent_str = indent_string(indent)
-    change = enum_bit_sets_list[name]
-    enum_name = change[0]
-    bitset_name = change[1]
-    enum_sizing = change[2] # gotta use the same sizing for both, the origin enum
-    enum_start_offset = change[3] # some enums have the first real unit at 1 or 2, which can cause issues
-    file.write(f"{indent_str}{enum_name} :: enum {enum_sizing} {{\n")
+\tbytes := ([^]u8)(data)
+\tfor i in 0 ..< len {
+\t\thash = (hash ~ u64(bytes[i])) * 0x100000001b3
+\t}
 
-    # do not write out the value names of bit_set backing enum values
-    # also drop the NONE = 0 value
-    field_count = 0
-    fields_indent_str = indent_string(indent + 1)
-    for const in obj["constants"]:
-        real_name = const["name"]
-        const_name = simplify_enum_name(real_name)
+\treturn hash
+}
 
-        if const_name == "NONE":
-            continue
+// The ring hasn't wrapped over the glyph indices of an entry yet.
+font_cache_glyphs_valid :: proc "contextless" (cache: ^font_cache, entry: ^font_cache_entry) -> bool {
+\treturn cache.glyph_head - entry.glyph_start <= u64(len(cache.glyphs))
+}
 
-        # write docs if they exist
-        if "doc" in const:
-            const_docs = const["doc"]
-            file.write(f"{fields_indent_str}// {const_docs}\n")
+// Find a cached entry and mark it as used, counts a hit or a miss.
+// Entries whose glyph indices were overwritten by the ring are dropped and count as a miss.
+font_cache_find :: proc "contextless" (cache: ^font_cache, kind: font_cache_kind, font: font, size: f32, hash: u64) -> ^font_cache_entry {
+\tif len(cache.entries) != 0 {
+\t\tbucket := int(hash & u64(len(cache.entries) - 1)) &~ (FONT_CACHE_WAYS - 1)
 
-        file.write(f"{fields_indent_str}{const_name}")
+\t\tfor &entry in cache.entries[bucket:][:FONT_CACHE_WAYS] {
+\t\t\tif entry.frame != 0 && entry.hash == hash && entry.kind == kind && entry.font == font && entry.size == size {
+\t\t\t\tif entry.has_glyphs && !font_cache_glyphs_valid(cache, &entry) {
+\t\t\t\t\tentry = {}
+\t\t\t\t\tbreak
+\t\t\t\t}
 
-        # odin bit_set should start at 1
-        if field_count == 0:
-            file.write(f" = {enum_start_offset}")
+\t\t\t\tentry.frame = cache.frame
+\t\t\t\tcache.hits += 1
+\t\t\t\treturn &entry
+\t\t\t}
+\t\t}
+\t}
 
-        file.write(",\n")
-        field_count += 1
+\tcache.misses += 1
+\treturn nil
+}
 
-    file.write(f"{indent_str}}}\n")
-    file.write(f"{indent_str}{bitset_name} :: bit_set[{enum_name}; {enum_sizing}]\n\n")
-    return True
+// Claim the entry for a key, reusing an empty or the least recently used entry of its bucket.
+font_cache_insert :: proc "contextless" (cache: ^font_cache, kind: font_cache_kind, font: font, size: f32, hash: u64) -> ^font_cache_entry {
+\tif len(cache.entries) == 0 {
+\t\treturn nil
+\t}
 
-# generates an odin enum e.g. log_level :: enum { ... }
-def gen_enum(obj, file, name, indent):
-    indent_str = indent_string(indent)
-    singleton = len(obj["constants"]) <= 1 or name == ""
+\tbucket := int(hash & u64(len(cache.entries) - 1)) &~ (FONT_CACHE_WAYS - 1)
+\toldest := &cache.entries[bucket]
 
-    name = get_enum_name(name)
+\tfor &entry in cache.entries[bucket:][:FONT_CACHE_WAYS] {
+\t\tif entry.frame < oldest.frame {
+\t\t\toldest = &entry
+\t\t}
+\t}
 
-    if gen_enum_bit_set_combo(obj, file, name, indent):
-        return
+\tif oldest.frame != 0 {
+\t\tcache.evictions += 1
+\t}
 
-    # write enum description when not a singleton
-    elif not singleton:
-        enum_sizing = get_enum_sizing(obj)
-        file.write(f"{indent_str}{name} :: enum {enum_sizing} {{\n")
-        fields_indent_str = indent_string(indent + 1)
-    else:
-        fields_indent_str = indent_str
+\toldest^ = {
+\t\tfont  = font,
+\t\tkind  = kind,
+\t\tsize  = size,
+\t\thash  = hash,
+\t\tframe = cache.frame,
+\t}
+\treturn oldest
+}
 
-    # write enum content from objects
-    for const in obj["constants"]:
-        real_name = const["name"]
-        const_name = simplify_enum_name(real_name)
-        const_name = check_enum_name_decimal(const_name)
-        
-        # Exception for OC_STYLE currently, write out constant names
-        if real_name.startswith("OC_UI_STYLE"):
-            return
-        
-        const_value = const["value"]
+// Copy glyph indices into the glyph ring, entries whose indices don't fit aren't cached.
+font_cache_store_glyphs :: proc "contextless" (cache: ^font_cache, entry: ^font_cache_entry, glyphs: str32) {
+\tcapacity := u64(len(cache.glyphs))
+\tcount := u64(len(glyphs))
 
-        # write docs if they exist
-        if "doc" in const:
-            const_docs = const["doc"]
-            file.write(f"{fields_indent_str}// {const_docs}\n")
+\tif count > capacity {
+\t\tentry^ = {}
+\t\treturn
+\t}
 
-        # make it a constant instead of an enum asignment
-        assignment = "::" if singleton else "="
+\t// never split a run at the end of the ring
+\tif cache.glyph_head % capacity + count > capacity {
+\t\tcache.glyph_head += capacity - cache.glyph_head % capacity
+\t}
 
-        file.write(f"{fields_indent_str}{const_name} {assignment} {const_value}")
-        file.write("\n" if singleton else ",\n")
+\tstart := cache.glyph_head % capacity
+\tcopy(cache.glyphs[start:][:count], transmute([]u32)glyphs)
+\tentry.glyph_start = cache.glyph_head
+\tentry.glyph_count = int(count)
+\tentry.has_glyphs = true
+\tcache.glyph_head += count
+}
 
-    if singleton:
-        file.write("\n")
-    else:
-        file.write(f"{indent_str}}}\n\n")
+// Cached glyph indices of an entry, false when the ring wrapped over them.
+font_cache_glyphs :: proc "contextless" (cache: ^font_cache, entry: ^font_cache_entry) -> (str32, bool) {
+\tif !entry.has_glyphs || !font_cache_glyphs_valid(cache, entry) {
+\t\treturn nil, false
+\t}
 
+\tstart := entry.glyph_start % u64(len(cache.glyphs))
+\treturn transmute(str32)cache.glyphs[start:][:entry.glyph_count], true
+}
 
-# any oddities that need to be checked for field
-reserved_field_names = {
-    "matrix",
-    "proc",
-    "color", # issues when color is also return type...
+""",
 }
 
-# insert a _ before an identifier that may be invalid
-def check_field_name(name):
-    if name in reserved_field_names:
-        return "_" + name
+# hand-written odin appended to a module when it has native procs, shared by their bodies
+native_module_helpers = {
+    "Input": """// The host implementation, the native `input_process_event` forwards clipboard pastes to it.
+@(default_calling_convention="c")
+foreign {
+\t@(link_name="oc_input_process_event")
+\thost_input_process_event :: proc(arena: ^arena, state: ^input_state, event: ^event) ---
+}
 
-    return name
+// Reset the per-frame counters of a key the first time it changes in a frame, then apply `action`.
+input_update_key_state :: proc "contextless" (state: ^input_state, key: ^key_state, action: key_action) {
+\tif key.lastUpdate != state.frameCounter {
+\t\tkey.transitionCount = 0
+\t\tkey.repeatCount = 0
+\t\tkey.sysClicked = false
+\t\tkey.sysDoubleClicked = false
+\t\tkey.sysTripleClicked = false
+\t\tkey.lastUpdate = state.frameCounter
+\t}
 
-# generate raw unions fields
-def gen_union_fields(obj, file, indent):
-    if "fields" not in obj:
-        print(f"FIELDS MISSED in union")
-        return
+\t#partial switch action {
+\tcase .PRESS:
+\t\tif !key.down {
+\t\t\tkey.transitionCount += 1
+\t\t}
+\t\tkey.down = true
+\tcase .REPEAT:
+\t\tkey.repeatCount += 1
+\t\tkey.down = true
+\tcase .RELEASE:
+\t\tif key.down {
+\t\t\tkey.transitionCount += 1
+\t\t}
+\t\tkey.down = false
+\t}
+}
 
-    indent_str = indent_string(indent)
-    for field in obj["fields"]:
-        field_name = check_field_name(field["name"])
-        field_kind = get_inner_kind(field["type"], field_name)
+// Reset the mouse motion the first time the mouse changes in a frame.
+input_update_mouse_frame :: proc "contextless" (state: ^input_state) {
+\tif state.mouse.lastUpdate != state.frameCounter {
+\t\tstate.mouse.delta = {}
+\t\tstate.mouse.wheel = {}
+\t\tstate.mouse.lastUpdate = state.frameCounter
+\t}
+}
 
-        # name can be empty
-        if field_name == "":
-            field_name = "_"
+// Append a codepoint to the text input of the current frame.
+input_update_text :: proc "contextless" (state: ^input_state, codepoint: utf32) {
+\ttext := &state.text
+\tif text.lastUpdate != state.frameCounter {
+\t\ttext.codePoints = nil
+\t\ttext.lastUpdate = state.frameCounter
+\t}
 
-        # generate inner structs within a union
-        if field_kind == "struct":
-            gen_struct(field["type"], file, field_name, indent, True)
+\tcount := len(text.codePoints)
+\tif count < len(text.backing) {
+\t\ttext.backing[count] = codepoint
+\t\ttext.codePoints = str32(text.backing[:count + 1])
+\t} else {
+\t\tlog_warning("too many input codepoints per frame, dropping input")
+\t}
+}
 
-            # always comma separate
-            file.write(",\n")
-        elif field_kind == "array":
-            gen_fixed_array(field, file, field_name, indent)
+// Presses of a key in the current frame, the last transition counts when the key is down.
+input_key_press_count :: proc "contextless" (state: ^input_state, key: ^key_state) -> u8 {
+\tif key.lastUpdate != state.frameCounter {
+\t\treturn 0
+\t}
+
+\tcount := key.transitionCount / 2
+\tif key.down {
+\t\tcount += key.transitionCount & 1
+\t}
+\treturn u8(count)
+}
+
+// Releases of a key in the current frame, the last transition counts when the key is up.
+input_key_release_count :: proc "contextless" (state: ^input_state, key: ^key_state) -> u8 {
+\tif key.lastUpdate != state.frameCounter {
+\t\treturn 0
+\t}
+
+\tcount := key.transitionCount / 2
+\tif !key.down {
+\t\tcount += key.transitionCount & 1
+\t}
+\treturn u8(count)
+}
+
+""",
+}
+
+# canvas procs the recorder stores and replays, in enum order
+# only procs without a return value whose parameters are plain values or strings
+canvas_recorded_procs = [
+    "matrix_push",
+    "matrix_multiply_push",
+    "matrix_pop",
+    "clip_push",
+    "clip_pop",
+    "set_color",
+    "set_color_rgba",
+    "set_color_srgba",
+    "set_gradient",
+    "set_width",
+    "set_tolerance",
+    "set_joint",
+    "set_max_joint_excursion",
+    "set_cap",
+    "set_font",
+    "set_font_size",
+    "set_text_flip",
+    "set_image",
+    "set_image_source_region",
+    "move_to",
+    "line_to",
+    "quadratic_to",
+    "cubic_to",
+    "close_path",
+    "codepoints_outlines",
+    "text_outlines",
+    "clear",
+    "fill",
+    "stroke",
+    "rectangle_fill",
+    "rectangle_stroke",
+    "rounded_rectangle_fill",
+    "rounded_rectangle_stroke",
+    "ellipse_fill",
+    "ellipse_stroke",
+    "circle_fill",
+    "circle_stroke",
+    "arc",
+    "text_fill",
+    "image_draw",
+    "image_draw_region",
+]
+
+# setters mapped to the canvas state they overwrite
+# setters of the same state invalidate each other, a repeated call with the same value is dropped
+canvas_state_groups = {
+    "set_color": "color",
+    "set_color_rgba": "color",
+    "set_color_srgba": "color",
+    "set_gradient": "color",
+    "set_width": "width",
+    "set_tolerance": "tolerance",
+    "set_joint": "joint",
+    "set_max_joint_excursion": "max_joint_excursion",
+    "set_cap": "cap",
+    "set_font": "font",
+    "set_font_size": "font_size",
+    "set_text_flip": "text_flip",
+    "set_image": "image",
+    "set_image_source_region": "image_source_region",
+}
+
+# setters that also reset other canvas state on the host, the recorded values of those groups are forgotten
+canvas_state_resets = {
+    "set_image": ["image_source_region"],
+}
+
+# string parameters are copied into the recorder, mapped to their element type
+canvas_string_types = {
+    "str8": "u8",
+    "str32": "rune",
+}
+
+# fixed part of the recorder, the command specific parts are generated from the canvas procs
+canvas_recorder_header = """// Header in front of every recorded command, commands are aligned to 8 bytes.
+canvas_command_header :: struct {
+\tkind: canvas_command_kind,
+\tsize: u32,
+}
+
+"""
+
+canvas_recorder_procs = """// Records canvas commands into a fixed buffer, `canvas_recorder_flush` replays them to the host in one loop.
+// Setters whose value didn't change since the last recorded call are dropped.
+// Getters like `get_color` query the host and only see the state of flushed commands.
+canvas_recorder :: struct {
+\tbuffer: []u8,
+\tused: int,
+\tstrings: int,
+\tstate: canvas_recorder_state,
+\tcommands: u64,
+\telided: u64,
+\tflushes: u64,
+}
+
+// Initialize a recorder with a buffer of `capacity` bytes pushed onto `arena`.
+canvas_recorder_init :: proc "contextless" (rec: ^canvas_recorder, arena: ^arena, capacity: u64) {
+\trec^ = {}
+\trec.buffer = ([^]u8)(arena_push_aligned(arena, capacity, 8))[:capacity]
+}
+
+// Forget the recorded canvas state, needed after setting state on the host directly or selecting another canvas context.
+canvas_recorder_invalidate :: proc "contextless" (rec: ^canvas_recorder) {
+\trec.state = {}
+}
+
+// Reserve a command with `size` bytes of arguments and `extra` bytes for copied strings, flushing when the buffer is full.
+// Returns nil when the command doesn't fit into an empty buffer, the caller then calls the host directly.
+canvas_recorder_begin :: proc "contextless" (rec: ^canvas_recorder, kind: canvas_command_kind, size: int, extra: int) -> rawptr {
+\ttotal := (size_of(canvas_command_header) + size + extra + 7) &~ 7
+\tif rec.used + total > len(rec.buffer) {
+\t\tcanvas_recorder_flush(rec)
+
+\t\tif total > len(rec.buffer) {
+\t\t\treturn nil
+\t\t}
+\t}
+
+\tdata := raw_data(rec.buffer)
+\theader := (^canvas_command_header)(&data[rec.used])
+\theader^ = {kind, u32(total)}
+\targs := rawptr(&data[rec.used + size_of(canvas_command_header)])
+\trec.strings = rec.used + size_of(canvas_command_header) + size
+\trec.used += total
+\trec.commands += 1
+\treturn args
+}
+
+// Copy string data behind the arguments of the command reserved last.
+canvas_recorder_copy :: proc "contextless" (rec: ^canvas_recorder, src: rawptr, size: int) -> rawptr {
+\trec.strings = (rec.strings + 3) &~ 3
+\tdst := raw_data(rec.buffer)[rec.strings:]
+\tcopy(dst[:size], ([^]u8)(src)[:size])
+\trec.strings += size
+\treturn rawptr(dst)
+}
+
+// Replay the recorded commands and render them.
+canvas_recorder_render :: proc "contextless" (rec: ^canvas_recorder, renderer: canvas_renderer, _context: canvas_context, surface: surface) {
+\tcanvas_recorder_flush(rec)
+\tcanvas_render(renderer, _context, surface)
+}
+
+"""
+
+def canvas_command_name(proc):
+    return proc.name.upper()
+
+def canvas_args_name(proc):
+    return f"canvas_args_{proc.name}"
+
+# expression copying a string parameter into the recorder
+def canvas_string_copy(param):
+    element = canvas_string_types[param.type]
+    name = get_param_name(param)
+    size = f"len({name}) * size_of({element})"
+    return f"{param.type}(([^]{element})(canvas_recorder_copy(rec, raw_data({name}), {size}))[:len({name})])"
+
+# generate the record proc of a canvas proc, same parameters with the recorder in front
+# groups are the state groups the recorder tracks
+def gen_canvas_record_proc(proc, groups, out):
+    kind = canvas_command_name(proc)
+    args_name = canvas_args_name(proc)
+    names = get_forwarded_args(proc.params)
+    group = canvas_state_groups.get(proc.name)
+
+    out.append(f"// Record `{proc.name}`.\n")
+    out.append(f"record_{proc.name} :: proc \"contextless\" (rec: ^canvas_recorder")
+    for param in proc.params:
+        out.append(", ")
+        gen_param(param, out)
+    out.append(") {\n")
+
+    if len(proc.params) == 0:
+        out.append(f"\tif canvas_recorder_begin(rec, .{kind}, 0, 0) == nil {{\n")
+        out.append(f"\t\t{proc.name}()\n")
+        out.append("\t}\n")
+        out.append("}\n\n")
+        return
+
+    if group is not None:
+        out.append(f"\tvalue := {args_name}{{{names}}}\n")
+        out.append(f"\tif rec.state.{group} == .{kind} && rec.state.{proc.name} == value {{\n")
+        out.append("\t\trec.elided += 1\n")
+        out.append("\t\treturn\n")
+        out.append("\t}\n")
+        out.append(f"\trec.state.{group} = .{kind}\n")
+        out.append(f"\trec.state.{proc.name} = value\n")
+
+        for reset in canvas_state_resets.get(proc.name, ()):
+            if reset in groups:
+                out.append(f"\trec.state.{reset} = .NONE\n")
+
+        out.append("\n")
+
+    strings = [param for param in proc.params if param.type in canvas_string_types]
+    extra = " + ".join(f"len({get_param_name(param)}) * size_of({canvas_string_types[param.type]}) + 3" for param in strings) or "0"
+
+    out.append(f"\targs := (^{args_name})(canvas_recorder_begin(rec, .{kind}, size_of({args_name}), {extra}))\n")
+    out.append("\tif args == nil {\n")
+    out.append(f"\t\t{proc.name}({names})\n")
+    out.append("\t\treturn\n")
+    out.append("\t}\n")
+
+    if group is not None:
+        out.append("\targs^ = value\n")
+    else:
+        values = ", ".join(canvas_string_copy(param) if param.type in canvas_string_types else get_param_name(param) for param in proc.params)
+        out.append(f"\targs^ = {{{values}}}\n")
+
+    out.append("}\n\n")
+
+# generate the command recorder of the canvas module
+def gen_canvas_recorder(module, out):
+    procs_by_name = {proc.name: proc for proc in module.procs}
+    procs = [procs_by_name[name] for name in canvas_recorded_procs if name in procs_by_name]
+
+    if len(procs) == 0:
+        return
+
+    out.append("// Kind of a command recorded by a `canvas_recorder`.\n")
+    out.append("canvas_command_kind :: enum u32 {\n")
+    out.append("\tNONE,\n")
+    for proc in procs:
+        out.append(f"\t{canvas_command_name(proc)},\n")
+    out.append("}\n\n")
+
+    out.append(canvas_recorder_header)
+
+    for proc in procs:
+        if len(proc.params) == 0:
+            continue
+
+        out.append(f"// Arguments of a recorded `{proc.name}`.\n")
+        out.append(f"{canvas_args_name(proc)} :: struct {{\n")
+        for param in proc.params:
+            out.append(f"\t{get_param_name(param)}: {param.type},\n")
+        out.append("}\n\n")
+
+    # which setter wrote each piece of state last and the values of every setter
+    setters = [proc for proc in procs if proc.name in canvas_state_groups]
+    groups = list(dict.fromkeys(canvas_state_groups[proc.name] for proc in setters))
+    out.append("// Canvas state as last recorded, a group is NONE while the host state is unknown.\n")
+    out.append("canvas_recorder_state :: struct {\n")
+    for group in groups:
+        out.append(f"\t{group}: canvas_command_kind,\n")
+    for proc in setters:
+        out.append(f"\t{proc.name}: {canvas_args_name(proc)},\n")
+    out.append("}\n\n")
+
+    out.append(canvas_recorder_procs)
+
+    for proc in procs:
+        gen_canvas_record_proc(proc, groups, out)
+
+    out.append("// Replay every recorded command to the host and empty the buffer, the recorded state is kept.\n")
+    out.append("canvas_recorder_flush :: proc \"contextless\" (rec: ^canvas_recorder) {\n")
+    out.append("\tdata := raw_data(rec.buffer)\n")
+    out.append("\toffset := 0\n\n")
+    out.append("\tfor offset < rec.used {\n")
+    out.append("\t\theader := (^canvas_command_header)(&data[offset])\n")
+    out.append("\t\targs := rawptr(&data[offset + size_of(canvas_command_header)])\n")
+    out.append("\t\toffset += int(header.size)\n\n")
+    out.append("\t\t#partial switch header.kind {\n")
+    for proc in procs:
+        out.append(f"\t\tcase .{canvas_command_name(proc)}:\n")
+
+        if len(proc.params) == 0:
+            out.append(f"\t\t\t{proc.name}()\n")
         else:
-            file.write(f"{indent_str}{field_name}: {field_kind},\n")
+            values = ", ".join(f"a.{get_param_name(param)}" for param in proc.params)
+            out.append(f"\t\t\ta := (^{canvas_args_name(proc)})(args)\n")
+            out.append(f"\t\t\t{proc.name}({values})\n")
+    out.append("\t\t}\n")
+    out.append("\t}\n\n")
+    out.append("\trec.used = 0\n")
+    out.append("\trec.flushes += 1\n")
+    out.append("}\n\n")
 
-# fixed size array in C
-def gen_fixed_array(obj, file, field_name, indent):
-    indent_str = indent_string(indent)
-    variable_type = obj["type"]
-    array_size = variable_type["count"]
-    array_type = get_inner_kind(variable_type["type"], "")
-    file.write(f"{indent_str}{field_name}: [{array_size}]{array_type},\n")
+# font procs routed through the font cache, mapped to their font size and text parameters
+# procs returning text_metrics cache the metrics, procs returning str32 cache glyph indices written to their last parameter
+font_cached_procs = {
+    "font_text_metrics": ("fontSize", "text"),
+    "font_text_metrics_utf32": ("fontSize", "codepoints"),
+    "font_get_glyph_indices": (None, "codePoints"),
+}
 
-# write struct fields from objects
-def gen_struct_fields(obj, file, indent):
-    indent_str = indent_string(indent)
-    for field in obj["fields"]:
-        field_name = check_field_name(field["name"])
-        variable_output = get_inner_kind(field["type"], field_name)
+# generate the cache keys and the cached_ wrappers of the font procs
+def gen_font_cache(module, out):
+    procs = [proc for proc in module.procs if proc.name in font_cached_procs]
 
-        # write docs if they exist
-        if "doc" in field:
-            field_docs = field["doc"]
-            file.write(f"{indent_str}// {field_docs}\n")
+    if len(procs) == 0:
+        return
 
-        # convert inner unions to raw_unions structs
-        if variable_output == "union":
-            if field_name == "":
-                field_name = "using _"
+    out.append("// Proc a `font_cache_entry` caches the result of.\n")
+    out.append("font_cache_kind :: enum u32 {\n")
+    out.append("\tNONE,\n")
+    for proc in procs:
+        out.append(f"\t{proc.name.upper()},\n")
+    out.append("}\n\n")
 
-            file.write(f"{indent_str}{field_name}: struct #raw_union {{\n")
-            variable_type = field["type"]
-            gen_union_fields(variable_type, file, indent + 1)
-            file.write(f"{indent_str}}},\n")
-        elif variable_output == "array": 
-            gen_fixed_array(field, file, field_name, indent)
+    for proc in procs:
+        size_name, text_name = font_cached_procs[proc.name]
+        text_param = next(param for param in proc.params if get_param_name(param) == text_name)
+        element = canvas_string_types[text_param.type]
+        size = size_name or "0"
+        names = get_forwarded_args(proc.params)
+
+        out.append(f"// `{proc.name}` through `cache`.\n")
+        out.append(f"cached_{proc.name} :: proc \"contextless\" (cache: ^font_cache")
+        for param in proc.params:
+            out.append(", ")
+            gen_param(param, out)
+        out.append(f") -> {proc.ret} {{\n")
+        out.append(f"\thash := font_cache_hash(.{proc.name.upper()}, font, {size}, raw_data({text_name}), len({text_name}) * size_of({element}))\n")
+        out.append(f"\tentry := font_cache_find(cache, .{proc.name.upper()}, font, {size}, hash)\n\n")
+
+        if proc.ret == "str32":
+            backing = get_param_name(proc.params[-1])
+            out.append("\tif entry != nil {\n")
+            out.append(f"\t\tif glyphs, ok := font_cache_glyphs(cache, entry); ok && len(glyphs) <= len({backing}) {{\n")
+            out.append(f"\t\t\tcopy({backing}, glyphs)\n")
+            out.append(f"\t\t\treturn {backing}[:len(glyphs)]\n")
+            out.append("\t\t}\n")
+            out.append("\t}\n\n")
+            out.append(f"\tresult := {proc.name}({names})\n")
+            out.append("\tif entry == nil {\n")
+            out.append(f"\t\tentry = font_cache_insert(cache, .{proc.name.upper()}, font, {size}, hash)\n")
+            out.append("\t}\n")
+            out.append("\tif entry != nil {\n")
+            out.append("\t\tfont_cache_store_glyphs(cache, entry, result)\n")
+            out.append("\t}\n")
         else:
-            file.write(f"{indent_str}{field_name}: {variable_output}")
+            out.append("\tif entry != nil {\n")
+            out.append("\t\treturn entry.metrics\n")
+            out.append("\t}\n\n")
+            out.append(f"\tresult := {proc.name}({names})\n")
+            out.append(f"\tif entry = font_cache_insert(cache, .{proc.name.upper()}, font, {size}, hash); entry != nil {{\n")
+            out.append("\t\tentry.metrics = result\n")
+            out.append("\t}\n")
 
-            # some specific tags for field names, not perfect but atleast automatic
-            if field_name == "optionCount":
-                file.write(" `fmt:\"-\"`")
-            elif field_name == "options":
-                file.write(" `fmt:\"s,optionCount\"`")
+        out.append("\treturn result\n")
+        out.append("}\n\n")
 
-            file.write(",\n")
+# the event_type docs name the union arm carrying the details, e.g. "The `mouse` field contains the event's details."
+event_arm_doc_pattern = re.compile(r"The `(\w+)` field contains")
 
-def gen_structs_manually(file, name):
-    if name == "ui_layout":
-        file.write("""ui_layout :: struct {
-\taxis: ui_axis,
-\tspacing: f32,
-\tmargin: [2]f32,
-\talign: ui_layout_align,
-\toverflow: [2]ui_overflow,
-\tconstrain: [2]bool,
-}""")
-        return True
+# event types whose consecutive events of the same window are merged into the last one
+# mapped to the arm fields that are summed up instead of overwritten
+event_coalesced_types = {
+    "MOUSE_MOVE": ["deltaX", "deltaY"],
+    "WINDOW_RESIZE": [],
+    "WINDOW_MOVE": [],
+}
 
-    return False
+event_ring_procs = """// Initialize a ring holding `capacity` events pushed onto `arena`, rounded up to a power of two.
+event_ring_init :: proc "contextless" (ring: ^event_ring, arena: ^arena, capacity: u64) {
+\tsize := u64(1)
+\tfor size < capacity {
+\t\tsize <<= 1
+\t}
 
-# generate an odin struct with its fields
-def gen_struct(obj, file, name, indent, parent_raw_union):
-    indent_str = indent_string(indent)
+\tring^ = {}
+\tring.events = arena_push_array(arena, event, size)
+}
+
+event_ring_len :: proc "contextless" (ring: ^event_ring) -> u64 {
+\treturn ring.tail - ring.head
+}
+
+// Drop every queued event.
+event_ring_clear :: proc "contextless" (ring: ^event_ring) {
+\tring.head = ring.tail
+}
+
+// Call the handler of every queued event in order and empty the ring, once per frame.
+// Events pushed by a handler are dispatched in the same call.
+event_ring_dispatch :: proc "contextless" (ring: ^event_ring, handlers: ^event_handlers) {
+\tmask := u64(len(ring.events)) - 1
 
-    # just do this one manually
-    if gen_structs_manually(file, name):
+\tfor ring.head != ring.tail {
+\t\t// the slot is given back before its handler runs, events the handler pushes never merge into it
+\t\te := ring.events[ring.head & mask]
+\t\tring.head += 1
+
+\t\tif e.type >= min(event_type) && e.type <= max(event_type) {
+\t\t\tentry := handlers.table[e.type]
+
+\t\t\tif entry.call != nil {
+\t\t\t\tentry.call(entry.handler, handlers.data, &e)
+\t\t\t\tring.dispatched += 1
+\t\t\t}
+\t\t}
+\t}
+}
+
+// Push a recorded stream of events and dispatch them, e.g. to drive the handlers without a host.
+// The ring is dispatched early whenever it is full, so no event is lost.
+event_ring_replay :: proc "contextless" (ring: ^event_ring, handlers: ^event_handlers, events: []event) {
+\tfor &e in events {
+\t\tif event_ring_len(ring) >= u64(len(ring.events)) {
+\t\t\tevent_ring_dispatch(ring, handlers)
+\t\t}
+
+\t\tevent_ring_push(ring, &e)
+\t}
+
+\tevent_ring_dispatch(ring, handlers)
+}
+
+// Call `handler` for every `type` event.
+event_handlers_set :: proc "contextless" (handlers: ^event_handlers, type: event_type, handler: event_handler) {
+\thandlers.table[type] = {event_call, transmute(rawptr)handler}
+}
+
+@(private)
+event_call :: proc "contextless" (handler: rawptr, data: rawptr, e: ^event) {
+\t(transmute(event_handler)handler)(data, e)
+}
+
+"""
+
+# the event type constants and the arm named by their docs
+def get_event_arms(event_type, arms):
+    result = []
+
+    for const in event_type.constants:
+        match = event_arm_doc_pattern.search(const.doc or "")
+
+        if match is not None and match.group(1) in arms:
+            result.append((const.name, match.group(1)))
+
+    return result
+
+# generate a ring buffer the raw events are copied into and a dispatcher indexed by event_type
+# handlers of types with a union arm get a pointer to that arm
+def gen_event_ring(module, out):
+    nodes = {node.name: node for node in module.contents if isinstance(node, (Struct, Enum))}
+    event_type = nodes.get("event_type")
+    event = nodes.get("event")
+
+    if not isinstance(event_type, Enum) or not isinstance(event, Struct):
         return
-    
-    # if a struct doesnt have fields just skip fields
-    if "fields" not in obj:
-        file.write(f"{indent_str}{name} :: struct {{}}")
+
+    unions = [field.type for field in event.fields or () if isinstance(field.type, Union)]
+    if len(unions) != 1:
         return
 
-    # check if its a handle struct only, convert that into a distinct handle
-    if len(obj["fields"]) == 1:
-        field = obj["fields"][0]
-        field_name = check_field_name(field["name"])
+    arms = {field.name: field.type for field in unions[0].fields if isinstance(field.type, str)}
+    event_arms = get_event_arms(event_type, arms)
+    used_arms = list(dict.fromkeys(arm for _, arm in event_arms))
 
-        if field_name == "h":
-            file.write(f"{indent_str}{name} :: distinct u64")
-            return
+    out.append("// Union arm of `event` that is active for an event type.\n")
+    out.append("event_arm :: enum u8 {\n")
+    out.append("\tNONE,\n")
+    for arm in used_arms:
+        out.append(f"\t{arm.upper()},\n")
+    out.append("}\n\n")
 
-    seperator = " ::" if indent == 0 else ":"
-    
-    # insert USING for empty named struct name
-    prefix = ""
-    if parent_raw_union:
-        prefix = "using "
+    out.append("// Arm of every event type, indexed at runtime so it is a variable.\n")
+    out.append("event_type_arms := #partial [event_type]event_arm {\n")
+    for name, arm in event_arms:
+        out.append(f"\t.{name} = .{arm.upper()},\n")
+    out.append("}\n\n")
 
-    file.write(f"{indent_str}{prefix}{name}{seperator} struct {{\n")
-    gen_struct_fields(obj, file, indent + 1)
-    file.write(f"{indent_str}}}")
+    out.append("""// Events copied out of `oc_on_raw_event` without allocating, `event_ring_dispatch` drains them once per frame.
+// Single producer and consumer on the app thread, so no locks or atomics are involved.
+// Events are copied by value, the strings of a `paths` arm still point into memory of the host.
+event_ring :: struct {
+\tevents: []event,
+\t// Next event to dispatch.
+\thead: u64,
+\t// Next free slot.
+\ttail: u64,
+\tpushed: u64,
+\t// Events merged into the previous one instead of taking a slot.
+\tcoalesced: u64,
+\t// Events dropped because the ring was full.
+\toverflows: u64,
+\tdispatched: u64,
+}
 
-# constants to rename since their const version got removed
-enum_rename_list = {
-    "io_op_enum": "io_op",
-    "io_error_enum": "io_error",
+event_handler :: #type proc "contextless" (data: rawptr, e: ^event)
+
+""")
+
+    for arm in used_arms:
+        out.append(f"event_{arm}_handler :: #type proc \"contextless\" (data: rawptr, e: ^event, {arm}: ^{arms[arm]})\n")
+    out.append("\n")
+
+    out.append("""// An entry of the dispatch table, `call` casts `handler` back to its typed proc.
+event_handler_entry :: struct {
+\tcall: proc "contextless" (handler: rawptr, data: rawptr, e: ^event),
+\thandler: rawptr,
 }
 
-# gets the default enum name or a replacement
-def get_enum_name(name):
-    if name in enum_rename_list:
-        return enum_rename_list[name]
+// Dispatch table indexed by event type, `data` is passed to every handler.
+event_handlers :: struct {
+\ttable: [event_type]event_handler_entry,
+\tdata: rawptr,
+}
 
-    return name
+""")
 
-# specific typedefs to ignore generating, since they might be generated through enums separately
-# io_op <- io_op_enum
-# io_error <- io_error_enum
-typedef_ignore_list = {
-    "io_op",
-    "io_error", 
-    "file_dialog_flags", # duplicate
-    
-    # will be bit_set enums, see gen_enum_bit_set_combo
-    "file_open_flags",
-    "file_access",
-    "file_perm",
-    "ui_status",
-    "ui_style_mask",
+    coalesced = [name for name, _ in event_arms if name in event_coalesced_types]
+    arm_of = dict(event_arms)
+
+    out.append("// Copy an event into the ring, returns false and counts an overflow when it is full.\n")
+    out.append(f"// Consecutive {', '.join(coalesced)} events of the same window only keep the latest one.\n")
+    out.append("event_ring_push :: proc \"contextless\" (ring: ^event_ring, e: ^event) -> bool {\n")
+    out.append("\tmask := u64(len(ring.events)) - 1\n")
+    out.append("\tring.pushed += 1\n\n")
+
+    if len(coalesced) != 0:
+        out.append("\tif ring.tail != ring.head {\n")
+        out.append("\t\tlast := &ring.events[(ring.tail - 1) & mask]\n\n")
+        out.append("\t\tif last.type == e.type && last.window == e.window {\n")
+        out.append("\t\t\t#partial switch e.type {\n")
+
+        replaced = [name for name in coalesced if len(event_coalesced_types[name]) == 0]
+        for name in coalesced:
+            fields = event_coalesced_types[name]
+            if len(fields) == 0:
+                continue
+
+            arm = arm_of[name]
+            out.append(f"\t\t\tcase .{name}:\n")
+            for field_name in fields:
+                out.append(f"\t\t\t\t{field_name} := last.{arm}.{field_name} + e.{arm}.{field_name}\n")
+            out.append("\t\t\t\tlast^ = e^\n")
+            for field_name in fields:
+                out.append(f"\t\t\t\tlast.{arm}.{field_name} = {field_name}\n")
+            out.append("\t\t\t\tring.coalesced += 1\n")
+            out.append("\t\t\t\treturn true\n")
+
+        if len(replaced) != 0:
+            out.append(f"\t\t\tcase {', '.join('.' + name for name in replaced)}:\n")
+            out.append("\t\t\t\tlast^ = e^\n")
+            out.append("\t\t\t\tring.coalesced += 1\n")
+            out.append("\t\t\t\treturn true\n")
+
+        out.append("\t\t\t}\n")
+        out.append("\t\t}\n")
+        out.append("\t}\n\n")
+
+    out.append("\tif ring.tail - ring.head >= u64(len(ring.events)) {\n")
+    out.append("\t\tring.overflows += 1\n")
+    out.append("\t\treturn false\n")
+    out.append("\t}\n\n")
+    out.append("\tring.events[ring.tail & mask] = e^\n")
+    out.append("\tring.tail += 1\n")
+    out.append("\treturn true\n")
+    out.append("}\n\n")
+
+    out.append(event_ring_procs)
+
+    for arm in used_arms:
+        arm_type = arms[arm]
+        out.append(f"// Call `handler` with the `{arm}` arm of every `type` event, false when `type` events don't use that arm.\n")
+        out.append(f"event_handlers_set_{arm} :: proc \"contextless\" (handlers: ^event_handlers, type: event_type, handler: event_{arm}_handler) -> bool {{\n")
+        out.append(f"\tif event_type_arms[type] != .{arm.upper()} {{\n")
+        out.append("\t\treturn false\n")
+        out.append("\t}\n\n")
+        out.append(f"\thandlers.table[type] = {{event_call_{arm}, transmute(rawptr)handler}}\n")
+        out.append("\treturn true\n")
+        out.append("}\n\n")
+
+        out.append("@(private)\n")
+        out.append(f"event_call_{arm} :: proc \"contextless\" (handler: rawptr, data: rawptr, e: ^event) {{\n")
+        out.append(f"\t(transmute(event_{arm}_handler)handler)(data, e, &e.{arm})\n")
+        out.append("}\n\n")
+
+# generators appended to a module with the switch of gen_options enabling them
+# they render code derived from the modules procs and types
+module_generators = {
+    "Canvas": [("canvas_recorder", gen_canvas_recorder), ("font_cache", gen_font_cache)],
+    "Events": [("event_ring", gen_event_ring)],
 }
 
-# generates an odin constant
-def gen_typedef(obj, file, name, indent):
-    indent_str = indent_string(indent)
-    typedef_kind = obj["kind"]
+# foreign procs that can be wrapped, procs that dont return or take c varargs are left alone
+def is_counted_proc(proc):
+    if gen_options["calls"] != "counted" or proc.ret == "!":
+        return False
 
-    if name in typedef_ignore_list:
-        return
+    return not any(param.type.startswith("..") for param in proc.params)
 
-    file.write(f"{indent_str}{name} :: {typedef_kind}\n\n")
+# a counted proc is declared as host_<name> and called through a wrapper with its own name
+def gen_host_proc(proc, out):
+    out.append(f"\t@(link_name=\"oc_{proc.name}\")\n")
+    gen_proc(Proc(f"host_{proc.name}", proc.params, proc.ret), True, out, 1)
 
-# main object of the api which could be struct, union, enums or macros (unsupported)
-def gen_typename_object(obj, file, indent):
-    name = prefix_trim_oc(obj["name"])
-    try_gen_doc(obj, file, indent)
+# wrapper counting the calls and time of a host proc in its own call_slot, see call_stats_text
+def gen_counted_proc(proc, out):
+    try_gen_doc(proc.doc, out, 0)
+    out.append(f"{proc.name} :: proc \"contextless\" (")
 
-    # try looking for a builtin match and leave early if written
-    if gen_type_builtins(name, file, indent):
-        return
+    for index, param in enumerate(proc.params):
+        if index > 0:
+            out.append(", ")
 
-    variable_type = obj["type"]
-    kind = variable_type["kind"]
+        gen_param(param, out)
 
-    if kind == "struct":
-        gen_struct(variable_type, file, name, indent, False)
-        
-        # space out structs
-        file.write("\n\n")
-    elif kind == "union":
-        print(f"union not done {name}")
-        file.write(f"{name} :: union {{}}\n\n")
-    elif kind == "enum":
-        gen_enum(variable_type, file, name, indent)
-    elif kind == "proc":
-        gen_proc(variable_type, name, False, file, indent)
-        file.write("\n")
-    else: 
-        gen_typedef(variable_type, file, name, indent)
+    out.append(")")
 
-# step through the main module objects
-# procedures are written to a temp_block thats written once the module is stepped through
-def iterate_object(obj, file, shared_block):
-    if obj is None:
-        return
+    if proc.ret is not None:
+        out.append(f" -> {proc.ret}")
 
-    kind = obj["kind"]
-    if kind == "module":
-        gen_module_doc(obj, file)
+    names = get_forwarded_args(proc.params)
+    out.append(" {\n")
+    out.append(f"\t@(static) _slot := call_slot{{name = \"{proc.name}\"}}\n")
+    out.append("\t_start := call_slot_begin(&_slot)\n")
 
-    temp_block = io.StringIO("")
+    if proc.ret is not None:
+        out.append(f"\t_result := host_{proc.name}({names})\n")
+        out.append("\tcall_slot_end(&_slot, _start)\n")
+        out.append("\treturn _result\n")
+    else:
+        out.append(f"\thost_{proc.name}({names})\n")
+        out.append("\tcall_slot_end(&_slot, _start)\n")
 
-    if "contents" in obj:
-        for child in obj["contents"]:
-            iterate_object(child, file, temp_block)
+    out.append("}\n\n")
 
-    # finally write the procedures into the foreign block
-    if kind == "module":
-        module_size = temp_block.tell()
+# write the foreign block of a module followed by its native procs, helpers and generated extras
+def gen_module_procs(module, out):
+    foreign_procs = [proc for proc in module.procs if proc.body is None]
 
-        # skip empty modules
-        if module_size != 0:
-            file.write(f"@(default_calling_convention=\"c\", link_prefix=\"oc_\")\nforeign {{\n")
-            file.write(temp_block.getvalue())
-            file.write("}\n\n")
+    # skip empty modules
+    if len(foreign_procs) != 0:
+        out.append(f"@(default_calling_convention=\"c\", link_prefix=\"oc_\")\nforeign {{\n")
 
-        temp_block.seek(0)
+        for proc in foreign_procs:
+            if is_counted_proc(proc):
+                gen_host_proc(proc, out)
+            else:
+                gen_proc(proc, True, out, 1)
 
-    temp_block.close()
+        out.append("}\n\n")
 
-    if kind == "proc":
-        proc_name = obj["name"]
-        gen_proc(obj, proc_name, True, shared_block, 1)
-    elif kind == "typename":
-        gen_typename_object(obj, file, 0)
+    for proc in foreign_procs:
+        if is_counted_proc(proc):
+            gen_counted_proc(proc, out)
 
-# write package info and types
-def write_package(file):
-    file.write("""// Bindings for the Orca platform
-//
-// See: [[ https://orca-app.dev ]]
+    for proc in module.procs:
+        if proc.body is not None:
+            gen_native_proc(proc, out)
 
-package orca
+    if module.extras is not None:
+        out.append(module.extras)
+    else:
+        gen_module_extras(module, out)
 
-import "core:c"
+# hand-written helpers and generated code that follow the procs of a module
+def gen_module_extras(module, out):
+    if module.name in native_module_helpers and any(proc.body is not None for proc in module.procs):
+        out.append(native_module_helpers[module.name])
 
-char :: c.char
+    if has_module_helpers(module.name):
+        out.append(module_helpers[module.name])
 
-// currently missing in the api.json
-pool :: struct {
-\tarena: arena,
-\tfreeList: list,
-\tblockSize: u64,
+    for option, generator in module_generators.get(module.name, ()):
+        if gen_options[option]:
+            generator(module, out)
+
+# add indentation 
+def indent_string(indent):
+    return "\t" * indent
+
+# write spacers and actual module docs
+def gen_module_doc(module, out):
+    spacer = "//" * 40
+    out.append(spacer + "\n")
+    out.append(f"// {module.brief}\n")
+    out.append(spacer + "\n" * 2)
+
+# easier builtins instead of struct+unions
+type_builtins = {
+    "vec2": "[2]f32",
+    "vec3": "[3]f32",
+    "vec2i": "[2]i32",
+    "vec4": "[4]f32",
+    "mat2x3": "[6]f32",
+    "rect": "struct { x, y, w, h: f32 }",
+    "color": "struct { using c: [4]f32, colorSpace: color_space }",
+
+    "ui_layout_align": "[2]ui_align",
+    "ui_box_size": "[2]ui_size",
+    "ui_box_floating": "[2]bool",
+    
+    "mat2x3": "[6]f32",
+    
+    "utf32": "rune",
+    "str8": "string",
+    "str16": "distinct []u16",
+    "str32": "distinct []rune",
 }
 
-""")
+# get the enum size (u64, i32, etc)
+def get_enum_sizing(obj):
+    return obj["type"]["kind"]
 
-def write_unicode_constants(file):
-    file.write("""UNICODE_BASIC_LATIN :: unicode_range { 0x0000, 127 }
-UNICODE_C1_CONTROLS_AND_LATIN_1_SUPPLEMENT :: unicode_range { 0x0080, 127 }
-UNICODE_LATIN_EXTENDED_A :: unicode_range { 0x0100, 127 }
-UNICODE_LATIN_EXTENDED_B :: unicode_range { 0x0180, 207 }
-UNICODE_IPA_EXTENSIONS :: unicode_range { 0x0250, 95 }
-UNICODE_SPACING_MODIFIER_LETTERS :: unicode_range { 0x02b0, 79 }
-UNICODE_COMBINING_DIACRITICAL_MARKS :: unicode_range { 0x0300, 111 }
-UNICODE_GREEK_COPTIC :: unicode_range { 0x0370, 143 }
-UNICODE_CYRILLIC :: unicode_range { 0x0400, 255 }
-UNICODE_CYRILLIC_SUPPLEMENT :: unicode_range { 0x0500, 47 }
-UNICODE_ARMENIAN :: unicode_range { 0x0530, 95 }
-UNICODE_HEBREW :: unicode_range { 0x0590, 111 }
-UNICODE_ARABIC :: unicode_range { 0x0600, 255 }
-UNICODE_SYRIAC :: unicode_range { 0x0700, 79 }
-UNICODE_THAANA :: unicode_range { 0x0780, 63 }
+# since prefixes dont always match the enum name, the table is easier
+enum_prefixes_specific = {
+    "OC_UI_OVERFLOW_",
+    "OC_UI_MASK_",
+    "OC_UI_DRAW_MASK_",
+    "OC_LOG_LEVEL_",
+    "OC_EVENT_",
+    "OC_KEY_",
+    "OC_SCANCODE_",
+    "OC_KEYMOD_",
+    "OC_MOUSE_",
+    "OC_FILE_DIALOG_",
+    "OC_FILE_OPEN_",
+    "OC_FILE_ACCESS_",
+    "OC_FILE_SEEK_",
+    "OC_IO_ERR_",
+    "OC_GRADIENT_BLEND_",
+    "OC_COLOR_SPACE_",
+    "OC_JOINT_",
+    "OC_CAP_",
+    "OC_INPUT_TEXT_",
+    "OC_UI_AXIS_",
+    "OC_UI_ALIGN_",
+    "OC_UI_SIZE_",
+    "OC_UI_STYLE_",
+    "OC_UI_SEL_",
+    "OC_UI_FLAG_",
+    "OC_UI_FLAG_",
+    "OC_UI_EDIT_MOVE_",
+    "OC_UTF8_",
+    "OC_CLOCK_",
+}
+
+enum_prefixes_fully = {
+    "OC_UI_OVERFLOW_X",
+    "OC_UI_OVERFLOW_Y",
+    "OC_UI_ALIGN_X",
+    "OC_UI_ALIGN_Y",
+}
+
+# checked after the specific prefixes, see enum_prefix_tiers
+enum_prefixes_broad = {
+    "OC_FILE_",
+    "OC_UI_",
+    "OC_IO_",
+}
+
+# explicit priority of the prefix tables, a match in an earlier tier always wins
+# [0] = prefixes of the tier
+# [1] = the part that is stripped from the name, None strips the matched prefix itself
+enum_prefix_tiers = [
+    [enum_prefixes_fully, "OC_UI_"],
+    [enum_prefixes_specific, None],
+    [enum_prefixes_broad, None],
+]
+
+# compile the prefix tables into a trie of nested dicts
+# the "" key of a node holds (tier, strip length) when a prefix ends there
+def compile_enum_prefixes():
+    root = {}
+
+    for tier, (prefixes, base) in enumerate(enum_prefix_tiers):
+        for prefix in prefixes:
+            node = root
+            for char in prefix:
+                node = node.setdefault(char, {})
+
+            strip = len(prefix) if base is None else len(base)
+
+            # the same prefix in multiple tiers keeps the highest priority
+            if "" not in node or node[""][0] > tier:
+                node[""] = (tier, strip)
+
+    return root
+
+enum_prefix_trie = compile_enum_prefixes()
+enum_name_memo = {}
+
+# fixup enum names based on prefixes
+# the longest prefix of the highest priority tier wins, independent of set ordering
+def simplify_enum_name(name):
+    if name in enum_name_memo:
+        return enum_name_memo[name]
+
+    best = None
+    node = enum_prefix_trie
+    for char in name:
+        node = node.get(char)
+        if node is None:
+            break
+
+        # deeper matches are longer, so they replace matches of the same tier
+        match = node.get("")
+        if match is not None and (best is None or match[0] <= best[0]):
+            best = match
+
+    result = name
+    if best is not None:
+        result = name[best[1]:]
+
+    enum_name_memo[name] = result
+    return result
+
+# safety check since enum field names cant be only numbers
+# 0 would be turned to _0
+def check_enum_name_decimal(name):
+    if name.isdecimal():
+        return "_" + name
+
+    return name
+
+# enums that should be converted to bit_set backing enums for nicer odin interop
+# [0] = the wanted enum name
+# [1] = the output bit_set name (may be used in parameters or fields types)
+# [2] = bit_set sizing (can't rely on the enum size)
+enum_bit_sets_list = {
+    "keymod_flags": ["keymod_flag", "keymod_flags", "u32", 0],
+    "file_dialog_flags": ["file_dialog_flag", "file_dialog_flags", "u32", 0],
+    "file_open_flags_enum": ["file_open_flag", "file_open_flags", "u16", 0],
+    "file_access_enum": ["file_access_flag", "file_access", "u16", 0],
+    "file_perm_enum": ["file_perm_flag", "file_perm", "u16", 0],
+}
+
+# build an enum from its constants, bit_set backing enums drop their NONE value
+def build_enum(obj, name, doc):
+    singleton = len(obj["constants"]) <= 1 or name == ""
+    name = get_enum_name(name)
+
+    if name in enum_bit_sets_list:
+        constants = []
+        for const in obj["constants"]:
+            const_name = simplify_enum_name(const["name"])
+
+            if const_name == "NONE":
+                continue
+
+            constants.append(Constant(const_name, None, const.get("doc")))
+
+        return Enum(name, None, constants, False, enum_bit_sets_list[name], False, doc)
+
+    sizing = None
+    if not singleton:
+        sizing = get_enum_sizing(obj)
+
+    constants = []
+    truncated = False
+    for const in obj["constants"]:
+        real_name = const["name"]
+
+        # Exception for OC_STYLE currently, write out constant names
+        if real_name.startswith("OC_UI_STYLE"):
+            truncated = True
+            break
+
+        const_name = simplify_enum_name(real_name)
+        const_name = check_enum_name_decimal(const_name)
+        constants.append(Constant(const_name, const["value"], const.get("doc")))
+
+    return Enum(name, sizing, constants, singleton, None, truncated, doc)
+
+def gen_enum_bit_set_combo(enum, out, indent):
+    indent_str = indent_string(indent)
+    enum_name = enum.bit_set[0]
+    bitset_name = enum.bit_set[1]
+    enum_sizing = enum.bit_set[2] # gotta use the same sizing for both, the origin enum
+    enum_start_offset = enum.bit_set[3] # some enums have the first real unit at 1 or 2, which can cause issues
+    out.append(f"{indent_str}{enum_name} :: enum {enum_sizing} {{\n")
+
+    # do not write out the value names of bit_set backing enum values
+    fields_indent_str = indent_string(indent + 1)
+    for index, const in enumerate(enum.constants):
+        # write docs if they exist
+        if const.doc is not None:
+            out.append(f"{fields_indent_str}// {const.doc}\n")
+
+        out.append(f"{fields_indent_str}{const.name}")
+
+        # odin bit_set should start at 1
+        if index == 0:
+            out.append(f" = {enum_start_offset}")
+
+        out.append(",\n")
+
+    out.append(f"{indent_str}}}\n")
+    out.append(f"{indent_str}{bitset_name} :: bit_set[{enum_name}; {enum_sizing}]\n\n")
+
+# generates an odin enum e.g. log_level :: enum { ... }
+def gen_enum(enum, out, indent):
+    if enum.bit_set is not None:
+        gen_enum_bit_set_combo(enum, out, indent)
+        return
+
+    indent_str = indent_string(indent)
+
+    # write enum description when not a singleton
+    if not enum.singleton:
+        out.append(f"{indent_str}{enum.name} :: enum {enum.sizing} {{\n")
+        fields_indent_str = indent_string(indent + 1)
+    else:
+        fields_indent_str = indent_str
+
+    # make it a constant instead of an enum asignment
+    assignment = "::" if enum.singleton else "="
+    separator = "\n" if enum.singleton else ",\n"
+
+    # write enum content
+    for const in enum.constants:
+        # write docs if they exist
+        if const.doc is not None:
+            out.append(f"{fields_indent_str}// {const.doc}\n")
+
+        out.append(f"{fields_indent_str}{const.name} {assignment} {const.value}{separator}")
+
+    if enum.truncated:
+        return
+
+    if enum.singleton:
+        out.append("\n")
+    else:
+        out.append(f"{indent_str}}}\n\n")
+
+# any oddities that need to be checked for field
+reserved_field_names = {
+    "matrix",
+    "proc",
+    "color", # issues when color is also return type...
+}
+
+# insert a _ before an identifier that may be invalid
+def check_field_name(name):
+    if name in reserved_field_names:
+        return "_" + name
+
+    return name
+
+# build raw union fields, inner structs are kept as Struct
+def build_union(obj):
+    if "fields" not in obj:
+        print(f"FIELDS MISSED in union")
+        return Union([])
+
+    fields = []
+    for field in obj["fields"]:
+        field_name = check_field_name(field["name"])
+        field_kind = get_inner_kind(field["type"], field_name)
+
+        # name can be empty
+        if field_name == "":
+            field_name = "_"
+
+        if field_kind == "struct":
+            field_kind = build_struct(field["type"], field_name, None)
+        elif field_kind == "array":
+            field_kind = get_fixed_array_kind(field)
+
+        fields.append(Field(field_name, field_kind))
+
+    return Union(fields)
+
+# generate raw unions fields
+def gen_union_fields(union, out, indent):
+    indent_str = indent_string(indent)
+    for field in union.fields:
+        # generate inner structs within a union
+        if isinstance(field.type, Struct):
+            gen_struct(field.type, out, indent, True)
+
+            # always comma separate
+            out.append(",\n")
+        else:
+            out.append(f"{indent_str}{field.name}: {field.type},\n")
+
+# fixed size array in C
+def get_fixed_array_kind(obj):
+    variable_type = obj["type"]
+    array_size = variable_type["count"]
+    array_type = get_inner_kind(variable_type["type"], "")
+    return f"[{array_size}]{array_type}"
+
+# some specific tags for field names, not perfect but atleast automatic
+field_tag_list = {
+    "optionCount": "`fmt:\"-\"`",
+    "options": "`fmt:\"s,optionCount\"`",
+}
+
+# build struct fields from objects
+def build_struct_fields(obj):
+    fields = []
+    for field in obj["fields"]:
+        field_name = check_field_name(field["name"])
+        variable_output = get_inner_kind(field["type"], field_name)
+        tag = None
+
+        # convert inner unions to raw_unions structs
+        if variable_output == "union":
+            if field_name == "":
+                field_name = "using _"
+
+            variable_output = build_union(field["type"])
+        elif variable_output == "array": 
+            variable_output = get_fixed_array_kind(field)
+        else:
+            tag = field_tag_list.get(field_name)
+
+        fields.append(Field(field_name, variable_output, field.get("doc"), tag))
+
+    return fields
+
+# write struct fields
+def gen_struct_fields(fields, out, indent):
+    indent_str = indent_string(indent)
+    for field in fields:
+        # write docs if they exist
+        if field.doc is not None:
+            out.append(f"{indent_str}// {field.doc}\n")
+
+        if isinstance(field.type, Union):
+            out.append(f"{indent_str}{field.name}: struct #raw_union {{\n")
+            gen_union_fields(field.type, out, indent + 1)
+            out.append(f"{indent_str}}},\n")
+        elif field.tag is not None:
+            out.append(f"{indent_str}{field.name}: {field.type} {field.tag},\n")
+        else:
+            out.append(f"{indent_str}{field.name}: {field.type},\n")
+
+# structs that are written manually instead
+struct_manual_list = {
+    "ui_layout": """struct {
+\taxis: ui_axis,
+\tspacing: f32,
+\tmargin: [2]f32,
+\talign: ui_layout_align,
+\toverflow: [2]ui_overflow,
+\tconstrain: [2]bool,
+}""",
+}
+
+# build a struct, fields stay None if a struct doesnt have fields
+def build_struct(obj, name, doc):
+    fields = None
+    if "fields" in obj:
+        fields = build_struct_fields(obj)
+
+    return Struct(name, fields, doc)
+
+# generate an odin struct with its fields
+def gen_struct(struct, out, indent, parent_raw_union):
+    indent_str = indent_string(indent)
+    name = struct.name
+
+    # if a struct doesnt have fields just skip fields
+    if struct.fields is None:
+        out.append(f"{indent_str}{name} :: struct {{}}")
+        return
+
+    # check if its a handle struct only, convert that into a distinct handle
+    if len(struct.fields) == 1 and struct.fields[0].name == "h":
+        out.append(f"{indent_str}{name} :: distinct u64")
+        return
+
+    seperator = " ::" if indent == 0 else ":"
+    
+    # insert USING for empty named struct name
+    prefix = ""
+    if parent_raw_union:
+        prefix = "using "
+
+    out.append(f"{indent_str}{prefix}{name}{seperator} struct {{\n")
+    gen_struct_fields(struct.fields, out, indent + 1)
+    out.append(f"{indent_str}}}")
+
+# constants to rename since their const version got removed
+enum_rename_list = {
+    "io_op_enum": "io_op",
+    "io_error_enum": "io_error",
+}
+
+# gets the default enum name or a replacement
+def get_enum_name(name):
+    if name in enum_rename_list:
+        return enum_rename_list[name]
+
+    return name
+
+# specific typedefs to ignore generating, since they might be generated through enums separately
+# io_op <- io_op_enum
+# io_error <- io_error_enum
+typedef_ignore_list = {
+    "io_op",
+    "io_error", 
+    "file_dialog_flags", # duplicate
+    
+    # will be bit_set enums, see gen_enum_bit_set_combo
+    "file_open_flags",
+    "file_access",
+    "file_perm",
+    "ui_status",
+    "ui_style_mask",
+}
+
+# generates an odin constant
+def gen_typedef(typedef, out, indent):
+    if typedef.type is None:
+        return
+
+    indent_str = indent_string(indent)
+    out.append(f"{indent_str}{typedef.name} :: {typedef.type}\n\n")
+
+# main object of the api which could be struct, union, enums or macros (unsupported)
+def build_typename_object(obj):
+    name = get_typename(obj["name"])
+    doc = obj.get("doc")
+
+    # easier builtins instead of complex xy or xywh C struct+union pairs
+    if name in type_builtins:
+        return Typedef(name, type_builtins[name], doc)
+
+    if name in struct_manual_list:
+        return Typedef(name, struct_manual_list[name], doc)
+
+    variable_type = obj["type"]
+    kind = variable_type["kind"]
+
+    if kind == "struct":
+        return build_struct(variable_type, name, doc)
+    elif kind == "union":
+        print(f"union not done {name}")
+        return Typedef(name, "union {}", doc)
+    elif kind == "enum":
+        return build_enum(variable_type, name, doc)
+    elif kind == "proc":
+        proc = build_proc(variable_type, name)
+
+        # the typename doc is written by gen_proc
+        if proc is not None:
+            proc.doc = variable_type.get("doc", doc)
+            return proc
+
+        return Typedef(name, None, doc)
+    elif name in typedef_ignore_list:
+        return Typedef(name, None, doc)
+    else: 
+        return Typedef(name, kind, doc)
+
+def gen_typename_object(node, out, indent):
+    if isinstance(node, Proc):
+        gen_proc(node, False, out, indent)
+        out.append("\n")
+        return
+
+    try_gen_doc(node.doc, out, indent)
+
+    if isinstance(node, Struct):
+        gen_struct(node, out, indent, False)
+        
+        # space out structs
+        out.append("\n\n")
+    elif isinstance(node, Enum):
+        gen_enum(node, out, indent)
+    else: 
+        gen_typedef(node, out, indent)
+
+# step through the main module objects
+# procedures are collected separately and written into the foreign block once the module is done
+def iterate_object(obj, module, cache):
+    kind = obj["kind"]
+    if kind == "module":
+        module.contents.append(build_module(obj, cache))
+    elif kind == "proc":
+        proc = build_proc(obj, obj["name"])
+
+        if proc is not None:
+            module.procs.append(proc)
+    elif kind == "typename":
+        module.contents.append(build_typename_object(obj))
+
+# build a module and its children
+# modules whose subtree is unchanged since the last run get their text from the cache
+def build_module(obj, cache):
+    module = Module(obj["name"], obj["brief"])
+
+    if cache is not None:
+        if id(obj) not in cache.keys:
+            hash_module_tree(obj, cache.keys)
+
+        module.key = cache.keys[id(obj)]
+        module.text = cache.get(module.key)
+
+        if module.text is not None:
+            return module
+
+    if "contents" in obj:
+        for child in obj["contents"]:
+            iterate_object(child, module, cache)
+
+    return module
+
+# write a module doc, its children and finally the procedures into the foreign block
+# every module is joined into its own buffer, which is what gets cached
+def gen_module(module, out, cache):
+    if module.text is not None:
+        cache.keep(module.key)
+        out.append(module.text)
+        return
+
+    module_out = []
+    gen_module_doc(module, module_out)
+
+    for node in module.contents:
+        if isinstance(node, Module):
+            gen_module(node, module_out, cache)
+        else:
+            gen_typename_object(node, module_out, 0)
+
+    gen_module_procs(module, module_out)
+
+    text = "".join(module_out)
+    if cache is not None:
+        child_keys = [node.key for node in module.contents if isinstance(node, Module)]
+        cache.put(module.key, text, child_keys)
+
+    out.append(text)
+
+# file names of modules whose own name isnt descriptive enough, the rest use their slugged name
+module_file_names = {
+    "Core": "ui_core",
+    "Widgets": "ui_widgets",
+}
+
+def get_module_file_name(name):
+    if name in module_file_names:
+        result = module_file_names[name]
+    else:
+        result = "".join(char if char.isalnum() else "_" for char in name.lower())
+
+    return f"orca_{result}.odin"
+
+# split variant of gen_module, renders each module with own content into its own file text
+# nested modules end up in their own files, modules with only nested modules have no file
+def gen_module_files(module, files, cache):
+    if module.text is not None:
+        cache.keep(module.key)
+        files.update(module.text)
+        return
+
+    module_files = {}
+    own_out = []
+
+    for node in module.contents:
+        if isinstance(node, Module):
+            gen_module_files(node, module_files, cache)
+        else:
+            gen_typename_object(node, own_out, 0)
+
+    has_extras = has_module_helpers(module.name)
+    if module.extras is not None:
+        has_extras = module.extras != ""
+
+    if len(own_out) != 0 or len(module.procs) != 0 or has_extras:
+        module_out = []
+
+        # every file needs its own imports
+        imports = get_native_imports(module.name)
+        for path in imports:
+            module_out.append(f"import \"{path}\"\n")
+
+        if len(imports) != 0:
+            module_out.append("\n")
+
+        gen_module_doc(module, module_out)
+        module_out.extend(own_out)
+        gen_module_procs(module, module_out)
+
+        file_name = get_module_file_name(module.name)
+        if file_name in module_files:
+            raise ValueError(f"module {module.name} clashes with a nested module file {file_name}")
+
+        module_files[file_name] = "".join(module_out)
+
+    if cache is not None:
+        child_keys = [node.key for node in module.contents if isinstance(node, Module)]
+        cache.put(module.key, module_files, child_keys)
+
+    files.update(module_files)
+
+# hash an api.json subtree by its content, independent of key order
+def hash_object(obj):
+    data = json.dumps(obj, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+# hash the text of a top-level module as it is in api.json
+# much cheaper than serializing the parsed module again, but formatting changes make it a miss
+def hash_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+# digests of a module and every module inside it, keyed by object identity
+# bottom-up, so every subtree is serialized once and modules only hash the digests of their contents
+def hash_module_tree(obj, keys):
+    contents = []
+
+    for child in obj.get("contents", ()):
+        if child["kind"] == "module":
+            contents.append(hash_module_tree(child, keys))
+        else:
+            contents.append(hash_object(child))
+
+    shallow = {key: value for key, value in obj.items() if key != "contents"}
+    shallow["contents"] = contents
+
+    digest = hash_object(shallow)
+    keys[id(obj)] = digest
+    return digest
+
+# every table that changes the generated output, see rules_fingerprint
+def get_rule_tables():
+    return {
+        "proc_ignore_list": proc_ignore_list,
+        "type_builtins": type_builtins,
+        "enum_prefixes_specific": enum_prefixes_specific,
+        "enum_prefixes_fully": enum_prefixes_fully,
+        "enum_prefixes_broad": enum_prefixes_broad,
+        "enum_bit_sets_list": enum_bit_sets_list,
+        "reserved_field_names": reserved_field_names,
+        "buffer_field_names": buffer_field_names,
+        "enum_rename_list": enum_rename_list,
+        "typedef_ignore_list": typedef_ignore_list,
+        "field_tag_list": field_tag_list,
+        "struct_manual_list": struct_manual_list,
+        "module_file_names": module_file_names,
+        "native_algebra_procs": native_algebra_procs,
+        "native_algebra_simd_procs": native_algebra_simd_procs,
+        "native_input_procs": native_input_procs,
+        "native_utf8_procs": native_utf8_procs,
+        "native_module_imports": native_module_imports,
+        "native_module_helpers": native_module_helpers,
+        "native_module_options": native_module_options,
+        "module_helpers": module_helpers,
+        "module_helper_options": module_helper_options,
+        "module_generators": {name: [option for option, _ in generators] for name, generators in module_generators.items()},
+        "file_io_helpers_text": file_io_helpers_text,
+        "canvas_recorded_procs": canvas_recorded_procs,
+        "canvas_state_groups": canvas_state_groups,
+        "canvas_state_resets": canvas_state_resets,
+        "canvas_string_types": canvas_string_types,
+        "font_cached_procs": font_cached_procs,
+        "event_arm_doc_pattern": event_arm_doc_pattern.pattern,
+        "event_coalesced_types": event_coalesced_types,
+    }
+
+# fingerprint of the generator itself, cached modules are only valid for the same fingerprint
+# the source is hashed as well so changes to the emitters also invalidate the cache
+# options are the command line switches that change the output
+def rules_fingerprint(options):
+    digest = hashlib.sha256()
+
+    with open(__file__, "rb") as source_file:
+        digest.update(source_file.read())
+
+    # sets are sorted so the fingerprint doesnt depend on hash randomization
+    tables = json.dumps(get_rule_tables(), sort_keys=True, default=sorted)
+    digest.update(tables.encode("utf-8"))
+    digest.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+# on-disk cache of generated module text keyed by the module subtree hash
+# each entry remembers its nested modules, so they survive a hit on their parent
+# entries that weren't used during a run are dropped on save
+class ModuleCache:
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.entries = {}
+        self.used = {}
+        self.hits = 0
+        self.misses = 0
+        self.keys = {} # subtree digests of the top-level module being built
+
+        # in-memory only, used by the worker processes
+        if path is None or not os.path.exists(path):
+            return
+
+        try:
+            with open(path, "r") as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return
+
+        # rule tables or the generator changed, everything is dirty
+        if data.get("fingerprint") == fingerprint:
+            self.entries = data.get("modules", {})
+
+    def get(self, key):
+        entry = self.entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry["text"]
+
+    # new modules are hits for the rest of the run and for later runs in --watch
+    def put(self, key, text, child_keys):
+        entry = {
+            "text": text,
+            "children": child_keys,
+        }
+
+        self.entries[key] = entry
+        self.used[key] = entry
+
+    # start counting a new run, the entries stay available
+    def reset_run(self):
+        self.used = {}
+        self.hits = 0
+        self.misses = 0
+
+    # mark a cached module and all of its nested modules as used
+    def keep(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+
+        self.used[key] = entry
+        for child_key in entry["children"]:
+            self.keep(child_key)
+
+    def save(self):
+        data = {
+            "fingerprint": self.fingerprint,
+            "modules": self.used,
+        }
+
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as cache_file:
+            json.dump(data, cache_file)
+
+        os.replace(temp_path, self.path)
+
+# render a single top-level module into its own buffer
+# when split the result is a dict of file names to their text instead
+# a top-level module is keyed by its text in api.json when it's given, so hits never serialize it
+# nested modules are only hashed when their top-level module misses
+def render_module(obj, text, cache, split):
+    # digests are keyed by identity, which is only unique while the module is alive
+    if cache is not None:
+        cache.keys = {}
+
+        if text is not None:
+            cache.keys[id(obj)] = hash_text(text)
+
+    return render_built_module(build_module(obj, cache), cache, split)
+
+def render_built_module(module, cache, split):
+    if split:
+        files = {}
+        gen_module_files(module, files, cache)
+        return files
+
+    out = []
+    gen_module(module, out, cache)
+    return "".join(out)
+
+# per process cache of a worker, filled once by init_worker
+worker_cache = None
+
+def init_worker(options, fingerprint, entries):
+    global worker_cache
+    gen_options.update(options)
+
+    if entries is not None:
+        worker_cache = ModuleCache(None, fingerprint)
+        worker_cache.entries = entries
+
+# renders a module in a worker and hands back the text plus what the cache did
+def render_module_job(module, text, split):
+    cache = worker_cache
+    if cache is None:
+        return render_module(module, text, None, split), None, 0, 0
+
+    cache.reset_run()
+    result = render_module(module, text, cache, split)
+    return result, cache.used, cache.hits, cache.misses
+
+# characters a token cut off by the end of a chunk can consist of: numbers, true, false and null
+partial_token_pattern = re.compile(r"[-+.0-9A-Za-z]*")
+
+# a decode error might only mean the module continues in the next chunk
+# anything else is a syntax error that no further input can fix
+def is_partial_module(buffer, error):
+    if error.msg.startswith("Unterminated string"):
+        return True
+
+    if error.msg.startswith("Invalid \\uXXXX escape"):
+        return len(buffer) - error.pos < 6
+
+    return partial_token_pattern.fullmatch(buffer, error.pos) is not None
+
+# parse the top-level array of api.json one module at a time
+# only the module currently being decoded is kept in memory, not the whole document
+# syntax errors are raised as soon as they are read, modules before them have been yielded already
+def iter_api_modules(api_file, chunk_size=1 << 16):
+    for module, _ in iter_api_module_texts(api_file, chunk_size):
+        yield module
+
+# iter_api_modules yielding every module together with its text in api.json
+def iter_api_module_texts(api_file, chunk_size=1 << 16):
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    offset = 0 # position of buffer[0] in the document
+    eof = False
+    read_size = chunk_size
+
+    # what is read next: "[", the "first" module or "]", a "module", "," or "]", only whitespace at the "end"
+    expect = "["
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n":
+            pos += 1
+
+        if pos == len(buffer):
+            if eof:
+                if expect == "end":
+                    return
+
+                raise ValueError("api.json ended before the closing ]")
+
+            chunk = api_file.read(read_size)
+            eof = chunk == ""
+            offset += pos
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        char = buffer[pos]
+
+        if expect == "[":
+            if char != "[":
+                raise ValueError("api.json has to contain a top-level array of modules")
+
+            pos += 1
+            expect = "first"
+            continue
+
+        if expect == "end":
+            raise ValueError(f"api.json has data after the closing ] at offset {offset + pos}")
+
+        if expect == ",":
+            if char == ",":
+                expect = "module"
+            elif char == "]":
+                expect = "end"
+            else:
+                raise ValueError(f"api.json expected , or ] after a module at offset {offset + pos}")
+
+            pos += 1
+            continue
+
+        if char == "]" and expect == "first":
+            pos += 1
+            expect = "end"
+            continue
+
+        try:
+            module, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as error:
+            if eof or not is_partial_module(buffer, error):
+                raise ValueError(f"api.json {error.msg} at offset {offset + error.pos}") from None
+
+            # module isnt complete yet, grow the read size to keep the retries linear
+            chunk = api_file.read(read_size)
+            eof = chunk == ""
+            offset += pos
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            read_size = max(read_size, len(buffer))
+            continue
+
+        if not isinstance(module, dict):
+            raise ValueError(f"api.json modules have to be objects at offset {offset + pos}")
+
+        # drop the consumed text before handing the module out
+        text = buffer[pos:end]
+        offset += end
+        buffer = buffer[end:]
+        pos = 0
+        read_size = chunk_size
+        expect = ","
+        yield module, text
+
+# render every top-level module and yield the results in the original order
+# with jobs > 1 modules are rendered in a process pool, the output matches the serial path
+# api_desc can be any iterable of modules and their text, e.g. iter_api_module_texts, only a few modules are in flight at once
+def render_modules(api_desc, cache, jobs, split):
+    if jobs <= 1:
+        for module, text in api_desc:
+            yield render_module(module, text, cache, split)
+
+        return
+
+    fingerprint = None
+    entries = None
+    if cache is not None:
+        fingerprint = cache.fingerprint
+        entries = cache.entries
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=init_worker,
+        initargs=(gen_options, fingerprint, entries),
+    ) as executor:
+        pending = collections.deque()
+
+        # futures are consumed in submission order
+        def take_result(future):
+            result, used, hits, misses = future.result()
+
+            if cache is not None:
+                cache.entries.update(used)
+                cache.used.update(used)
+                cache.hits += hits
+                cache.misses += misses
+
+            return result
+
+        for module, text in api_desc:
+            pending.append(executor.submit(render_module_job, module, text, split))
+
+            # bound the modules in flight
+            if len(pending) >= jobs * 2:
+                yield take_result(pending.popleft())
+
+        while pending:
+            yield take_result(pending.popleft())
+
+# write every top-level module into a single file
+def gen_modules(api_desc, file, cache, jobs):
+    for text in render_modules(api_desc, cache, jobs, False):
+        file.write(text)
+
+# emitters that are timed with --profile
+profiled_emitters = [
+    "build_module",
+    "build_typename_object",
+    "build_struct",
+    "build_struct_fields",
+    "build_union",
+    "build_enum",
+    "build_proc",
+    "build_param",
+    "gen_module",
+    "gen_typename_object",
+    "gen_struct",
+    "gen_struct_fields",
+    "gen_union_fields",
+    "gen_enum",
+    "gen_enum_bit_set_combo",
+    "gen_proc",
+    "gen_param",
+    "gen_typedef",
+    "gen_doc",
+]
+
+# records calls and times of the profiled emitters and of every module
+# times are inclusive, self excludes the time spent in nested profiled calls
+class Profiler:
+    def __init__(self, trace):
+        self.emitters = {} # name -> [calls, total, self]
+        self.modules = {} # module path -> [nodes, total]
+        self.stack = [] # [start, child time]
+        self.module_path = []
+        self.trace = trace
+        self.events = []
+        self.origin = time.perf_counter()
+
+    def begin(self):
+        self.stack.append([time.perf_counter(), 0.0])
+
+    def end(self, name):
+        start, child_time = self.stack.pop()
+        now = time.perf_counter()
+        elapsed = now - start
+
+        if len(self.stack) != 0:
+            self.stack[-1][1] += elapsed
+
+        stats = self.emitters.setdefault(name, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] += elapsed - child_time
+
+        # chrome trace events are in microseconds
+        if self.trace:
+            self.events.append({
+                "name": name,
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": elapsed * 1e6,
+                "pid": 0,
+                "tid": 0,
+            })
+
+        return elapsed
+
+    # wrap an emitter so every call is recorded under its name
+    def wrap_emitter(self, func):
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self.begin()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.end(name)
+
+        return wrapper
+
+    # wrap the module builder and renderer, both are attributed to the module path
+    def wrap_module(self, func, get_name):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self.module_path.append(get_name(args[0]))
+            path = "/".join(self.module_path)
+            self.begin()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                elapsed = self.end(path)
+                self.module_path.pop()
+
+            stats = self.modules.setdefault(path, [0, 0.0])
+            stats[1] += elapsed
+
+            # count the nodes once, when the module was built
+            if isinstance(result, Module):
+                stats[0] = len(result.contents) + len(result.procs)
+
+            return result
+
+        return wrapper
+
+    def report(self):
+        print("emitter                     calls      total       self")
+        for name, stats in sorted(self.emitters.items(), key=lambda item: item[1][2], reverse=True):
+            if name in self.modules:
+                continue
+
+            calls, total, self_time = stats
+            print(f"{name:<24} {calls:>8} {total * 1000:>8.2f}ms {self_time * 1000:>8.2f}ms")
+
+        print()
+        print("module                      nodes      total")
+        for path, stats in sorted(self.modules.items(), key=lambda item: item[1][1], reverse=True):
+            nodes, total = stats
+            print(f"{path:<24} {nodes:>8} {total * 1000:>8.2f}ms")
+
+    def write_trace(self, path):
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": self.events}, trace_file)
+
+# swap the emitters for recording wrappers, without --profile nothing is wrapped
+def enable_profiling(trace):
+    profiler = Profiler(trace)
+    module_globals = globals()
+
+    for name in profiled_emitters:
+        func = module_globals[name]
+
+        if name == "build_module":
+            module_globals[name] = profiler.wrap_module(func, lambda obj: obj["name"])
+        elif name == "gen_module":
+            module_globals[name] = profiler.wrap_module(func, lambda module: module.name)
+        else:
+            module_globals[name] = profiler.wrap_emitter(func)
+
+    return profiler
+
+# write package info and types
+# imports are the extra packages needed by the code following in the same file
+def write_package(file, imports):
+    file.write("""// Bindings for the Orca platform
+//
+// See: [[ https://orca-app.dev ]]
+
+package orca
+
+import "core:c"
+""")
+
+    for path in imports:
+        file.write(f"import \"{path}\"\n")
+
+    file.write("""
+char :: c.char
+
+// currently missing in the api.json
+pool :: struct {
+\tarena: arena,
+\tfreeList: list,
+\tblockSize: u64,
+}
+
+""")
+
+def write_unicode_constants(file):
+    file.write("""UNICODE_BASIC_LATIN :: unicode_range { 0x0000, 127 }
+UNICODE_C1_CONTROLS_AND_LATIN_1_SUPPLEMENT :: unicode_range { 0x0080, 127 }
+UNICODE_LATIN_EXTENDED_A :: unicode_range { 0x0100, 127 }
+UNICODE_LATIN_EXTENDED_B :: unicode_range { 0x0180, 207 }
+UNICODE_IPA_EXTENSIONS :: unicode_range { 0x0250, 95 }
+UNICODE_SPACING_MODIFIER_LETTERS :: unicode_range { 0x02b0, 79 }
+UNICODE_COMBINING_DIACRITICAL_MARKS :: unicode_range { 0x0300, 111 }
+UNICODE_GREEK_COPTIC :: unicode_range { 0x0370, 143 }
+UNICODE_CYRILLIC :: unicode_range { 0x0400, 255 }
+UNICODE_CYRILLIC_SUPPLEMENT :: unicode_range { 0x0500, 47 }
+UNICODE_ARMENIAN :: unicode_range { 0x0530, 95 }
+UNICODE_HEBREW :: unicode_range { 0x0590, 111 }
+UNICODE_ARABIC :: unicode_range { 0x0600, 255 }
+UNICODE_SYRIAC :: unicode_range { 0x0700, 79 }
+UNICODE_THAANA :: unicode_range { 0x0780, 63 }
 UNICODE_DEVANAGARI :: unicode_range { 0x0900, 127 }
 UNICODE_BENGALI_ASSAMESE :: unicode_range { 0x0980, 127 }
 UNICODE_GURMUKHI :: unicode_range { 0x0a00, 127 }
@@ -758,28 +2983,1176 @@ UNICODE_SUPPLEMENTARY_PRIVATE_USE_AREA_A :: unicode_range { 0xf0000, 65533 }
 UNICODE_SUPPLEMENTARY_PRIVATE_USE_AREA_B  :: unicode_range { 0x100000, 65533 }
 """)
 
-def write_helpers(file):
-    file.write("""
-file_write_slice :: proc(file: file, slice: []char) -> u64 {
-\treturn file_write(file, u64(len(slice)), raw_data(slice))
+# hand-written helpers of orca.odin, split into declarations when --roots filters them
+helpers_text = """
+file_write_slice :: proc(file: file, slice: []char) -> u64 {
+\treturn file_write(file, u64(len(slice)), raw_data(slice))
+}
+
+file_read_slice :: proc(file: file, slice: []char) -> u64 {
+\treturn file_read(file, u64(len(slice)), raw_data(slice))
+}
+"""
+
+# buffered file i/o, written with the helpers when --file-io
+file_io_helpers_text = """
+// Read the rest of a file into memory pushed onto `arena`, the size is queried once from its status.
+file_read_entire :: proc(arena: ^arena, file: file) -> ([]char, io_error) {
+\tend := file_get_status(file).size
+\tpos := u64(max(file_pos(file), 0))
+
+\t// nothing is left when the position is at or past the end
+\tsize := end - pos if pos < end else 0
+\tdata := arena_push_array(arena, char, size)
+\tread: u64 = 0
+
+\tfor read < size {
+\t\tn := file_read(file, size - read, raw_data(data[read:]))
+\t\tif n == 0 {
+\t\t\treturn data[:read], file_last_error(file)
+\t\t}
+\t\tread += n
+\t}
+
+\treturn data, .OK
+}
+
+// Reads a file in chunks of `len(buffer)`, the buffer is owned by the caller and can be reused.
+file_reader :: struct {
+\tfile: file,
+\tbuffer: []char,
+\tstart: int,
+\tend: int,
+\terror: io_error,
+}
+
+file_reader_init :: proc(reader: ^file_reader, file: file, buffer: []char) {
+\treader^ = {
+\t\tfile   = file,
+\t\tbuffer = buffer,
+\t}
+}
+
+// Buffered bytes that haven't been consumed, reads the next chunk when the buffer is empty.
+file_reader_fill :: proc(reader: ^file_reader) -> []char {
+\tif reader.start == reader.end {
+\t\tn := file_read_slice(reader.file, reader.buffer)
+\t\treader.start = 0
+\t\treader.end = int(n)
+
+\t\tif n == 0 {
+\t\t\treader.error = file_last_error(reader.file)
+\t\t}
+\t}
+
+\treturn reader.buffer[reader.start:reader.end]
+}
+
+// Read up to `len(dst)` bytes, reads of at least a whole chunk bypass the buffer.
+// Returns the number of bytes read, less than `len(dst)` at the end of the file or on errors.
+file_reader_read :: proc(reader: ^file_reader, dst: []char) -> int {
+\ttotal := 0
+
+\tfor total < len(dst) {
+\t\tif reader.start == reader.end && len(dst) - total >= len(reader.buffer) {
+\t\t\tn := int(file_read_slice(reader.file, dst[total:]))
+\t\t\tif n == 0 {
+\t\t\t\treader.error = file_last_error(reader.file)
+\t\t\t\tbreak
+\t\t\t}
+\t\t\ttotal += n
+\t\t\tcontinue
+\t\t}
+
+\t\tbuffered := file_reader_fill(reader)
+\t\tif len(buffered) == 0 {
+\t\t\tbreak
+\t\t}
+
+\t\tn := copy(dst[total:], buffered)
+\t\treader.start += n
+\t\ttotal += n
+\t}
+
+\treturn total
+}
+
+// Collects writes in `buffer` and writes them to the file in chunks of `len(buffer)`.
+file_writer :: struct {
+\tfile: file,
+\tbuffer: []char,
+\tused: int,
+\terror: io_error,
+}
+
+file_writer_init :: proc(writer: ^file_writer, file: file, buffer: []char) {
+\twriter^ = {
+\t\tfile   = file,
+\t\tbuffer = buffer,
+\t}
+}
+
+// Write the buffered bytes to the file, returns false on errors.
+file_writer_flush :: proc(writer: ^file_writer) -> bool {
+\tif writer.used == 0 {
+\t\treturn true
+\t}
+
+\tpending := writer.buffer[:writer.used]
+\twriter.used = 0
+
+\tif file_write_slice(writer.file, pending) != u64(len(pending)) {
+\t\twriter.error = file_last_error(writer.file)
+\t\treturn false
+\t}
+\treturn true
+}
+
+// Buffer `src`, writes of at least a whole chunk go straight to the file. Returns false on errors.
+file_writer_write :: proc(writer: ^file_writer, src: []char) -> bool {
+\tif writer.used + len(src) > len(writer.buffer) && !file_writer_flush(writer) {
+\t\treturn false
+\t}
+
+\tif len(src) >= len(writer.buffer) {
+\t\tif file_write_slice(writer.file, src) != u64(len(src)) {
+\t\t\twriter.error = file_last_error(writer.file)
+\t\t\treturn false
+\t\t}
+\t\treturn true
+\t}
+
+\twriter.used += copy(writer.buffer[writer.used:], src)
+\treturn true
+}
+
+// A read of `buffer` at `offset` in `file`, run by `file_read_ops`.
+file_read_op :: struct {
+\tfile: file,
+\toffset: i64,
+\tbuffer: []char,
+\t// Bytes read, set by `file_read_ops`.
+\tsize: u64,
+\terror: io_error,
 }
 
-file_read_slice :: proc(file: file, slice: []char) -> u64 {
-\treturn file_read(file, u64(len(slice)), raw_data(slice))
+// Run the reads of `ops` one after another, each as a seek and a read request.
+// Orca only waits on single requests, so every read still costs two round trips to the host.
+// Returns false when any of them failed, the error is stored in the op.
+file_read_ops :: proc(ops: []file_read_op) -> bool {
+\tok := true
+
+\tfor &op, index in ops {
+\t\tseek := io_req {
+\t\t\tid     = io_req_id(2 * index),
+\t\t\top     = .SEEK,
+\t\t\thandle = op.file,
+\t\t\toffset = op.offset,
+\t\t}
+\t\tseek.whence = .SET
+\t\tcmp := io_wait_single_req(&seek)
+
+\t\tif cmp.error == .OK {
+\t\t\tread := io_req {
+\t\t\t\tid     = io_req_id(2 * index + 1),
+\t\t\t\top     = .READ,
+\t\t\t\thandle = op.file,
+\t\t\t\tsize   = u64(len(op.buffer)),
+\t\t\t}
+\t\t\tread.buffer = raw_data(op.buffer)
+\t\t\tcmp = io_wait_single_req(&read)
+\t\t}
+
+\t\top.error = cmp.error
+\t\tif cmp.error == .OK {
+\t\t\top.size = cmp.size
+\t\t} else {
+\t\t\top.size = 0
+\t\t\tok = false
+\t\t}
+\t}
+
+\treturn ok
 }
-""")
+"""
+
+# shared part of the counted foreign procs, written with the helpers when --calls counted
+call_stats_text = """
+// Calls and time spent in a host proc, linked into `call_slots` on its first call.
+call_slot :: struct {
+\tname: cstring,
+\tnext: ^call_slot,
+\tregistered: bool,
+\t// Totals since the start, time in seconds.
+\tcalls: u64,
+\ttime: f64,
+\t// Totals since the last `call_stats_next_frame`.
+\tframe_calls: u64,
+\tframe_time: f64,
+}
+
+// Every host proc called so far, most recently registered first.
+call_slots: ^call_slot
+
+// Not the counted clock_time, so measuring doesn't count itself.
+@(default_calling_convention="c")
+foreign {
+\t@(link_name="oc_clock_time")
+\tcall_stats_clock :: proc(clock: clock_kind) -> f64 ---
+}
+
+call_slot_begin :: proc "contextless" (slot: ^call_slot) -> f64 {
+\tif !slot.registered {
+\t\tslot.registered = true
+\t\tslot.next = call_slots
+\t\tcall_slots = slot
+\t}
+
+\treturn call_stats_clock(.MONOTONIC)
+}
+
+call_slot_end :: proc "contextless" (slot: ^call_slot, start: f64) {
+\telapsed := call_stats_clock(.MONOTONIC) - start
+\tslot.calls += 1
+\tslot.time += elapsed
+\tslot.frame_calls += 1
+\tslot.frame_time += elapsed
+}
+
+// Start a new frame, the frame totals of every slot are reset.
+call_stats_next_frame :: proc "contextless" () {
+\tfor slot := call_slots; slot != nil; slot = slot.next {
+\t\tslot.frame_calls = 0
+\t\tslot.frame_time = 0
+\t}
+}
+
+@(private)
+call_slot_less :: proc "contextless" (a, b: ^call_slot, by_calls: bool) -> bool {
+\tif by_calls {
+\t\treturn a.frame_calls < b.frame_calls
+\t}
+
+\treturn a.frame_time < b.frame_time
+}
+
+// Fill `top` with the procs that took the most time this frame, or were called the most with `by_calls`.
+// Returns the filled part of `top`, e.g. pass a `[8]^call_slot` for the top 8.
+call_stats_top :: proc "contextless" (top: []^call_slot, by_calls := false) -> []^call_slot {
+\tcount := 0
+
+\tfor slot := call_slots; slot != nil; slot = slot.next {
+\t\tif slot.frame_calls == 0 {
+\t\t\tcontinue
+\t\t}
+
+\t\t// insert into the sorted prefix, the last entry falls off when it is full
+\t\tindex := count
+\t\tfor index > 0 && call_slot_less(top[index - 1], slot, by_calls) {
+\t\t\tif index < len(top) {
+\t\t\t\ttop[index] = top[index - 1]
+\t\t\t}
+\t\t\tindex -= 1
+\t\t}
+
+\t\tif index < len(top) {
+\t\t\ttop[index] = slot
+\t\t\tcount = min(count + 1, len(top))
+\t\t}
+\t}
+
+\treturn top[:count]
+}
+
+// Log the procs of `call_stats_top`, call before `call_stats_next_frame`.
+call_stats_log :: proc "contextless" (top: []^call_slot, by_calls := false) {
+\tfor slot in call_stats_top(top, by_calls) {
+\t\tlog_ext(
+\t\t\t.INFO,
+\t\t\t"call_stats_log",
+\t\t\t#file,
+\t\t\t#line,
+\t\t\t"%s: %llu calls, %.3f ms",
+\t\t\tslot.name,
+\t\t\tslot.frame_calls,
+\t\t\tslot.frame_time * 1000,
+\t\t)
+\t}
+}
+"""
+
+# hand-written helpers of the output, depends on gen_options
+def get_helpers_text():
+    if gen_options["file_io"]:
+        return helpers_text + file_io_helpers_text
+
+    return helpers_text
+
+def write_helpers(file, kept=None):
+    text = get_helpers_text()
+
+    if kept is None:
+        file.write(text)
+    else:
+        file.write(filter_declarations(text, kept))
+
+    if gen_options["calls"] == "counted":
+        file.write(call_stats_text)
+
+# identifiers in odin text, comments are stripped before searching
+identifier_pattern = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+comment_pattern = re.compile(r"//[^\n]*")
+
+# top-level declarations of hand-written odin text: constants, procs and types, the ones inside
+# a foreign block and global variables
+declaration_pattern = re.compile(r"^\t?([A-Za-z_][A-Za-z0-9_]*) ::|^([A-Za-z_][A-Za-z0-9_]*) :=", re.MULTILINE)
+
+def declaration_names(text):
+    return [constant or variable for constant, variable in declaration_pattern.findall(text)]
+
+def text_identifiers(text):
+    return set(identifier_pattern.findall(comment_pattern.sub("", text)))
+
+# names a node declares in the output
+def declared_names(node):
+    if isinstance(node, Enum):
+        if node.bit_set is not None:
+            return [node.bit_set[0], node.bit_set[1]]
+
+        if node.singleton:
+            return [const.name for const in node.constants]
+
+    return [node.name]
+
+# identifiers of types, inline structs and unions
+def type_identifiers(value, result):
+    if isinstance(value, str):
+        result.update(identifier_pattern.findall(value))
+    elif isinstance(value, (Struct, Union)):
+        for field in value.fields or ():
+            type_identifiers(field.type, result)
+
+# identifiers a node refers to, through field types, params, returns, values and native bodies
+def referenced_names(node):
+    result = set()
+
+    if isinstance(node, Proc):
+        for param in node.params:
+            type_identifiers(param.type, result)
+
+        if node.ret is not None:
+            type_identifiers(node.ret, result)
+
+        if node.body is not None:
+            result.update(text_identifiers(node.body))
+    elif isinstance(node, Enum):
+        if node.bit_set is not None:
+            type_identifiers(node.bit_set[2], result)
+        elif node.sizing is not None:
+            type_identifiers(node.sizing, result)
+
+        for const in node.constants:
+            type_identifiers(str(const.value), result)
+    elif isinstance(node, Struct):
+        type_identifiers(node, result)
+    elif isinstance(node, Typedef) and node.type is not None:
+        type_identifiers(node.type, result)
+
+    return result
+
+# split hand-written odin text into declarations at blank lines outside of braces
+# joining the chunks gives back the text
+def split_declarations(text):
+    chunks = []
+    current = []
+    depth = 0
+
+    for line in text.splitlines(keepends=True):
+        current.append(line)
+        code = comment_pattern.sub("", line)
+        depth += code.count("{") - code.count("}")
+
+        if depth == 0 and line.strip() == "":
+            chunks.append("".join(current))
+            current = []
+
+    if len(current) != 0:
+        chunks.append("".join(current))
+
+    return chunks
+
+# keep the declarations of hand-written text that declare a kept name, text without declarations stays
+def filter_declarations(text, kept):
+    out = []
+
+    for chunk in split_declarations(text):
+        names = declaration_names(chunk)
+
+        if len(names) == 0 or any(name in kept for name in names):
+            out.append(chunk)
+
+    return "".join(out)
+
+# declarations and their references of hand-written text
+def add_text_declarations(text, references, module_names):
+    for chunk in split_declarations(text):
+        names = declaration_names(chunk)
+        identifiers = text_identifiers(chunk)
+
+        for name in names:
+            references.setdefault(name, set()).update(identifiers)
+            module_names.append(name)
+
+# collect what every node of a module declares and references
+# the module extras are rendered from the whole module once, pruning filters them afterwards
+def add_module_declarations(module, references, module_names):
+    names = []
+
+    for node in module.contents:
+        if isinstance(node, Module):
+            add_module_declarations(node, references, module_names)
+            names.extend(module_names[node.name])
+            continue
+
+        identifiers = referenced_names(node)
+        for name in declared_names(node):
+            references.setdefault(name, set()).update(identifiers)
+            names.append(name)
+
+    for proc in module.procs:
+        references.setdefault(proc.name, set()).update(referenced_names(proc))
+        names.append(proc.name)
+
+    extras = []
+    gen_module_extras(module, extras)
+    module.extras = "".join(extras)
+
+    extras_names = []
+    add_text_declarations(module.extras, references, extras_names)
+    names.extend(extras_names)
+    module_names[module.name] = names
+
+# drop every node without a kept name, nested modules left empty are dropped entirely
+def prune_module(module, kept):
+    result = Module(module.name, module.brief)
+
+    for node in module.contents:
+        if isinstance(node, Module):
+            child = prune_module(node, kept)
+
+            if child is not None:
+                result.contents.append(child)
+        elif any(name in kept for name in declared_names(node)):
+            result.contents.append(node)
+
+    result.procs = [proc for proc in module.procs if proc.name in kept]
+    result.extras = filter_declarations(module.extras, kept)
+
+    if len(result.contents) == 0 and len(result.procs) == 0 and result.extras == "":
+        return None
+
+    return result
+
+# hand-written odin files next to the output are compiled with it, so everything they use is a root
+# generated files are skipped: the output itself and split module files
+def hand_written_identifiers(odin_path):
+    result = set()
+    directory = os.path.dirname(odin_path) or "."
+
+    for file_name in sorted(os.listdir(directory)):
+        path = os.path.join(os.path.dirname(odin_path), file_name)
+
+        if not file_name.endswith(".odin") or os.path.abspath(path) == os.path.abspath(odin_path):
+            continue
+
+        with open(path, "r") as odin_file:
+            text = odin_file.read()
+
+        if not text.startswith(split_file_header):
+            result.update(text_identifiers(text))
+
+    return result
+
+@dataclass(slots=True)
+class Subset:
+    modules: list # pruned top-level modules
+    kept: set # kept declaration names
+    dropped: list # names of dropped declarations
+
+# build every module and keep the transitive closure of the roots
+# roots are odin names (an oc_ prefix is trimmed) or module names, which keep the whole module
+def build_subset(api_path, odin_path, roots):
+    references = {}
+    module_names = {}
+    modules = []
+
+    with open(api_path, "r") as api_file:
+        for obj in iter_api_modules(api_file):
+            module = build_module(obj, None)
+            add_module_declarations(module, references, module_names)
+            modules.append(module)
+
+    helper_names = []
+    add_text_declarations(get_helpers_text(), references, helper_names)
+
+    pending = []
+    unknown = []
+    for root in roots:
+        if root in module_names:
+            pending.extend(module_names[root])
+        elif root in references:
+            pending.append(root)
+        elif prefix_trim_oc(root) in references:
+            pending.append(prefix_trim_oc(root))
+        else:
+            unknown.append(root)
+
+    if len(unknown) != 0:
+        raise ValueError(f"unknown roots: {', '.join(unknown)}")
+
+    # the package header, the unicode table and the hand-written files are always written
+    always = io.StringIO()
+    write_package(always, [])
+    write_unicode_constants(always)
+    pending.extend(text_identifiers(always.getvalue()))
+
+    if gen_options["calls"] == "counted":
+        pending.extend(text_identifiers(call_stats_text))
+    pending.extend(hand_written_identifiers(odin_path))
+
+    kept = set()
+    while pending:
+        name = pending.pop()
+
+        if name in kept or name not in references:
+            continue
+
+        kept.add(name)
+        pending.extend(references[name])
+
+    pruned = []
+    for module in modules:
+        module = prune_module(module, kept)
+
+        if module is not None:
+            pruned.append(module)
+
+    dropped = sorted(name for name in references if name not in kept)
+    return Subset(pruned, kept, dropped)
+
+# a module, typename, proc, struct field or enum constant of api.json with the digest of its subtree
+@dataclass(slots=True)
+class HashNode:
+    kind: str
+    name: str
+    digest: str
+    obj: dict
+    children: dict = field(default_factory=dict) # (kind, name) to HashNode, in api.json order
+
+# lists of a typename type that are hashed member by member
+typename_member_lists = {
+    "struct": ("fields", "field"),
+    "union": ("fields", "field"),
+    "enum": ("constants", "constant"),
+}
+
+def add_hash_child(node, child):
+    key = (child.kind, child.name)
+
+    # unnamed union members and other duplicates are told apart by their index among the same key
+    # so inserting an unrelated member doesn't shift them
+    index = 0
+    while key in node.children:
+        index += 1
+        key = (child.kind, f"{child.name}#{index}")
+
+    node.children[key] = child
+
+# hash a subtree bottom-up, a node hashes its own keys and the digests of its children
+# so two trees only need to be descended where their digests differ
+def hash_symbol_tree(obj, kind, name):
+    node = HashNode(kind, name, "", obj)
+    shallow = obj
+
+    if kind == "module":
+        digests = []
+
+        for child in obj.get("contents", ()):
+            child_node = hash_symbol_tree(child, child["kind"], child.get("name", ""))
+            add_hash_child(node, child_node)
+            digests.append(child_node.digest)
+
+        shallow = dict(obj, contents=digests)
+    elif kind == "typename":
+        variable_type = obj["type"]
+        list_key, member_kind = typename_member_lists.get(variable_type["kind"], (None, None))
+
+        if list_key is not None and list_key in variable_type:
+            digests = []
+
+            for member in variable_type[list_key]:
+                member_node = HashNode(member_kind, member.get("name", ""), hash_object(member), member)
+                add_hash_child(node, member_node)
+                digests.append(member_node.digest)
+
+            shallow = dict(obj, type=dict(variable_type, **{list_key: digests}))
+
+    node.digest = hash_object(shallow)
+    return node
+
+# rendered odin text without comments and blank lines
+def strip_spelling(out):
+    lines = []
+
+    for line in "".join(out).splitlines():
+        line = line.strip()
+
+        if line != "" and not line.startswith("//"):
+            lines.append(line)
+
+    return lines
+
+# odin spelling of a typename or proc, None when nothing is generated for it
+def symbol_spelling(node):
+    out = []
+
+    # unsupported unions print while building
+    with contextlib.redirect_stdout(io.StringIO()):
+        if node.kind == "proc":
+            built = build_proc(node.obj, node.obj["name"])
+        else:
+            built = build_typename_object(node.obj)
+
+    if built is None or isinstance(built, Typedef) and built.type is None:
+        return None
+
+    if isinstance(built, Proc):
+        gen_proc(Proc(built.name, built.params, built.ret), True, out, 1)
+        return "\n".join(strip_spelling(out)).removesuffix(" ---")
+
+    gen_typename_object(built, out, 0)
+    return "\n".join(strip_spelling(out))
+
+def member_spelling(node):
+    if node.kind == "constant":
+        name = check_enum_name_decimal(simplify_enum_name(node.obj["name"]))
+        return f"{name} = {node.obj['value']}"
+
+    out = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        gen_struct_fields(build_struct_fields({"fields": [node.obj]}), out, 0)
+
+    return " ".join(strip_spelling(out)).removesuffix(",")
+
+def symbol_name(node):
+    if node.kind == "module":
+        return node.name
+
+    return prefix_trim_oc(node.name)
+
+# the typename kind (struct, enum, ...) is more telling than "typename"
+def symbol_kind(node):
+    if node.kind == "typename":
+        return node.obj["type"]["kind"]
+
+    return node.kind
+
+def symbol_entry(node, module_path):
+    entry = {
+        "kind": symbol_kind(node),
+        "name": symbol_name(node),
+        "module": "/".join(module_path),
+    }
+
+    if node.kind != "module":
+        entry["odin"] = symbol_spelling(node)
+
+    return entry
+
+# a whole module was added or removed, list it and everything inside it
+def report_module_symbols(node, module_path, entries):
+    entries.append(symbol_entry(node, module_path))
+
+    if node.kind == "module":
+        for child in node.children.values():
+            report_module_symbols(child, module_path + [node.name], entries)
+
+# changed fields and constants of a typename
+def diff_members(old, new):
+    members = []
+
+    for key, new_member in new.children.items():
+        old_member = old.children.get(key)
+
+        if old_member is None:
+            members.append({"change": "added", "kind": new_member.kind, "name": new_member.name, "new": member_spelling(new_member)})
+        elif old_member.digest != new_member.digest:
+            old_text = member_spelling(old_member)
+            new_text = member_spelling(new_member)
+            change = "changed" if old_text != new_text else "doc"
+            members.append({"change": change, "kind": new_member.kind, "name": new_member.name, "old": old_text, "new": new_text})
+
+    for key, old_member in old.children.items():
+        if key not in new.children:
+            members.append({"change": "removed", "kind": old_member.kind, "name": old_member.name, "old": member_spelling(old_member)})
+
+    return members
+
+# compare two module nodes, only children with differing digests are descended
+def diff_modules(old, new, module_path, report):
+    for key, new_child in new.children.items():
+        old_child = old.children.get(key)
+
+        if old_child is None:
+            report_module_symbols(new_child, module_path, report["added"])
+        elif old_child.digest == new_child.digest:
+            continue
+        elif new_child.kind == "module":
+            diff_modules(old_child, new_child, module_path + [new_child.name], report)
+        else:
+            entry = symbol_entry(new_child, module_path)
+            entry["old"] = symbol_spelling(old_child)
+            entry["new"] = entry.pop("odin")
+            entry["members"] = diff_members(old_child, new_child)
+
+            # same odin and no member changed its spelling, only docs differ
+            entry["doc_only"] = entry["old"] == entry["new"] and all(member["change"] == "doc" for member in entry["members"])
+            report["changed"].append(entry)
+
+    for key, old_child in old.children.items():
+        if key not in new.children:
+            report_module_symbols(old_child, module_path, report["removed"])
+
+# symbols removed from one module and added to another are reported as moved
+def find_moved(report):
+    removed = {(entry["kind"], entry["name"]): entry for entry in report["removed"] if entry["kind"] != "module"}
+    added = []
+
+    for entry in report["added"]:
+        old_entry = removed.pop((entry["kind"], entry["name"]), None)
+
+        if old_entry is None:
+            added.append(entry)
+            continue
+
+        report["moved"].append({
+            "kind": entry["kind"],
+            "name": entry["name"],
+            "old_module": old_entry["module"],
+            "module": entry["module"],
+            "old": old_entry["odin"],
+            "new": entry["odin"],
+        })
+
+    report["added"] = added
+    report["removed"] = [entry for entry in report["removed"] if entry["kind"] == "module" or (entry["kind"], entry["name"]) in removed]
+
+# structural diff of two api.json files
+def diff_apis(old_path, new_path):
+    trees = []
+
+    for path in (old_path, new_path):
+        with open(path, "r") as api_file:
+            root = {"kind": "module", "name": "", "contents": list(iter_api_modules(api_file))}
+
+        trees.append(hash_symbol_tree(root, "module", ""))
+
+    report = {
+        "added": [],
+        "removed": [],
+        "changed": [],
+        "moved": [],
+    }
+
+    if trees[0].digest != trees[1].digest:
+        diff_modules(trees[0], trees[1], [], report)
+        find_moved(report)
+
+    return report
+
+def write_spelling(out, prefix, text):
+    if text is None:
+        out.append(f"    {prefix} (not generated)\n")
+        return
+
+    for line in text.splitlines():
+        out.append(f"    {prefix} {line}\n")
+
+def format_diff(report):
+    out = []
+
+    for entry in report["added"]:
+        out.append(f"added {entry['kind']} {entry['name']} ({entry['module'] or 'top level'})\n")
+
+        if "odin" in entry:
+            write_spelling(out, "+", entry["odin"])
+
+    for entry in report["removed"]:
+        out.append(f"removed {entry['kind']} {entry['name']} ({entry['module'] or 'top level'})\n")
+
+        if "odin" in entry:
+            write_spelling(out, "-", entry["odin"])
+
+    for entry in report["moved"]:
+        out.append(f"moved {entry['kind']} {entry['name']} ({entry['old_module']} -> {entry['module']})\n")
+
+        if entry["old"] != entry["new"]:
+            write_spelling(out, "-", entry["old"])
+            write_spelling(out, "+", entry["new"])
+
+    for entry in report["changed"]:
+        if entry["doc_only"]:
+            out.append(f"changed {entry['kind']} {entry['name']} ({entry['module'] or 'top level'}), docs only\n")
+            continue
+
+        out.append(f"changed {entry['kind']} {entry['name']} ({entry['module'] or 'top level'})\n")
+
+        members = [member for member in entry["members"] if member["change"] != "doc"]
+        if len(members) == 0:
+            write_spelling(out, "-", entry["old"])
+            write_spelling(out, "+", entry["new"])
+
+        for member in members:
+            if member["change"] == "added":
+                out.append(f"    + {member['new']}\n")
+            elif member["change"] == "removed":
+                out.append(f"    - {member['old']}\n")
+            else:
+                out.append(f"    {member['old']} -> {member['new']}\n")
+
+    counts = ", ".join(f"{len(report[name])} {name}" for name in ("added", "removed", "changed", "moved"))
+    out.append(f"{counts}\n")
+    return "".join(out)
+
+# gen.py diff OLD NEW, exits with 1 when the apis differ
+def diff_main(argv):
+    parser = argparse.ArgumentParser(prog="gen.py diff", description="Report added, removed and changed symbols between two api.json files")
+    parser.add_argument("old", help="previous api.json")
+    parser.add_argument("new", help="new api.json")
+    parser.add_argument("--json", action="store_true", help="print the report as json")
+    args = parser.parse_args(argv)
+
+    # exit codes follow diff: 0 same, 1 different, 2 trouble
+    try:
+        report = diff_apis(args.old, args.new)
+    except (OSError, ValueError) as error:
+        print(f"gen.py diff: {error}", file=sys.stderr)
+        return 2
+    except KeyError as error:
+        print(f"gen.py diff: malformed api.json, missing key {error}", file=sys.stderr)
+        return 2
+    except (TypeError, AttributeError) as error:
+        print(f"gen.py diff: malformed api.json, {error}", file=sys.stderr)
+        return 2
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=1)
+        sys.stdout.write("\n")
+    else:
+        sys.stdout.write(format_diff(report))
+
+    changes = sum(len(report[name]) for name in ("added", "removed", "changed", "moved"))
+    return 1 if changes != 0 else 0
+
+# write the whole package from an api.json file object
+def generate(api_file, odin_file, cache, jobs):
+    write_package(odin_file, get_native_imports(None))
+    write_unicode_constants(odin_file)
+    write_helpers(odin_file)
+    gen_modules(iter_api_module_texts(api_file), odin_file, cache, jobs)
+
+# header of the split module files, also used to find stale ones
+split_file_header = "// Bindings for the Orca platform\n\npackage orca\n\n"
+
+# generate the package into memory as a dict of file names to their text
+# split writes the unicode table and every module into their own files next to orca.odin
+# with a subset only its pruned modules and the helpers they need are written
+def generate_files(api_path, odin_path, cache, jobs, split, subset=None):
+    kept = None
+    if subset is not None:
+        kept = subset.kept
+
+    if not split:
+        odin_file = io.StringIO()
+
+        if subset is not None:
+            write_package(odin_file, get_native_imports(None))
+            write_unicode_constants(odin_file)
+            write_helpers(odin_file, kept)
+
+            for module in subset.modules:
+                odin_file.write(render_built_module(module, None, False))
+        else:
+            with open(api_path, "r") as api_file:
+                generate(api_file, odin_file, cache, jobs)
+
+        return {odin_path: odin_file.getvalue()}
+
+    directory = os.path.dirname(odin_path)
+    odin_file = io.StringIO()
+    write_package(odin_file, [])
+    write_helpers(odin_file, kept)
+
+    unicode_file = io.StringIO()
+    unicode_file.write(split_file_header)
+    write_unicode_constants(unicode_file)
+
+    files = {
+        odin_path: odin_file.getvalue(),
+        os.path.join(directory, "orca_unicode.odin"): unicode_file.getvalue(),
+    }
+
+    if subset is not None:
+        for module in subset.modules:
+            for file_name, text in render_built_module(module, None, True).items():
+                files[os.path.join(directory, file_name)] = split_file_header + text
+
+        return files
+
+    with open(api_path, "r") as api_file:
+        for module_files in render_modules(iter_api_module_texts(api_file), cache, jobs, True):
+            for file_name, text in module_files.items():
+                files[os.path.join(directory, file_name)] = split_file_header + text
+
+    return files
+
+# write all generated files, returns the paths that changed
+# split files of modules that no longer exist are removed
+def write_files(files, odin_path):
+    changed = [path for path, text in files.items() if write_if_changed(path, text)]
+
+    directory = os.path.dirname(odin_path) or "."
+    for file_name in sorted(os.listdir(directory)):
+        path = os.path.join(os.path.dirname(odin_path), file_name)
+
+        if not file_name.startswith("orca_") or not file_name.endswith(".odin") or path in files:
+            continue
+
+        with open(path, "r") as stale_file:
+            if stale_file.read(len(split_file_header)) != split_file_header:
+                continue
+
+        os.remove(path)
+        changed.append(path)
+
+    return changed
+
+# only replace the file when its content differs, so its mtime stays for unchanged output
+# the new content is written next to it and moved over atomically
+def write_if_changed(path, text):
+    try:
+        with open(path, "r", newline="") as old_file:
+            if old_file.read() == text:
+                return False
+    except FileNotFoundError:
+        pass
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", newline="") as new_file:
+        new_file.write(text)
+
+    os.replace(temp_path, path)
+    return True
+
+# cheap change check before hashing the content
+def file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    return (stat.st_mtime_ns, stat.st_size)
+
+def hash_file(path):
+    with open(path, "rb") as hashed_file:
+        return hashlib.sha256(hashed_file.read()).hexdigest()
+
+# poll api.json and regenerate when its content changes
+# a change to the generator itself (rule tables or emitters) restarts the process to reload it
+def watch(api_path, odin_path, cache, jobs, split, interval):
+    source_path = os.path.abspath(__file__)
+    source_stamp = file_stamp(source_path)
+    api_stamp = None
+    api_hash = None
+
+    print(f"watching {api_path}")
+    while True:
+        if file_stamp(source_path) != source_stamp:
+            print("generator changed, restarting")
+            os.execv(sys.executable, [sys.executable] + sys.argv)
+
+        stamp = file_stamp(api_path)
+        if stamp is not None and stamp != api_stamp:
+            api_stamp = stamp
+            digest = hash_file(api_path)
+
+            if digest != api_hash:
+                api_hash = digest
+
+                if cache is not None:
+                    cache.reset_run()
+
+                # api.json might be caught halfway through being written, the next change retries
+                try:
+                    files = generate_files(api_path, odin_path, cache, jobs, split)
+                except (OSError, ValueError) as error:
+                    print(f"generation failed: {error}")
+                    api_hash = None
+                else:
+                    changed = write_files(files, odin_path)
+
+                    for path in changed:
+                        print(f"{path} updated")
+
+                    if len(changed) == 0:
+                        print("output unchanged")
+
+                    if cache is not None:
+                        print(f"modules reused: {cache.hits}, regenerated: {cache.misses}")
+                        cache.save()
+
+        time.sleep(interval)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate odin bindings for orca from api.json")
+    parser.add_argument("--cache", metavar="PATH", help="reuse unchanged modules from an on-disk cache")
+    parser.add_argument("--jobs", metavar="N", type=int, default=1, help="render top-level modules in N processes")
+    parser.add_argument("--profile", action="store_true", help="print time spent per emitter and module")
+    parser.add_argument("--profile-out", metavar="PATH", help="also write a cProfile dump (.pstats, .prof) or a chrome trace (.json)")
+    parser.add_argument("--watch", action="store_true", help="keep running and regenerate when api.json or the generator changes")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between polls in --watch mode")
+    parser.add_argument("--split", action="store_true", help="write every module into its own orca_<module>.odin file")
+    parser.add_argument("--algebra", choices=["native", "simd", "foreign"], default="foreign", help="inline odin implementations of the algebra procs, simd variants or the foreign calls")
+    parser.add_argument("--utf8", choices=["native", "foreign"], default="foreign", help="odin implementations of the utf8 procs or the foreign calls")
+    parser.add_argument("--calls", choices=["foreign", "counted"], default="foreign", help="call foreign procs directly or through wrappers counting their calls and time")
+    parser.add_argument("--input", choices=["native", "foreign"], default="foreign", help="answer input queries from the odin side input state or with foreign calls")
+    parser.add_argument("--transform-helpers", action="store_true", help="add helpers transforming point and rect slices to the algebra module")
+    parser.add_argument("--canvas-recorder", action="store_true", help="add a canvas command recorder eliding redundant state changes")
+    parser.add_argument("--font-cache", action="store_true", help="add a glyph index and text metrics cache to the canvas module")
+    parser.add_argument("--event-ring", action="store_true", help="add an event ring buffer and a typed dispatch table to the events module")
+    parser.add_argument("--file-io", action="store_true", help="add buffered file readers and writers to the helpers")
+    parser.add_argument("--batch", metavar="API", nargs="+", help="generate orca.odin next to each of these api.json files in one run, sharing identical modules")
+    parser.add_argument("--roots", metavar="NAMES", help="comma separated procs, types or modules, only what they need is generated")
+    parser.add_argument("--roots-report", metavar="PATH", help="write the kept and dropped declarations of --roots as json")
+    args = parser.parse_args()
+
+    if (args.watch or args.batch) and (args.profile or args.profile_out):
+        parser.error("--profile can't be combined with --watch or --batch")
+
+    if args.roots and (args.cache or args.watch):
+        parser.error("--roots can't be combined with --cache or --watch")
+
+    if args.roots_report and not args.roots:
+        parser.error("--roots-report needs --roots")
+
+    if args.batch and (args.watch or args.roots):
+        parser.error("--batch can't be combined with --watch or --roots")
+
+    return args
 
 if __name__ == "__main__":
-    with open("api.json", "r") as api_file:
-        api_desc = json.load(api_file)
-
-    with open("orca.odin", "w") as odin_file:
-        write_package(odin_file)
-        write_unicode_constants(odin_file)
-        write_helpers(odin_file)
-        temp_block = io.StringIO("")
-        
-        for module in api_desc:
-            iterate_object(module, odin_file, temp_block)
-        
-        temp_block.close()
+    if len(sys.argv) > 1 and sys.argv[1] == "diff":
+        sys.exit(diff_main(sys.argv[2:]))
+
+    args = parse_args()
+    api_path = "api.json"
+    odin_path = "orca.odin"
+    gen_options["algebra"] = args.algebra
+    gen_options["input"] = args.input
+    gen_options["utf8"] = args.utf8
+    gen_options["calls"] = args.calls
+    gen_options["transform_helpers"] = args.transform_helpers
+    gen_options["canvas_recorder"] = args.canvas_recorder
+    gen_options["font_cache"] = args.font_cache
+    gen_options["event_ring"] = args.event_ring
+    gen_options["file_io"] = args.file_io
+
+    cache = None
+    if args.cache:
+        options = dict(gen_options, split=args.split)
+        cache = ModuleCache(args.cache, rules_fingerprint(options))
+
+    if args.batch:
+        # every version is rendered in this process so modules put by one version are hits for the next
+        if args.jobs > 1:
+            print("--batch renders serially, ignoring --jobs")
+
+        options = dict(gen_options, split=args.split)
+        cache = ModuleCache(args.cache, rules_fingerprint(options))
+
+        for batch_api_path in args.batch:
+            batch_odin_path = os.path.join(os.path.dirname(batch_api_path), odin_path)
+            modules_reused = cache.hits
+            modules_regenerated = cache.misses
+
+            files = generate_files(batch_api_path, batch_odin_path, cache, 1, args.split)
+            write_files(files, batch_odin_path)
+            print(f"{batch_odin_path}: modules reused: {cache.hits - modules_reused}, regenerated: {cache.misses - modules_regenerated}")
+
+        if args.cache:
+            cache.save()
+
+        sys.exit(0)
+
+    if args.watch:
+        try:
+            watch(api_path, odin_path, cache, args.jobs, args.split, args.interval)
+        except KeyboardInterrupt:
+            pass
+
+        sys.exit(0)
+
+    subset = None
+    if args.roots:
+        # every module is needed in memory to find the closure, so rendering is serial
+        roots = [root.strip() for root in args.roots.split(",") if root.strip() != ""]
+
+        try:
+            subset = build_subset(api_path, odin_path, roots)
+        except ValueError as error:
+            sys.exit(str(error))
+
+        total = len(subset.kept) + len(subset.dropped)
+        print(f"kept {len(subset.kept)} of {total} declarations, dropped {len(subset.dropped)}")
+
+        if args.roots_report:
+            with open(args.roots_report, "w") as report_file:
+                report = {
+                    "roots": roots,
+                    "kept": sorted(subset.kept),
+                    "dropped": subset.dropped,
+                }
+                json.dump(report, report_file, indent=1)
+
+    profiler = None
+    python_profile = None
+    if args.profile or args.profile_out:
+        # workers arent profiled, so stay in this process
+        if args.jobs > 1:
+            print("--profile renders serially, ignoring --jobs")
+            args.jobs = 1
+
+        trace = args.profile_out is not None and args.profile_out.endswith(".json")
+        profiler = enable_profiling(trace)
+
+        if args.profile_out is not None and not trace:
+            python_profile = cProfile.Profile()
+
+    if python_profile is not None:
+        files = python_profile.runcall(generate_files, api_path, odin_path, cache, args.jobs, args.split, subset)
+    else:
+        files = generate_files(api_path, odin_path, cache, args.jobs, args.split, subset)
+
+    write_files(files, odin_path)
+
+    if cache is not None:
+        cache.save()
+        print(f"modules reused: {cache.hits}, regenerated: {cache.misses}")
+
+    if profiler is not None:
+        profiler.report()
+
+        if python_profile is not None:
+            python_profile.dump_stats(args.profile_out)
+        elif args.profile_out is not None:
+            profiler.write_trace(args.profile_out)
@@ -6,6 +6,10 @@ package orca
 // Helpers for logging, asserting and aborting.
 ////////////////////////////////////////////////////////////////////////////////
 
+// Most verbose level that gets logged, calls to more verbose helpers are removed at compile time.
+// Set with `-define:ORCA_LOG_LEVEL=0` for errors only, `1` for warnings and errors, `2` for everything.
+LOG_LEVEL :: log_level(#config(ORCA_LOG_LEVEL, 2))
+
 log_error :: proc "contextless" (msg: cstring, loc := #caller_location) {
 	log_ext(
 		.ERROR,
@@ -16,6 +20,7 @@ log_error :: proc "contextless" (msg: cstring, loc := #caller_location) {
 	)
 }
 
+@(disabled = LOG_LEVEL < .WARNING)
 log_warning :: proc "contextless" (msg: cstring, loc := #caller_location) {
 	log_ext(
 		.WARNING,
@@ -26,6 +31,7 @@ log_warning :: proc "contextless" (msg: cstring, loc := #caller_location) {
 	)
 }
 
+@(disabled = LOG_LEVEL < .INFO)
 log_info :: proc "contextless" (msg: cstring, loc := #caller_location) {
 	log_ext(
 		.INFO,
@@ -183,6 +189,100 @@ arena_push_array :: proc "contextless" (arena: ^arena, $T: typeid, count: u64) -
 
 scratch_end :: arena_scope_end
 
+////////////////////////////////////////////////////////////////////////////////
+// Pools of fixed-size objects.
+////////////////////////////////////////////////////////////////////////////////
+
+// A pool of `T` objects pushed onto its own arena. Freed objects are linked into
+// `freeList` through their own memory and handed out again before the arena grows.
+typed_pool :: struct($T: typeid) {
+	using pool: pool,
+	// Objects pushed onto the arena.
+	allocated: u64,
+	// Objects handed out and not freed yet.
+	live: u64,
+	// Highest `live` count so far.
+	peak: u64,
+	// Allocations served from the free list.
+	reused: u64,
+}
+
+@(private)
+pool_block_align :: proc "contextless" ($T: typeid) -> u32 {
+	return u32(max(align_of(T), align_of(list_elt)))
+}
+
+pool_init :: proc "contextless" (pool: ^typed_pool($T), options: ^arena_options = nil) {
+	pool^ = {}
+
+	if options != nil {
+		arena_init_with_options(&pool.arena, options)
+	} else {
+		arena_init(&pool.arena)
+	}
+
+	list_init(&pool.freeList)
+
+	// blocks are laid out back to back by pool_reserve, so every block has to keep the alignment
+	align := u64(pool_block_align(T))
+	pool.blockSize = (u64(max(size_of(T), size_of(list_elt))) + align - 1) &~ (align - 1)
+}
+
+pool_cleanup :: proc "contextless" (pool: ^typed_pool($T)) {
+	arena_cleanup(&pool.arena)
+	pool^ = {}
+}
+
+// Push `count` objects at once and put them on the free list.
+pool_reserve :: proc "contextless" (pool: ^typed_pool($T), count: u64) {
+	if count == 0 {
+		return
+	}
+
+	blocks := ([^]u8)(arena_push_aligned(&pool.arena, pool.blockSize * count, pool_block_align(T)))
+	for i in 0 ..< count {
+		list_push_front(&pool.freeList, (^list_elt)(&blocks[i * pool.blockSize]))
+	}
+
+	pool.allocated += count
+}
+
+// Get a zero initialized object, from the free list if possible.
+pool_alloc :: proc "contextless" (pool: ^typed_pool($T)) -> ^T {
+	ptr: ^T
+
+	if list_empty(pool.freeList) {
+		ptr = (^T)(arena_push_aligned(&pool.arena, pool.blockSize, pool_block_align(T)))
+		pool.allocated += 1
+	} else {
+		ptr = (^T)(list_pop_front(&pool.freeList))
+		pool.reused += 1
+	}
+
+	ptr^ = {}
+	pool.live += 1
+	pool.peak = max(pool.peak, pool.live)
+	return ptr
+}
+
+// Give an object back to the pool, its memory is reused by the next `pool_alloc`.
+pool_free :: proc "contextless" (pool: ^typed_pool($T), ptr: ^T) {
+	if ptr == nil {
+		return
+	}
+
+	list_push_front(&pool.freeList, (^list_elt)(ptr))
+	pool.live -= 1
+}
+
+// Release every object at once, the arena memory is kept for reuse.
+pool_clear :: proc "contextless" (pool: ^typed_pool($T)) {
+	arena_clear(&pool.arena)
+	list_init(&pool.freeList)
+	pool.allocated = 0
+	pool.live = 0
+}
+
 ////////////////////////////////////////////////////////////////////////////////
 // String slices and string lists.
 ////////////////////////////////////////////////////////////////////////////////
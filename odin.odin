@@ -0,0 +1,304 @@
+// File contains helpers that connect the Odin runtime (allocators, loggers) to the Orca API.
+
+package orca
+
+import "base:runtime"
+
+////////////////////////////////////////////////////////////////////////////////
+// Allocators backed by Orca arenas.
+////////////////////////////////////////////////////////////////////////////////
+
+// An allocator pushing onto `arena`. Single frees are not supported, `free_all` clears the arena.
+// Resizing the last allocation of the current chunk happens in place.
+arena_allocator :: proc "contextless" (arena: ^arena) -> runtime.Allocator {
+	return {arena_allocator_proc, arena}
+}
+
+arena_allocator_proc :: proc(
+	allocator_data: rawptr,
+	mode: runtime.Allocator_Mode,
+	size, alignment: int,
+	old_memory: rawptr,
+	old_size: int,
+	location := #caller_location,
+) -> (
+	[]byte,
+	runtime.Allocator_Error,
+) {
+	arena := (^arena)(allocator_data)
+
+	switch mode {
+	case .Alloc, .Alloc_Non_Zeroed:
+		return arena_allocator_push(arena, size, alignment, mode == .Alloc)
+
+	case .Free:
+		return nil, .Mode_Not_Implemented
+
+	case .Free_All:
+		arena_clear(arena)
+
+	case .Resize, .Resize_Non_Zeroed:
+		return arena_allocator_resize(arena, old_memory, old_size, size, alignment, mode == .Resize)
+
+	case .Query_Features:
+		set := (^runtime.Allocator_Mode_Set)(old_memory)
+		if set != nil {
+			set^ = {.Alloc, .Alloc_Non_Zeroed, .Free_All, .Resize, .Resize_Non_Zeroed, .Query_Features}
+		}
+		return nil, nil
+
+	case .Query_Info:
+		return nil, .Mode_Not_Implemented
+	}
+
+	return nil, nil
+}
+
+// An allocator on the scratch arena of `scope`, e.g. from `scratch_begin`.
+// Memory is released by ending a scope begun before the allocations, `free_all` rewinds the arena to `scope`.
+scratch_allocator :: proc "contextless" (scope: ^arena_scope) -> runtime.Allocator {
+	return {scratch_allocator_proc, scope}
+}
+
+scratch_allocator_proc :: proc(
+	allocator_data: rawptr,
+	mode: runtime.Allocator_Mode,
+	size, alignment: int,
+	old_memory: rawptr,
+	old_size: int,
+	location := #caller_location,
+) -> (
+	[]byte,
+	runtime.Allocator_Error,
+) {
+	scope := (^arena_scope)(allocator_data)
+
+	if mode == .Free_All {
+		arena_scope_end(scope^)
+		return nil, nil
+	}
+
+	return arena_allocator_proc(scope.arena, mode, size, alignment, old_memory, old_size, location)
+}
+
+// A context using `arena` for `context.allocator` and the scratch arena of `scratch` for `context.temp_allocator`.
+// Per-frame memory is then released with `free_all(context.temp_allocator)` or `arena_clear`.
+create_odin_context :: proc "contextless" (arena: ^arena, scratch: ^arena_scope) -> runtime.Context {
+	ctx := runtime.default_context()
+	ctx.allocator = arena_allocator(arena)
+	ctx.temp_allocator = scratch_allocator(scratch)
+	return ctx
+}
+
+@(private)
+arena_allocator_push :: proc "contextless" (
+	arena: ^arena,
+	size, alignment: int,
+	zero: bool,
+) -> (
+	[]byte,
+	runtime.Allocator_Error,
+) {
+	if size == 0 {
+		return nil, nil
+	}
+
+	ptr: rawptr
+	if zero {
+		ptr = arena_push_aligned(arena, u64(size), u32(alignment))
+	} else {
+		ptr = arena_push_aligned_uninitialized(arena, u64(size), u32(alignment))
+	}
+
+	if ptr == nil {
+		return nil, .Out_Of_Memory
+	}
+	return ([^]byte)(ptr)[:size], nil
+}
+
+@(private)
+arena_allocator_resize :: proc "contextless" (
+	arena: ^arena,
+	old_memory: rawptr,
+	old_size, size, alignment: int,
+	zero: bool,
+) -> (
+	[]byte,
+	runtime.Allocator_Error,
+) {
+	if old_memory == nil {
+		return arena_allocator_push(arena, size, alignment, zero)
+	}
+
+	if size == 0 {
+		return nil, nil
+	}
+
+	// the last allocation of the current chunk can grow or shrink by moving the chunk offset
+	chunk := arena.currentChunk
+	if chunk != nil && uintptr(old_memory) % uintptr(alignment) == 0 {
+		base := uintptr(rawptr(chunk.ptr))
+		start := uintptr(old_memory) - base
+
+		if uintptr(old_memory) >= base && start + uintptr(old_size) == uintptr(chunk.offset) && u64(start) + u64(size) <= chunk.committed {
+			chunk.offset = u64(start) + u64(size)
+
+			if zero && size > old_size {
+				runtime.mem_zero(rawptr(uintptr(old_memory) + uintptr(old_size)), size - old_size)
+			}
+			return ([^]byte)(old_memory)[:size], nil
+		}
+	}
+
+	data, err := arena_allocator_push(arena, size, alignment, zero)
+	if err != nil {
+		return nil, err
+	}
+
+	runtime.mem_copy_non_overlapping(raw_data(data), old_memory, min(old_size, size))
+	return data, nil
+}
+
+////////////////////////////////////////////////////////////////////////////////
+// Loggers for core:log.
+////////////////////////////////////////////////////////////////////////////////
+
+// A `core:log` logger sending every message to `log_ext`, levels above `LOG_LEVEL` are dropped.
+create_odin_logger :: proc "contextless" (lowest := runtime.Logger_Level.Debug) -> runtime.Logger {
+	return {odin_logger_proc, nil, lowest, {}}
+}
+
+odin_logger_proc :: proc(
+	data: rawptr,
+	level: runtime.Logger_Level,
+	text: string,
+	options: runtime.Logger_Options,
+	location := #caller_location,
+) {
+	orca_level := log_level_from_odin(level)
+	if orca_level > LOG_LEVEL {
+		return
+	}
+
+	log_ext(
+		orca_level,
+		cstring(raw_data(location.procedure)),
+		cstring(raw_data(location.file_path)),
+		location.line,
+		"%.*s",
+		i32(len(text)),
+		raw_data(text),
+	)
+}
+
+// A message waiting in a `log_buffer`, the strings point into the buffer or at caller locations.
+log_buffer_entry :: struct {
+	level: log_level,
+	line: i32,
+	function: cstring,
+	file: cstring,
+	msg: cstring,
+}
+
+// Collects log messages in fixed memory, `log_buffer_flush` hands them to `log_ext` in one batch.
+// Messages that don't fit are dropped and counted, errors flush the buffer and go to `log_ext` right away.
+log_buffer :: struct {
+	text: []u8,
+	used: int,
+	entries: []log_buffer_entry,
+	count: int,
+	dropped: u64,
+	flushed: u64,
+}
+
+// Initialize a buffer holding up to `entry_count` messages with `text_size` bytes of text pushed onto `arena`.
+log_buffer_init :: proc "contextless" (buffer: ^log_buffer, arena: ^arena, text_size: u64, entry_count: u64) {
+	buffer^ = {}
+	buffer.text = arena_push_array(arena, u8, text_size)
+	buffer.entries = arena_push_array(arena, log_buffer_entry, entry_count)
+}
+
+log_buffer_push :: proc "contextless" (
+	buffer: ^log_buffer,
+	level: log_level,
+	msg: string,
+	location: runtime.Source_Code_Location,
+) {
+	if level > LOG_LEVEL {
+		return
+	}
+
+	// errors are never dropped, earlier messages go out first so the order is kept
+	if level == .ERROR {
+		log_buffer_flush(buffer)
+		log_ext(
+			level,
+			cstring(raw_data(location.procedure)),
+			cstring(raw_data(location.file_path)),
+			location.line,
+			"%.*s",
+			i32(len(msg)),
+			raw_data(msg),
+		)
+		buffer.flushed += 1
+		return
+	}
+
+	if buffer.count >= len(buffer.entries) || buffer.used + len(msg) + 1 > len(buffer.text) {
+		buffer.dropped += 1
+	} else {
+		text := buffer.text[buffer.used:][:len(msg) + 1]
+		copy(text, msg)
+		text[len(msg)] = 0
+		buffer.used += len(text)
+
+		buffer.entries[buffer.count] = {
+			level    = level,
+			line     = location.line,
+			function = cstring(raw_data(location.procedure)),
+			file     = cstring(raw_data(location.file_path)),
+			msg      = cstring(raw_data(text)),
+		}
+		buffer.count += 1
+	}
+}
+
+// Send the buffered messages to `log_ext` and empty the buffer, call once per frame.
+log_buffer_flush :: proc "contextless" (buffer: ^log_buffer) {
+	for entry in buffer.entries[:buffer.count] {
+		log_ext(entry.level, entry.function, entry.file, entry.line, "%s", entry.msg)
+	}
+
+	buffer.flushed += u64(buffer.count)
+	buffer.count = 0
+	buffer.used = 0
+}
+
+// A `core:log` logger collecting messages in `buffer`.
+create_buffered_logger :: proc "contextless" (
+	buffer: ^log_buffer,
+	lowest := runtime.Logger_Level.Debug,
+) -> runtime.Logger {
+	return {buffered_logger_proc, buffer, lowest, {}}
+}
+
+buffered_logger_proc :: proc(
+	data: rawptr,
+	level: runtime.Logger_Level,
+	text: string,
+	options: runtime.Logger_Options,
+	location := #caller_location,
+) {
+	log_buffer_push((^log_buffer)(data), log_level_from_odin(level), text, location)
+}
+
+@(private)
+log_level_from_odin :: proc "contextless" (level: runtime.Logger_Level) -> log_level {
+	switch {
+	case level >= .Error:
+		return .ERROR
+	case level >= .Warning:
+		return .WARNING
+	}
+	return .INFO
+}
@@ -0,0 +1,51 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_PATH = os.path.join(ROOT, "api.json")
+GEN_PATH = os.path.join(ROOT, "gen.py")
+
+sys.path.insert(0, ROOT)
+
+import gen
+
+# gen_options is process wide, every test gets it back the way it was
+@pytest.fixture
+def options():
+    saved = dict(gen.gen_options)
+    yield gen.gen_options
+    gen.gen_options.clear()
+    gen.gen_options.update(saved)
+
+# every generator switch turned on, covers the native procs and all generated helpers
+every_option = {
+    "algebra": "simd",
+    "input": "native",
+    "utf8": "native",
+    "calls": "counted",
+    "transform_helpers": True,
+    "canvas_recorder": True,
+    "font_cache": True,
+    "event_ring": True,
+    "file_io": True,
+}
+
+@pytest.fixture(scope="session")
+def api_desc():
+    with open(API_PATH, "r") as api_file:
+        return list(gen.iter_api_modules(api_file))
+
+# build every top-level module with the current gen_options and find a nested one by name
+def find_module(api_desc, name):
+    pending = [gen.build_module(obj, None) for obj in api_desc]
+
+    while pending:
+        module = pending.pop()
+        if module.name == name:
+            return module
+
+        pending.extend(node for node in module.contents if isinstance(node, gen.Module))
+
+    raise KeyError(name)
@@ -0,0 +1,133 @@
+package orca_tests
+
+import "core:math"
+import "core:testing"
+
+import oc "../.."
+
+// Reference values are the results of the host's oc_vec2_*, oc_mat2x3_* procs, the same for --algebra native and simd.
+
+@(private = "file")
+approx :: proc(a, b: f32) -> bool {
+	return abs(a - b) <= 1e-5 * max(1, abs(a), abs(b))
+}
+
+@(private = "file")
+approx_vec2 :: proc(a, b: oc.vec2) -> bool {
+	return approx(a.x, b.x) && approx(a.y, b.y)
+}
+
+@(private = "file")
+approx_mat2x3 :: proc(a, b: oc.mat2x3) -> bool {
+	for i in 0 ..< 6 {
+		if !approx(a[i], b[i]) {
+			return false
+		}
+	}
+	return true
+}
+
+// A rotation by asin(0.6) followed by a translation.
+@(private = "file")
+rotate_translate :: oc.mat2x3{0.8, -0.6, 12, 0.6, 0.8, -7}
+
+@(test)
+test_vec2_ops :: proc(t: ^testing.T) {
+	testing.expect_value(t, oc.vec2_add({1, 2}, {3, -4}), oc.vec2{4, -2})
+	testing.expect_value(t, oc.vec2_add({0.5, -0.25}, {0, 0}), oc.vec2{0.5, -0.25})
+	testing.expect_value(t, oc.vec2_mul(2.5, {2, -4}), oc.vec2{5, -10})
+	testing.expect_value(t, oc.vec2_mul(0, {7, 8}), oc.vec2{0, 0})
+
+	testing.expect(t, oc.vec2_equal({1, 2}, {1, 2}))
+	testing.expect(t, !oc.vec2_equal({1, 2}, {1, 2.0001}))
+	testing.expect(t, !oc.vec2_equal({1, 2}, {2, 1}))
+	testing.expect(t, oc.vec2_equal({0, -0.0}, {-0.0, 0}))
+}
+
+@(test)
+test_mat2x3_mul :: proc(t: ^testing.T) {
+	cases := [?]struct {
+		m: oc.mat2x3,
+		p, want: oc.vec2,
+	}{
+		{rotate_translate, {3, 4}, {12, -2}},
+		{rotate_translate, {0, 0}, {12, -7}},
+		{{1, 0, 0, 0, 1, 0}, {-3.5, 9}, {-3.5, 9}},
+		{{2, 0, 5, 0, 4, -3}, {1, 1}, {7, 1}},
+		{{1, 2, 3, 4, 5, 6}, {-1, 0.5}, {3, 4.5}},
+	}
+
+	for c in cases {
+		got := oc.mat2x3_mul(c.m, c.p)
+		testing.expectf(t, approx_vec2(got, c.want), "%v * %v: %v, want %v", c.m, c.p, got, c.want)
+	}
+}
+
+@(test)
+test_mat2x3_mul_m :: proc(t: ^testing.T) {
+	cases := [?]struct {
+		lhs, rhs, want: oc.mat2x3,
+	}{
+		{{1, 0, 5, 0, 1, -3}, {2, 0, 0, 0, 4, 0}, {2, 0, 5, 0, 4, -3}},
+		{{2, 0, 0, 0, 4, 0}, {1, 0, 5, 0, 1, -3}, {2, 0, 10, 0, 4, -12}},
+		{rotate_translate, {1, 2, 3, 4, 5, 6}, {-1.6, -1.4, 10.8, 3.8, 5.2, -0.4}},
+		{{1, 0, 0, 0, 1, 0}, rotate_translate, rotate_translate},
+	}
+
+	for c in cases {
+		got := oc.mat2x3_mul_m(c.lhs, c.rhs)
+		testing.expectf(t, approx_mat2x3(got, c.want), "%v * %v: %v, want %v", c.lhs, c.rhs, got, c.want)
+
+		// composing matrices is applying them one after the other
+		p := oc.vec2{1.5, -2}
+		testing.expect(t, approx_vec2(oc.mat2x3_mul(got, p), oc.mat2x3_mul(c.lhs, oc.mat2x3_mul(c.rhs, p))))
+	}
+}
+
+@(test)
+test_mat2x3_inv :: proc(t: ^testing.T) {
+	cases := [?]struct {
+		m, want: oc.mat2x3,
+	}{
+		{{2, 0, 5, 0, 4, -3}, {0.5, 0, -2.5, 0, 0.25, 0.75}},
+		{rotate_translate, {0.8, 0.6, -5.4, -0.6, 0.8, 12.8}},
+		{{1, 0, 0, 0, 1, 0}, {1, 0, 0, 0, 1, 0}},
+		{{1, 2, 3, 4, 5, 6}, {-5.0 / 3, 2.0 / 3, 1, 4.0 / 3, -1.0 / 3, -2}},
+	}
+
+	for c in cases {
+		got := oc.mat2x3_inv(c.m)
+		testing.expectf(t, approx_mat2x3(got, c.want), "inverse of %v: %v, want %v", c.m, got, c.want)
+		testing.expect(t, approx_mat2x3(oc.mat2x3_mul_m(got, c.m), {1, 0, 0, 0, 1, 0}))
+	}
+}
+
+@(test)
+test_mat2x3_constructors :: proc(t: ^testing.T) {
+	testing.expect_value(t, oc.mat2x3_translate(3, -4), oc.mat2x3{1, 0, 3, 0, 1, -4})
+	testing.expect_value(t, oc.mat2x3_scale(2, 0.5), oc.mat2x3{2, 0, 0, 0, 0.5, 0})
+	testing.expect(t, approx_mat2x3(oc.mat2x3_rotate(0), {1, 0, 0, 0, 1, 0}))
+	testing.expect(t, approx_mat2x3(oc.mat2x3_rotate(math.PI / 2), {0, -1, 0, 1, 0, 0}))
+	testing.expect(t, approx_mat2x3(oc.mat2x3_rotate(math.asin_f32(0.6)), {0.8, -0.6, 0, 0.6, 0.8, 0}))
+	testing.expect(t, approx_vec2(oc.mat2x3_mul(oc.mat2x3_rotate(math.PI), {1, 2}), {-1, -2}))
+}
+
+@(test)
+test_rects_transform_reference :: proc(t: ^testing.T) {
+	src := []oc.rect{{0, 0, 10, 5}, {-3, 4, 1, 20}, {1, 1, 0, 0}}
+	want := []oc.rect{{9, -7, 11, 10}, {-4.8, -5.6, 12.8, 16.6}, {12.2, -5.6, 0, 0}}
+	dst := make([]oc.rect, len(src))
+	defer delete(dst)
+
+	oc.rects_transform(rotate_translate, src, dst)
+
+	for r, i in dst {
+		ok := approx(r.x, want[i].x) && approx(r.y, want[i].y) && approx(r.w, want[i].w) && approx(r.h, want[i].h)
+		testing.expectf(t, ok, "rect %d: %v, want %v", i, r, want[i])
+	}
+
+	// scaling and translating keeps the corners in place
+	dst[0] = {}
+	oc.rects_transform({2, 0, 5, 0, 4, -3}, src[:1], dst[:1])
+	testing.expect(t, approx(dst[0].x, 5) && approx(dst[0].y, -3) && approx(dst[0].w, 20) && approx(dst[0].h, 20))
+}
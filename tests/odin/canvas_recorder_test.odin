@@ -0,0 +1,161 @@
+package orca_tests
+
+import "core:testing"
+
+import oc "../.."
+
+// Kinds of the commands in the buffer, checking that every command is aligned and the sizes add up to `used`.
+@(private = "file")
+recorded_kinds :: proc(t: ^testing.T, rec: ^oc.canvas_recorder) -> [dynamic]oc.canvas_command_kind {
+	kinds := make([dynamic]oc.canvas_command_kind)
+	offset := 0
+
+	for offset < rec.used {
+		header := (^oc.canvas_command_header)(&rec.buffer[offset])
+		testing.expect_value(t, header.size % 8, 0)
+		append(&kinds, header.kind)
+		offset += int(header.size)
+	}
+
+	testing.expect_value(t, offset, rec.used)
+	return kinds
+}
+
+@(private = "file")
+expect_kinds :: proc(t: ^testing.T, got: []oc.canvas_command_kind, want: []oc.canvas_command_kind, loc := #caller_location) {
+	testing.expect_value(t, len(got), len(want), loc)
+
+	for i in 0 ..< min(len(got), len(want)) {
+		testing.expect_value(t, got[i], want[i], loc)
+	}
+}
+
+@(test)
+test_canvas_recorder_elides_repeated_setters :: proc(t: ^testing.T) {
+	host_canvas = {}
+
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	rec: oc.canvas_recorder
+	oc.canvas_recorder_init(&rec, &arena, 1024)
+
+	// the matrix and clip stacks don't hold drawing state, the recorded state is kept across push and pop
+	oc.record_set_width(&rec, 2)
+	oc.record_set_width(&rec, 2)
+	oc.record_matrix_push(&rec, {1, 0, 1, 0, 1, 1})
+	oc.record_set_width(&rec, 2)
+	oc.record_rectangle_fill(&rec, 0, 0, 10, 10)
+	oc.record_matrix_pop(&rec)
+	oc.record_set_width(&rec, 2)
+	oc.record_clip_push(&rec, 0, 0, 5, 5)
+	oc.record_set_color_rgba(&rec, 1, 0, 0, 1)
+	oc.record_clip_pop(&rec)
+	oc.record_set_color_rgba(&rec, 1, 0, 0, 1)
+
+	// another setter of the same state replaces the recorded value
+	oc.record_set_color_srgba(&rec, 1, 0, 0, 1)
+	oc.record_set_color_rgba(&rec, 1, 0, 0, 1)
+	oc.record_fill(&rec)
+
+	want := []oc.canvas_command_kind{
+		.SET_WIDTH,
+		.MATRIX_PUSH,
+		.RECTANGLE_FILL,
+		.MATRIX_POP,
+		.CLIP_PUSH,
+		.SET_COLOR_RGBA,
+		.CLIP_POP,
+		.SET_COLOR_SRGBA,
+		.SET_COLOR_RGBA,
+		.FILL,
+	}
+
+	kinds := recorded_kinds(t, &rec)
+	defer delete(kinds)
+	expect_kinds(t, kinds[:], want)
+	testing.expect_value(t, rec.commands, 10)
+	testing.expect_value(t, rec.elided, 4)
+
+	args := (^oc.canvas_args_set_width)(&rec.buffer[size_of(oc.canvas_command_header)])
+	testing.expect_value(t, args.width, 2)
+
+	// nothing reaches the host before the flush, then every command in recorded order
+	testing.expect_value(t, host_canvas.count, 0)
+	oc.canvas_recorder_flush(&rec)
+	expect_kinds(t, host_canvas.kinds[:host_canvas.count], want)
+	testing.expect_value(t, host_canvas.width, 2)
+	testing.expect_value(t, rec.used, 0)
+	testing.expect_value(t, rec.flushes, 1)
+
+	// the flushed state is still known, until the recorder is told to forget it
+	oc.record_set_width(&rec, 2)
+	testing.expect_value(t, rec.used, 0)
+	oc.canvas_recorder_invalidate(&rec)
+	oc.record_set_width(&rec, 2)
+	testing.expect_value(t, rec.commands, 11)
+	testing.expect_value(t, rec.elided, 5)
+}
+
+@(test)
+test_canvas_recorder_set_image_forgets_the_source_region :: proc(t: ^testing.T) {
+	host_canvas = {}
+
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	rec: oc.canvas_recorder
+	oc.canvas_recorder_init(&rec, &arena, 1024)
+
+	region := oc.rect{0, 0, 8, 8}
+	oc.record_set_image(&rec, 1)
+	oc.record_set_image_source_region(&rec, region)
+	oc.record_set_image(&rec, 1)
+	oc.record_set_image_source_region(&rec, region)
+	oc.record_set_image(&rec, 2)
+	oc.record_set_image_source_region(&rec, region)
+
+	kinds := recorded_kinds(t, &rec)
+	defer delete(kinds)
+	expect_kinds(t, kinds[:], {.SET_IMAGE, .SET_IMAGE_SOURCE_REGION, .SET_IMAGE, .SET_IMAGE_SOURCE_REGION})
+	testing.expect_value(t, rec.elided, 2)
+}
+
+@(test)
+test_canvas_recorder_copies_strings_and_flushes_when_full :: proc(t: ^testing.T) {
+	host_canvas = {}
+
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	rec: oc.canvas_recorder
+	oc.canvas_recorder_init(&rec, &arena, 64)
+
+	// the text is copied into the buffer, the caller can reuse its memory before the flush
+	text := [5]u8{'h', 'e', 'l', 'l', 'o'}
+	oc.record_text_fill(&rec, 0, 0, string(text[:]))
+	text[0] = 'j'
+	oc.canvas_recorder_flush(&rec)
+	testing.expect_value(t, host_canvas.text, "hello")
+
+	// a rectangle takes 24 bytes, the third one flushes the first two
+	for _ in 0 ..< 5 {
+		oc.record_rectangle_fill(&rec, 0, 0, 1, 1)
+	}
+
+	testing.expect_value(t, rec.flushes, 3)
+	testing.expect_value(t, host_canvas.count, 5)
+	testing.expect_value(t, rec.used, 24)
+
+	// a command that doesn't fit into the empty buffer goes to the host directly, after what was recorded before it
+	long_text := "a text that is longer than the whole command buffer of the recorder"
+	oc.record_text_fill(&rec, 0, 0, long_text)
+	testing.expect_value(t, host_canvas.count, 7)
+	testing.expect_value(t, host_canvas.kinds[5], oc.canvas_command_kind.RECTANGLE_FILL)
+	testing.expect_value(t, host_canvas.kinds[6], oc.canvas_command_kind.TEXT_FILL)
+	testing.expect_value(t, host_canvas.text, long_text)
+	testing.expect_value(t, rec.used, 0)
+}
@@ -0,0 +1,186 @@
+package orca_tests
+
+import "base:runtime"
+import "core:testing"
+
+import oc "../.."
+
+// What the handlers were called with, the arrays keep the allocator of the test.
+@(private = "file")
+received :: struct {
+	types: [dynamic]oc.event_type,
+	mouse: [dynamic]oc.mouse_event,
+}
+
+@(private = "file")
+received_make :: proc() -> received {
+	return {make([dynamic]oc.event_type), make([dynamic]oc.mouse_event)}
+}
+
+@(private = "file")
+received_delete :: proc(data: ^received) {
+	delete(data.types)
+	delete(data.mouse)
+}
+
+@(private = "file")
+on_event :: proc "contextless" (data: rawptr, e: ^oc.event) {
+	context = runtime.default_context()
+	append(&(^received)(data).types, e.type)
+}
+
+@(private = "file")
+on_mouse :: proc "contextless" (data: rawptr, e: ^oc.event, mouse: ^oc.mouse_event) {
+	context = runtime.default_context()
+	append(&(^received)(data).types, e.type)
+	append(&(^received)(data).mouse, mouse^)
+}
+
+@(private = "file")
+mouse_move :: proc(window: oc.window, dx, dy: f32) -> oc.event {
+	e := oc.event{window = window, type = .MOUSE_MOVE}
+	e.mouse = {x = dx, y = dy, deltaX = dx, deltaY = dy}
+	return e
+}
+
+@(test)
+test_event_ring_coalesces_mouse_moves :: proc(t: ^testing.T) {
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	ring: oc.event_ring
+	oc.event_ring_init(&ring, &arena, 8)
+
+	data := received_make()
+	defer received_delete(&data)
+
+	handlers := oc.event_handlers{data = &data}
+	testing.expect(t, oc.event_handlers_set_mouse(&handlers, .MOUSE_MOVE, on_mouse))
+	oc.event_handlers_set(&handlers, .KEYBOARD_KEY, on_event)
+
+	events := []oc.event{
+		mouse_move(1, 1, 2),
+		mouse_move(1, 3, 4),
+		mouse_move(2, 5, 6),
+		{window = 2, type = .KEYBOARD_KEY},
+		mouse_move(2, 7, 8),
+		mouse_move(2, 1, 1),
+	}
+	oc.event_ring_replay(&ring, &handlers, events)
+
+	testing.expect_value(t, len(data.types), 4)
+	testing.expect_value(t, ring.coalesced, 2)
+	testing.expect_value(t, ring.dispatched, 4)
+	testing.expect_value(t, oc.event_ring_len(&ring), 0)
+
+	// merged moves keep the latest position and sum the deltas
+	testing.expect_value(t, data.mouse[0].x, 3)
+	testing.expect_value(t, data.mouse[0].deltaX, 4)
+	testing.expect_value(t, data.mouse[0].deltaY, 6)
+	testing.expect_value(t, data.mouse[1].deltaX, 5)
+	testing.expect_value(t, data.types[2], oc.event_type.KEYBOARD_KEY)
+	testing.expect_value(t, data.mouse[2].deltaX, 8)
+}
+
+@(test)
+test_event_ring_overflow_and_replay :: proc(t: ^testing.T) {
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	ring: oc.event_ring
+	oc.event_ring_init(&ring, &arena, 3)
+	testing.expect_value(t, len(ring.events), 4)
+
+	data := received_make()
+	defer received_delete(&data)
+
+	handlers := oc.event_handlers{data = &data}
+	oc.event_handlers_set(&handlers, .KEYBOARD_KEY, on_event)
+	oc.event_handlers_set(&handlers, .KEYBOARD_CHAR, on_event)
+
+	key := oc.event{type = .KEYBOARD_KEY}
+	for _ in 0 ..< 4 {
+		testing.expect(t, oc.event_ring_push(&ring, &key))
+	}
+
+	testing.expect(t, !oc.event_ring_push(&ring, &key))
+	testing.expect_value(t, ring.overflows, 1)
+
+	oc.event_ring_dispatch(&ring, &handlers)
+	testing.expect_value(t, len(data.types), 4)
+
+	// replay dispatches early when the ring fills up, so nothing is dropped
+	events := make([]oc.event, 10)
+	defer delete(events)
+	for &e, i in events {
+		e.type = .KEYBOARD_KEY if i % 2 == 0 else .KEYBOARD_CHAR
+	}
+
+	oc.event_ring_replay(&ring, &handlers, events)
+	testing.expect_value(t, len(data.types), 14)
+	testing.expect_value(t, ring.overflows, 1)
+
+	for type, i in data.types[4:] {
+		testing.expect_value(t, type, events[i].type)
+	}
+}
+
+@(test)
+test_event_handlers_check_the_arm :: proc(t: ^testing.T) {
+	handlers: oc.event_handlers
+
+	testing.expect(t, !oc.event_handlers_set_mouse(&handlers, .KEYBOARD_KEY, on_mouse))
+	testing.expect(t, handlers.table[.KEYBOARD_KEY].call == nil)
+	testing.expect(t, oc.event_handlers_set_mouse(&handlers, .MOUSE_WHEEL, on_mouse))
+}
+
+// A mouse handler that pushes one more move of the same window while it is dispatched.
+@(private = "file")
+pushing :: struct {
+	ring: ^oc.event_ring,
+	data: received,
+	pushes: int,
+}
+
+@(private = "file")
+on_mouse_push :: proc "contextless" (data: rawptr, e: ^oc.event, mouse: ^oc.mouse_event) {
+	context = runtime.default_context()
+	p := (^pushing)(data)
+	append(&p.data.types, e.type)
+	append(&p.data.mouse, mouse^)
+
+	if p.pushes > 0 {
+		p.pushes -= 1
+		next := mouse_move(e.window, 10, 10)
+		oc.event_ring_push(p.ring, &next)
+	}
+}
+
+// The event being dispatched is the last one of the ring, a move its handler pushes must not merge into it.
+@(test)
+test_event_ring_handler_push_is_not_merged :: proc(t: ^testing.T) {
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	ring: oc.event_ring
+	oc.event_ring_init(&ring, &arena, 2)
+
+	p := pushing{ring = &ring, data = received_make(), pushes = 1}
+	defer received_delete(&p.data)
+
+	handlers := oc.event_handlers{data = &p}
+	testing.expect(t, oc.event_handlers_set_mouse(&handlers, .MOUSE_MOVE, on_mouse_push))
+
+	events := []oc.event{mouse_move(1, 1, 1)}
+	oc.event_ring_replay(&ring, &handlers, events)
+
+	testing.expect_value(t, len(p.data.mouse), 2)
+	testing.expect_value(t, ring.coalesced, 0)
+	testing.expect_value(t, ring.dispatched, 2)
+	testing.expect_value(t, oc.event_ring_len(&ring), 0)
+	testing.expect_value(t, p.data.mouse[0].deltaX, 1)
+	testing.expect_value(t, p.data.mouse[1].deltaX, 10)
+}
@@ -0,0 +1,114 @@
+package orca_tests
+
+import "core:testing"
+
+import oc "../.."
+
+@(private = "file")
+file_text :: "the quick brown fox jumps over the lazy dog"
+
+@(test)
+test_file_read_entire_reads_the_rest :: proc(t: ^testing.T) {
+	defer host_files_reset()
+
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	file := host_file_open(file_text)
+	data, err := oc.file_read_entire(&arena, file)
+	testing.expect_value(t, err, oc.io_error.OK)
+	testing.expect_value(t, string(data), file_text)
+
+	oc.file_seek(file, 4, .SET)
+	data, err = oc.file_read_entire(&arena, file)
+	testing.expect_value(t, string(data), file_text[4:])
+}
+
+// A position at or past the end leaves nothing to read instead of wrapping the size around.
+@(test)
+test_file_read_entire_past_the_end :: proc(t: ^testing.T) {
+	defer host_files_reset()
+
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	file := host_file_open(file_text)
+
+	for offset in ([]i64{0, 10}) {
+		oc.file_seek(file, offset, .END)
+		data, err := oc.file_read_entire(&arena, file)
+		testing.expect_value(t, err, oc.io_error.OK)
+		testing.expect_value(t, len(data), 0)
+	}
+}
+
+@(test)
+test_file_reader_chunks :: proc(t: ^testing.T) {
+	defer host_files_reset()
+
+	buffer: [4]oc.char
+	reader: oc.file_reader
+	oc.file_reader_init(&reader, host_file_open(file_text), buffer[:])
+
+	// small reads go through the buffer, reads of a whole chunk bypass it
+	small: [3]oc.char
+	large: [16]oc.char
+	rest: [64]oc.char
+
+	testing.expect_value(t, oc.file_reader_read(&reader, small[:]), 3)
+	testing.expect_value(t, oc.file_reader_read(&reader, large[:]), 16)
+	n := oc.file_reader_read(&reader, rest[:])
+
+	testing.expect_value(t, string(small[:]), file_text[:3])
+	testing.expect_value(t, string(large[:]), file_text[3:19])
+	testing.expect_value(t, string(rest[:n]), file_text[19:])
+	testing.expect_value(t, reader.error, oc.io_error.OK)
+}
+
+@(test)
+test_file_writer_chunks :: proc(t: ^testing.T) {
+	defer host_files_reset()
+
+	file := host_file_open("")
+	buffer: [8]oc.char
+	writer: oc.file_writer
+	oc.file_writer_init(&writer, file, buffer[:])
+
+	text := file_text
+	for len(text) > 0 {
+		n := min(len(text), 5)
+		testing.expect(t, oc.file_writer_write(&writer, transmute([]oc.char)text[:n]))
+		text = text[n:]
+	}
+
+	testing.expect(t, oc.file_writer_write(&writer, transmute([]oc.char)string("0123456789")))
+	testing.expect(t, oc.file_writer_flush(&writer))
+	testing.expect_value(t, host_file_data(file), file_text + "0123456789")
+}
+
+@(test)
+test_file_read_ops :: proc(t: ^testing.T) {
+	defer host_files_reset()
+
+	file := host_file_open(file_text)
+	first: [5]oc.char
+	second: [3]oc.char
+	past_end: [8]oc.char
+
+	ops := []oc.file_read_op{
+		{file = file, offset = 16, buffer = first[:]},
+		{file = file, offset = 4, buffer = second[:]},
+		{file = file, offset = 100, buffer = past_end[:]},
+	}
+	testing.expect(t, oc.file_read_ops(ops))
+
+	testing.expect_value(t, string(first[:ops[0].size]), "fox j")
+	testing.expect_value(t, string(second[:ops[1].size]), "qui")
+	testing.expect_value(t, ops[2].size, 0)
+
+	bad := []oc.file_read_op{{file = 0, buffer = first[:]}}
+	testing.expect(t, !oc.file_read_ops(bad))
+	testing.expect_value(t, bad[0].error, oc.io_error.HANDLE)
+}
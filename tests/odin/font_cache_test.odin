@@ -0,0 +1,148 @@
+package orca_tests
+
+import "core:testing"
+import "core:unicode/utf8"
+
+import oc "../.."
+
+@(private = "file")
+FONT :: oc.font(1)
+
+// Glyph indices of `text` through the cache, the backing array is allocated with the test allocator.
+@(private = "file")
+cached_glyphs :: proc(cache: ^oc.font_cache, text: string) -> []rune {
+	codepoints := utf8.string_to_runes(text)
+	defer delete(codepoints)
+
+	backing := make([]rune, len(codepoints))
+	return ([]rune)(oc.cached_font_get_glyph_indices(cache, FONT, oc.str32(codepoints), oc.str32(backing)))
+}
+
+@(test)
+test_font_cache_hit_and_miss :: proc(t: ^testing.T) {
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	cache: oc.font_cache
+	oc.font_cache_init(&cache, &arena, 64, 256)
+	host_font_calls = 0
+
+	a := oc.cached_font_text_metrics(&cache, FONT, 12, "hello")
+	b := oc.cached_font_text_metrics(&cache, FONT, 12, "hello")
+	testing.expect_value(t, a, b)
+	testing.expect_value(t, a.advance.x, 60)
+	testing.expect_value(t, host_font_calls, 1)
+
+	// the size, the font and the text are all part of the key
+	oc.cached_font_text_metrics(&cache, FONT, 14, "hello")
+	oc.cached_font_text_metrics(&cache, FONT + 1, 12, "hello")
+	oc.cached_font_text_metrics(&cache, FONT, 12, "hellp")
+	testing.expect_value(t, host_font_calls, 4)
+
+	testing.expect_value(t, cache.hits, 1)
+	testing.expect_value(t, cache.misses, 4)
+	testing.expect_value(t, cache.evictions, 0)
+}
+
+@(test)
+test_font_cache_evicts_least_recently_used :: proc(t: ^testing.T) {
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	// a single bucket, every key competes for the same ways
+	cache: oc.font_cache
+	oc.font_cache_init(&cache, &arena, oc.FONT_CACHE_WAYS, 16)
+	testing.expect_value(t, len(cache.entries), oc.FONT_CACHE_WAYS)
+
+	texts := [oc.FONT_CACHE_WAYS + 1]string{"a", "b", "c", "d", "e", "f", "g", "h", "i"}
+	for text in texts[:oc.FONT_CACHE_WAYS] {
+		oc.cached_font_text_metrics(&cache, FONT, 12, text)
+		oc.font_cache_next_frame(&cache)
+	}
+
+	// using the oldest entry makes the second one the least recently used
+	oc.cached_font_text_metrics(&cache, FONT, 12, texts[0])
+	oc.font_cache_next_frame(&cache)
+	oc.cached_font_text_metrics(&cache, FONT, 12, texts[oc.FONT_CACHE_WAYS])
+	testing.expect_value(t, cache.evictions, 1)
+
+	host_font_calls = 0
+	oc.cached_font_text_metrics(&cache, FONT, 12, texts[0])
+	testing.expect_value(t, host_font_calls, 0)
+	oc.cached_font_text_metrics(&cache, FONT, 12, texts[1])
+	testing.expect_value(t, host_font_calls, 1)
+}
+
+@(test)
+test_font_cache_invalidate_font :: proc(t: ^testing.T) {
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	cache: oc.font_cache
+	oc.font_cache_init(&cache, &arena, 64, 256)
+
+	oc.cached_font_text_metrics(&cache, FONT, 12, "kept")
+	oc.cached_font_text_metrics(&cache, FONT + 1, 12, "dropped")
+	oc.cached_font_destroy(&cache, FONT + 1)
+
+	host_font_calls = 0
+	oc.cached_font_text_metrics(&cache, FONT, 12, "kept")
+	testing.expect_value(t, host_font_calls, 0)
+	oc.cached_font_text_metrics(&cache, FONT + 1, 12, "dropped")
+	testing.expect_value(t, host_font_calls, 1)
+
+	oc.font_cache_invalidate_font(&cache, FONT)
+	oc.cached_font_text_metrics(&cache, FONT, 12, "kept")
+	testing.expect_value(t, host_font_calls, 2)
+}
+
+@(test)
+test_font_cache_glyph_ring_expiry :: proc(t: ^testing.T) {
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	cache: oc.font_cache
+	oc.font_cache_init(&cache, &arena, 64, 10)
+	host_font_calls = 0
+
+	first := cached_glyphs(&cache, "abcde")
+	defer delete(first)
+	testing.expect_value(t, first[0], 'a' + 1)
+
+	// two runs fill the ring exactly and both stay cached
+	second := cached_glyphs(&cache, "fghij")
+	defer delete(second)
+	again := cached_glyphs(&cache, "abcde")
+	defer delete(again)
+	testing.expect_value(t, host_font_calls, 2)
+	testing.expect_value(t, utf8.runes_to_string(again, context.temp_allocator), "bcdef")
+
+	// a third run wraps over the first one only
+	third := cached_glyphs(&cache, "klmno")
+	defer delete(third)
+	testing.expect_value(t, host_font_calls, 3)
+
+	hit := cached_glyphs(&cache, "fghij")
+	defer delete(hit)
+	testing.expect_value(t, host_font_calls, 3)
+	testing.expect_value(t, hit[4], 'j' + 1)
+
+	misses := cache.misses
+	expired := cached_glyphs(&cache, "abcde")
+	defer delete(expired)
+	testing.expect_value(t, host_font_calls, 4)
+	testing.expect_value(t, cache.misses, misses + 1)
+	testing.expect_value(t, expired[0], 'a' + 1)
+
+	// runs longer than the ring are never cached
+	long := cached_glyphs(&cache, "abcdefghijkl")
+	defer delete(long)
+	long_again := cached_glyphs(&cache, "abcdefghijkl")
+	defer delete(long_again)
+	testing.expect_value(t, host_font_calls, 6)
+	testing.expect_value(t, len(long_again), 12)
+}
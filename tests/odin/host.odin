@@ -0,0 +1,557 @@
+package orca_tests
+
+// Stand-ins for the host procs the tested helpers call, so the tests run natively without Orca.
+// Only what the tests reach is implemented, following the Orca runtime.
+
+import "base:runtime"
+
+import oc "../.."
+
+HOST_CHUNK_SIZE :: 1 << 20
+
+@(export, link_name = "oc_list_init")
+host_list_init :: proc "c" (list: ^oc.list) {
+	list^ = {}
+}
+
+@(export, link_name = "oc_list_empty")
+host_list_empty :: proc "c" (list: oc.list) -> bool {
+	return list.first == nil
+}
+
+@(export, link_name = "oc_list_push_front")
+host_list_push_front :: proc "c" (list: ^oc.list, elt: ^oc.list_elt) {
+	elt.prev = nil
+	elt.next = list.first
+
+	if list.first != nil {
+		list.first.prev = elt
+	} else {
+		list.last = elt
+	}
+
+	list.first = elt
+}
+
+@(export, link_name = "oc_list_push_back")
+host_list_push_back :: proc "c" (list: ^oc.list, elt: ^oc.list_elt) {
+	elt.prev = list.last
+	elt.next = nil
+
+	if list.last != nil {
+		list.last.next = elt
+	} else {
+		list.first = elt
+	}
+
+	list.last = elt
+}
+
+@(export, link_name = "oc_list_pop_front")
+host_list_pop_front :: proc "c" (list: ^oc.list) -> ^oc.list_elt {
+	elt := list.first
+	if elt == nil {
+		return nil
+	}
+
+	list.first = elt.next
+	if list.first != nil {
+		list.first.prev = nil
+	} else {
+		list.last = nil
+	}
+
+	elt.prev = nil
+	elt.next = nil
+	return elt
+}
+
+@(private)
+host_arena_add_chunk :: proc "contextless" (arena: ^oc.arena, cap: u64) -> ^oc.arena_chunk {
+	chunk := (^oc.arena_chunk)(runtime.heap_alloc(size_of(oc.arena_chunk) + int(cap)))
+	chunk.ptr = cstring(([^]u8)(chunk)[size_of(oc.arena_chunk):])
+	chunk.committed = cap
+	chunk.cap = cap
+
+	host_list_push_back(&arena.chunks, &chunk.listElt)
+	return chunk
+}
+
+@(export, link_name = "oc_arena_init")
+host_arena_init :: proc "c" (arena: ^oc.arena) {
+	arena^ = {}
+	arena.currentChunk = host_arena_add_chunk(arena, HOST_CHUNK_SIZE)
+}
+
+@(export, link_name = "oc_arena_init_with_options")
+host_arena_init_with_options :: proc "c" (arena: ^oc.arena, options: ^oc.arena_options) {
+	arena^ = {}
+	arena.currentChunk = host_arena_add_chunk(arena, max(options.reserve, HOST_CHUNK_SIZE))
+}
+
+@(export, link_name = "oc_arena_cleanup")
+host_arena_cleanup :: proc "c" (arena: ^oc.arena) {
+	for elt := arena.chunks.first; elt != nil; {
+		next := elt.next
+		runtime.heap_free(elt)
+		elt = next
+	}
+
+	arena^ = {}
+}
+
+// Zeroed memory from the current chunk, later chunks are tried before a new one is added.
+@(export, link_name = "oc_arena_push_aligned")
+host_arena_push_aligned :: proc "c" (arena: ^oc.arena, size: u64, alignment: u32) -> rawptr {
+	align := u64(alignment)
+	chunk := arena.currentChunk
+
+	for chunk == nil || (chunk.offset + align - 1) &~ (align - 1) + size > chunk.cap {
+		if chunk != nil && chunk.listElt.next != nil {
+			chunk = (^oc.arena_chunk)(chunk.listElt.next)
+		} else {
+			chunk = host_arena_add_chunk(arena, max(size + align, HOST_CHUNK_SIZE))
+		}
+	}
+
+	start := (chunk.offset + align - 1) &~ (align - 1)
+	chunk.offset = start + size
+	arena.currentChunk = chunk
+
+	ptr := rawptr(([^]u8)(chunk.ptr)[start:])
+	runtime.mem_zero(ptr, int(size))
+	return ptr
+}
+
+@(export, link_name = "oc_arena_clear")
+host_arena_clear :: proc "c" (arena: ^oc.arena) {
+	for elt := arena.chunks.first; elt != nil; elt = elt.next {
+		(^oc.arena_chunk)(elt).offset = 0
+	}
+
+	arena.currentChunk = (^oc.arena_chunk)(arena.chunks.first)
+}
+
+// Never inlined, so the per-point calls of the benchmark pay for a call like foreign ones do.
+@(export, link_name = "oc_mat2x3_mul")
+host_mat2x3_mul :: #force_no_inline proc "c" (m: oc.mat2x3, p: oc.vec2) -> oc.vec2 {
+	return {p.x * m[0] + p.y * m[1] + m[2], p.x * m[3] + p.y * m[4] + m[5]}
+}
+
+// An in-memory file, handles are indices into `host_files` plus one.
+host_file :: struct {
+	data: [dynamic]u8,
+	pos: i64,
+}
+
+// Per test thread, tests running in parallel don't see each other's files.
+@(thread_local)
+host_files: [dynamic]host_file
+
+// Open an in-memory file holding a copy of `data`.
+host_file_open :: proc(data: string) -> oc.file {
+	append(&host_files, host_file{data = make([dynamic]u8)})
+	append(&host_files[len(host_files) - 1].data, data)
+	return oc.file(len(host_files))
+}
+
+// Contents of an in-memory file.
+host_file_data :: proc(handle: oc.file) -> string {
+	return string(host_files[handle - 1].data[:])
+}
+
+// Free every in-memory file of the current test.
+host_files_reset :: proc() {
+	for &file in host_files {
+		delete(file.data)
+	}
+
+	delete(host_files)
+	host_files = nil
+}
+
+@(private)
+host_file_get :: proc "contextless" (handle: oc.file) -> ^host_file {
+	if handle == 0 || int(handle) > len(host_files) {
+		return nil
+	}
+
+	return &host_files[handle - 1]
+}
+
+@(export, link_name = "oc_file_read")
+host_file_read :: proc "c" (handle: oc.file, size: u64, buffer: [^]oc.char) -> u64 {
+	file := host_file_get(handle)
+	if file == nil || file.pos >= i64(len(file.data)) {
+		return 0
+	}
+
+	n := min(size, u64(i64(len(file.data)) - file.pos))
+	runtime.mem_copy(buffer, &file.data[file.pos], int(n))
+	file.pos += i64(n)
+	return n
+}
+
+@(export, link_name = "oc_file_write")
+host_file_write :: proc "c" (handle: oc.file, size: u64, buffer: [^]oc.char) -> u64 {
+	context = runtime.default_context()
+
+	file := host_file_get(handle)
+	if file == nil {
+		return 0
+	}
+
+	end := int(file.pos) + int(size)
+	if end > len(file.data) {
+		resize(&file.data, end)
+	}
+
+	copy(file.data[int(file.pos):end], buffer[:size])
+	file.pos = i64(end)
+	return size
+}
+
+@(export, link_name = "oc_file_pos")
+host_file_pos :: proc "c" (handle: oc.file) -> i64 {
+	file := host_file_get(handle)
+	if file == nil {
+		return -1
+	}
+
+	return file.pos
+}
+
+// Seeking past the end is allowed, like on the hosts Orca runs on.
+@(export, link_name = "oc_file_seek")
+host_file_seek :: proc "c" (handle: oc.file, offset: i64, whence: oc.file_whence) -> i64 {
+	file := host_file_get(handle)
+	if file == nil {
+		return -1
+	}
+
+	switch whence {
+	case .SET:
+		file.pos = offset
+	case .END:
+		file.pos = i64(len(file.data)) + offset
+	case .CURRENT:
+		file.pos += offset
+	}
+
+	file.pos = max(file.pos, 0)
+	return file.pos
+}
+
+@(export, link_name = "oc_file_last_error")
+host_file_last_error :: proc "c" (handle: oc.file) -> oc.io_error {
+	return .OK if host_file_get(handle) != nil else .HANDLE
+}
+
+@(export, link_name = "oc_file_get_status")
+host_file_get_status :: proc "c" (handle: oc.file) -> oc.file_status {
+	file := host_file_get(handle)
+	if file == nil {
+		return {}
+	}
+
+	return {type = .REGULAR, size = u64(len(file.data))}
+}
+
+@(export, link_name = "oc_io_wait_single_req")
+host_io_wait_single_req :: proc "c" (req: ^oc.io_req) -> oc.io_cmp {
+	cmp := oc.io_cmp{id = req.id}
+
+	if host_file_get(req.handle) == nil {
+		cmp.error = .HANDLE
+		return cmp
+	}
+
+	#partial switch req.op {
+	case .SEEK:
+		cmp.offset = host_file_seek(req.handle, req.offset, req.whence)
+	case .READ:
+		cmp.size = host_file_read(req.handle, req.size, req.buffer)
+	case:
+		cmp.error = .OP
+	}
+
+	return cmp
+}
+
+// Calls that reached the font stand-ins, the font cache tests count what the cache let through.
+@(thread_local)
+host_font_calls: int
+
+// Every glyph advances by the font size.
+@(export, link_name = "oc_font_text_metrics")
+host_font_text_metrics :: proc "c" (font: oc.font, fontSize: f32, text: oc.str8) -> oc.text_metrics {
+	host_font_calls += 1
+	return {advance = {f32(len(text)) * fontSize, fontSize}}
+}
+
+// The glyph index of a code point is the code point plus one.
+@(export, link_name = "oc_font_get_glyph_indices")
+host_font_get_glyph_indices :: proc "c" (font: oc.font, codePoints: oc.str32, backing: oc.str32) -> oc.str32 {
+	host_font_calls += 1
+
+	count := min(len(codePoints), len(backing))
+	for i in 0 ..< count {
+		backing[i] = codePoints[i] + 1
+	}
+
+	return backing[:count]
+}
+
+@(export, link_name = "oc_font_destroy")
+host_font_destroy :: proc "c" (font: oc.font) {
+}
+
+// Messages logged through log_ext, the input tests check the warning about dropped text.
+// Defined without the C varargs, the extra arguments are ignored.
+@(thread_local)
+host_log_calls: int
+
+@(export, link_name = "oc_log_ext")
+host_log_ext :: proc "c" (level: oc.log_level, function: cstring, file: cstring, line: i32, fmt: cstring) {
+	host_log_calls += 1
+}
+
+// What the host clipboard holds for the next paste.
+@(thread_local)
+host_clipboard: string
+
+// Only reached for clipboard pastes, the native input_process_event handles every other event.
+@(export, link_name = "oc_input_process_event")
+host_input_process_event :: proc "c" (arena: ^oc.arena, state: ^oc.input_state, event: ^oc.event) {
+	if event.type == .CLIPBOARD_PASTE {
+		state.clipboard.lastUpdate = state.frameCounter
+		state.clipboard.pastedText = host_clipboard
+	}
+}
+
+// Canvas calls in the order they reached the host, the recorder tests compare them with the recorded stream.
+host_canvas_log :: struct {
+	kinds: [64]oc.canvas_command_kind,
+	count: int,
+	width: f32,
+	text: string,
+}
+
+@(thread_local)
+host_canvas: host_canvas_log
+
+@(private)
+host_canvas_call :: proc "contextless" (kind: oc.canvas_command_kind) {
+	if host_canvas.count < len(host_canvas.kinds) {
+		host_canvas.kinds[host_canvas.count] = kind
+	}
+
+	host_canvas.count += 1
+}
+
+@(export, link_name = "oc_matrix_push")
+host_matrix_push :: proc "c" (_matrix: oc.mat2x3) {
+	host_canvas_call(.MATRIX_PUSH)
+}
+
+@(export, link_name = "oc_matrix_multiply_push")
+host_matrix_multiply_push :: proc "c" (_matrix: oc.mat2x3) {
+	host_canvas_call(.MATRIX_MULTIPLY_PUSH)
+}
+
+@(export, link_name = "oc_matrix_pop")
+host_matrix_pop :: proc "c" () {
+	host_canvas_call(.MATRIX_POP)
+}
+
+@(export, link_name = "oc_clip_push")
+host_clip_push :: proc "c" (x: f32, y: f32, w: f32, h: f32) {
+	host_canvas_call(.CLIP_PUSH)
+}
+
+@(export, link_name = "oc_clip_pop")
+host_clip_pop :: proc "c" () {
+	host_canvas_call(.CLIP_POP)
+}
+
+@(export, link_name = "oc_set_color")
+host_set_color :: proc "c" (_color: oc.color) {
+	host_canvas_call(.SET_COLOR)
+}
+
+@(export, link_name = "oc_set_color_rgba")
+host_set_color_rgba :: proc "c" (r: f32, g: f32, b: f32, a: f32) {
+	host_canvas_call(.SET_COLOR_RGBA)
+}
+
+@(export, link_name = "oc_set_color_srgba")
+host_set_color_srgba :: proc "c" (r: f32, g: f32, b: f32, a: f32) {
+	host_canvas_call(.SET_COLOR_SRGBA)
+}
+
+@(export, link_name = "oc_set_gradient")
+host_set_gradient :: proc "c" (blendSpace: oc.gradient_blend_space, bottomLeft: oc.color, bottomRight: oc.color, topRight: oc.color, topLeft: oc.color) {
+	host_canvas_call(.SET_GRADIENT)
+}
+
+@(export, link_name = "oc_set_width")
+host_set_width :: proc "c" (width: f32) {
+	host_canvas_call(.SET_WIDTH)
+	host_canvas.width = width
+}
+
+@(export, link_name = "oc_set_tolerance")
+host_set_tolerance :: proc "c" (tolerance: f32) {
+	host_canvas_call(.SET_TOLERANCE)
+}
+
+@(export, link_name = "oc_set_joint")
+host_set_joint :: proc "c" (joint: oc.joint_type) {
+	host_canvas_call(.SET_JOINT)
+}
+
+@(export, link_name = "oc_set_max_joint_excursion")
+host_set_max_joint_excursion :: proc "c" (maxJointExcursion: f32) {
+	host_canvas_call(.SET_MAX_JOINT_EXCURSION)
+}
+
+@(export, link_name = "oc_set_cap")
+host_set_cap :: proc "c" (cap: oc.cap_type) {
+	host_canvas_call(.SET_CAP)
+}
+
+@(export, link_name = "oc_set_font")
+host_set_font :: proc "c" (font: oc.font) {
+	host_canvas_call(.SET_FONT)
+}
+
+@(export, link_name = "oc_set_font_size")
+host_set_font_size :: proc "c" (size: f32) {
+	host_canvas_call(.SET_FONT_SIZE)
+}
+
+@(export, link_name = "oc_set_text_flip")
+host_set_text_flip :: proc "c" (flip: bool) {
+	host_canvas_call(.SET_TEXT_FLIP)
+}
+
+@(export, link_name = "oc_set_image")
+host_set_image :: proc "c" (image: oc.image) {
+	host_canvas_call(.SET_IMAGE)
+}
+
+@(export, link_name = "oc_set_image_source_region")
+host_set_image_source_region :: proc "c" (region: oc.rect) {
+	host_canvas_call(.SET_IMAGE_SOURCE_REGION)
+}
+
+@(export, link_name = "oc_move_to")
+host_move_to :: proc "c" (x: f32, y: f32) {
+	host_canvas_call(.MOVE_TO)
+}
+
+@(export, link_name = "oc_line_to")
+host_line_to :: proc "c" (x: f32, y: f32) {
+	host_canvas_call(.LINE_TO)
+}
+
+@(export, link_name = "oc_quadratic_to")
+host_quadratic_to :: proc "c" (x1: f32, y1: f32, x2: f32, y2: f32) {
+	host_canvas_call(.QUADRATIC_TO)
+}
+
+@(export, link_name = "oc_cubic_to")
+host_cubic_to :: proc "c" (x1: f32, y1: f32, x2: f32, y2: f32, x3: f32, y3: f32) {
+	host_canvas_call(.CUBIC_TO)
+}
+
+@(export, link_name = "oc_close_path")
+host_close_path :: proc "c" () {
+	host_canvas_call(.CLOSE_PATH)
+}
+
+@(export, link_name = "oc_codepoints_outlines")
+host_codepoints_outlines :: proc "c" (string: oc.str32) {
+	host_canvas_call(.CODEPOINTS_OUTLINES)
+}
+
+@(export, link_name = "oc_text_outlines")
+host_text_outlines :: proc "c" (string: oc.str8) {
+	host_canvas_call(.TEXT_OUTLINES)
+}
+
+@(export, link_name = "oc_clear")
+host_clear :: proc "c" () {
+	host_canvas_call(.CLEAR)
+}
+
+@(export, link_name = "oc_fill")
+host_fill :: proc "c" () {
+	host_canvas_call(.FILL)
+}
+
+@(export, link_name = "oc_stroke")
+host_stroke :: proc "c" () {
+	host_canvas_call(.STROKE)
+}
+
+@(export, link_name = "oc_rectangle_fill")
+host_rectangle_fill :: proc "c" (x: f32, y: f32, w: f32, h: f32) {
+	host_canvas_call(.RECTANGLE_FILL)
+}
+
+@(export, link_name = "oc_rectangle_stroke")
+host_rectangle_stroke :: proc "c" (x: f32, y: f32, w: f32, h: f32) {
+	host_canvas_call(.RECTANGLE_STROKE)
+}
+
+@(export, link_name = "oc_rounded_rectangle_fill")
+host_rounded_rectangle_fill :: proc "c" (x: f32, y: f32, w: f32, h: f32, r: f32) {
+	host_canvas_call(.ROUNDED_RECTANGLE_FILL)
+}
+
+@(export, link_name = "oc_rounded_rectangle_stroke")
+host_rounded_rectangle_stroke :: proc "c" (x: f32, y: f32, w: f32, h: f32, r: f32) {
+	host_canvas_call(.ROUNDED_RECTANGLE_STROKE)
+}
+
+@(export, link_name = "oc_ellipse_fill")
+host_ellipse_fill :: proc "c" (x: f32, y: f32, rx: f32, ry: f32) {
+	host_canvas_call(.ELLIPSE_FILL)
+}
+
+@(export, link_name = "oc_ellipse_stroke")
+host_ellipse_stroke :: proc "c" (x: f32, y: f32, rx: f32, ry: f32) {
+	host_canvas_call(.ELLIPSE_STROKE)
+}
+
+@(export, link_name = "oc_circle_fill")
+host_circle_fill :: proc "c" (x: f32, y: f32, r: f32) {
+	host_canvas_call(.CIRCLE_FILL)
+}
+
+@(export, link_name = "oc_circle_stroke")
+host_circle_stroke :: proc "c" (x: f32, y: f32, r: f32) {
+	host_canvas_call(.CIRCLE_STROKE)
+}
+
+@(export, link_name = "oc_arc")
+host_arc :: proc "c" (x: f32, y: f32, r: f32, arcAngle: f32, startAngle: f32) {
+	host_canvas_call(.ARC)
+}
+
+@(export, link_name = "oc_text_fill")
+host_text_fill :: proc "c" (x: f32, y: f32, text: oc.str8) {
+	host_canvas_call(.TEXT_FILL)
+	host_canvas.text = string(text)
+}
+
+@(export, link_name = "oc_image_draw")
+host_image_draw :: proc "c" (image: oc.image, rect: oc.rect) {
+	host_canvas_call(.IMAGE_DRAW)
+}
+
+@(export, link_name = "oc_image_draw_region")
+host_image_draw_region :: proc "c" (image: oc.image, srcRegion: oc.rect, dstRegion: oc.rect) {
+	host_canvas_call(.IMAGE_DRAW_REGION)
+}
@@ -0,0 +1,220 @@
+package orca_tests
+
+import "core:testing"
+
+import oc "../.."
+
+// Expected values follow the host's oc_input_process_event and input queries.
+
+@(private = "file")
+key :: proc(code: oc.key_code, action: oc.key_action, mods: oc.keymod_flags = {}) -> oc.event {
+	e := oc.event{type = .KEYBOARD_KEY}
+	e.key = {action = action, keyCode = code, mods = mods}
+	return e
+}
+
+@(private = "file")
+button :: proc(b: oc.mouse_button, action: oc.key_action, clicks: u8 = 0) -> oc.event {
+	e := oc.event{type = .MOUSE_BUTTON}
+	e.key = {action = action, button = b, clickCount = clicks}
+	return e
+}
+
+@(private = "file")
+move :: proc(x, y, dx, dy: f32) -> oc.event {
+	e := oc.event{type = .MOUSE_MOVE}
+	e.mouse = {x = x, y = y, deltaX = dx, deltaY = dy}
+	return e
+}
+
+@(private = "file")
+wheel :: proc(dx, dy: f32) -> oc.event {
+	e := oc.event{type = .MOUSE_WHEEL}
+	e.mouse = {deltaX = dx, deltaY = dy}
+	return e
+}
+
+@(private = "file")
+character :: proc(codepoint: oc.utf32) -> oc.event {
+	e := oc.event{type = .KEYBOARD_CHAR}
+	e.character = {codepoint = codepoint}
+	return e
+}
+
+// Feed a frame of events through input_process_event.
+@(private = "file")
+replay :: proc(arena: ^oc.arena, state: ^oc.input_state, events: []oc.event) {
+	for &e in events {
+		oc.input_process_event(arena, state, &e)
+	}
+}
+
+@(test)
+test_input_key_transitions_per_frame :: proc(t: ^testing.T) {
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	state: oc.input_state
+	oc.input_next_frame(&state)
+
+	replay(&arena, &state, {key(.A, .PRESS)})
+	testing.expect(t, oc.key_down(&state, .A))
+	testing.expect_value(t, oc.key_press_count(&state, .A), 1)
+	testing.expect_value(t, oc.key_release_count(&state, .A), 0)
+
+	// up and down again in the same frame, a press while down isn't a transition
+	replay(&arena, &state, {key(.A, .RELEASE), key(.A, .PRESS), key(.A, .PRESS), key(.A, .REPEAT), key(.A, .REPEAT)})
+	testing.expect_value(t, oc.key_press_count(&state, .A), 2)
+	testing.expect_value(t, oc.key_release_count(&state, .A), 1)
+	testing.expect_value(t, oc.key_repeat_count(&state, .A), 2)
+
+	// counts are per frame, the key stays down
+	oc.input_next_frame(&state)
+	testing.expect(t, oc.key_down(&state, .A))
+	testing.expect_value(t, oc.key_press_count(&state, .A), 0)
+	testing.expect_value(t, oc.key_repeat_count(&state, .A), 0)
+
+	replay(&arena, &state, {key(.A, .RELEASE), key(.A, .RELEASE)})
+	testing.expect(t, !oc.key_down(&state, .A))
+	testing.expect_value(t, oc.key_press_count(&state, .A), 0)
+	testing.expect_value(t, oc.key_release_count(&state, .A), 1)
+
+	// other keys are untouched
+	testing.expect(t, !oc.key_down(&state, .ENTER))
+	testing.expect_value(t, oc.key_press_count(&state, .ENTER), 0)
+}
+
+@(test)
+test_input_mods :: proc(t: ^testing.T) {
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	state: oc.input_state
+	replay(&arena, &state, {key(.LEFT_SHIFT, .PRESS, {.SHIFT})})
+	testing.expect_value(t, oc.key_mods(&state), oc.keymod_flags{.SHIFT})
+
+	mods := oc.event{type = .KEYBOARD_MODS}
+	mods.key.mods = {.SHIFT, .CTRL}
+	replay(&arena, &state, {mods})
+	testing.expect_value(t, oc.key_mods(&state), oc.keymod_flags{.SHIFT, .CTRL})
+
+	// mouse buttons carry the mods as well
+	replay(&arena, &state, {button(.LEFT, .PRESS, 1)})
+	testing.expect_value(t, oc.key_mods(&state), oc.keymod_flags{})
+}
+
+@(test)
+test_input_mouse_motion_and_wheel :: proc(t: ^testing.T) {
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	state: oc.input_state
+	oc.input_next_frame(&state)
+
+	replay(&arena, &state, {move(10, 20, 1, 2), move(12, 25, 2, 5), wheel(0, -3), wheel(1, -3)})
+	testing.expect_value(t, oc.mouse_position(&state), oc.vec2{12, 25})
+	testing.expect_value(t, oc.mouse_delta(&state), oc.vec2{3, 7})
+	testing.expect_value(t, oc.mouse_wheel(&state), oc.vec2{1, -6})
+
+	// motion is per frame, the position stays
+	oc.input_next_frame(&state)
+	testing.expect_value(t, oc.mouse_position(&state), oc.vec2{12, 25})
+	testing.expect_value(t, oc.mouse_delta(&state), oc.vec2{0, 0})
+	testing.expect_value(t, oc.mouse_wheel(&state), oc.vec2{0, 0})
+
+	// a wheel event starts a new frame of motion as well
+	replay(&arena, &state, {wheel(0, 2), move(13, 25, 1, 0)})
+	testing.expect_value(t, oc.mouse_delta(&state), oc.vec2{1, 0})
+	testing.expect_value(t, oc.mouse_wheel(&state), oc.vec2{0, 2})
+}
+
+@(test)
+test_input_clicks :: proc(t: ^testing.T) {
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	state: oc.input_state
+	oc.input_next_frame(&state)
+
+	replay(&arena, &state, {button(.LEFT, .PRESS, 1), button(.LEFT, .RELEASE)})
+	testing.expect(t, !oc.mouse_down(&state, .LEFT))
+	testing.expect_value(t, oc.mouse_pressed(&state, .LEFT), 1)
+	testing.expect_value(t, oc.mouse_released(&state, .LEFT), 1)
+	testing.expect(t, oc.mouse_clicked(&state, .LEFT))
+	testing.expect(t, !oc.mouse_double_clicked(&state, .LEFT))
+	testing.expect(t, !oc.mouse_clicked(&state, .RIGHT))
+
+	oc.input_next_frame(&state)
+	testing.expect(t, !oc.mouse_clicked(&state, .LEFT))
+	testing.expect_value(t, oc.mouse_pressed(&state, .LEFT), 0)
+
+	replay(&arena, &state, {button(.LEFT, .PRESS, 2)})
+	testing.expect(t, oc.mouse_down(&state, .LEFT))
+	testing.expect(t, oc.mouse_clicked(&state, .LEFT))
+	testing.expect(t, oc.mouse_double_clicked(&state, .LEFT))
+
+	// a release doesn't clear the clicks of the frame
+	replay(&arena, &state, {button(.LEFT, .RELEASE, 2)})
+	testing.expect(t, oc.mouse_double_clicked(&state, .LEFT))
+
+	// the first event of the next frame resets the click flags
+	oc.input_next_frame(&state)
+	replay(&arena, &state, {button(.LEFT, .PRESS, 0)})
+	testing.expect(t, !oc.mouse_clicked(&state, .LEFT))
+	testing.expect(t, !oc.mouse_double_clicked(&state, .LEFT))
+	testing.expect_value(t, oc.mouse_pressed(&state, .LEFT), 1)
+}
+
+@(test)
+test_input_text_per_frame :: proc(t: ^testing.T) {
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	state: oc.input_state
+	oc.input_next_frame(&state)
+
+	replay(&arena, &state, {character('h'), character('é'), character('!')})
+	testing.expect_value(t, len(state.text.codePoints), 3)
+	testing.expect_value(t, state.text.codePoints[1], 'é')
+
+	// text is per frame
+	oc.input_next_frame(&state)
+	replay(&arena, &state, {character('x')})
+	testing.expect_value(t, len(state.text.codePoints), 1)
+	testing.expect_value(t, state.text.codePoints[0], 'x')
+
+	// codepoints past the backing are dropped with a warning
+	oc.input_next_frame(&state)
+	host_log_calls = 0
+	for i in 0 ..< len(state.text.backing) + 3 {
+		replay(&arena, &state, {character('a' + oc.utf32(i % 26))})
+	}
+	testing.expect_value(t, len(state.text.codePoints), len(state.text.backing))
+	testing.expect_value(t, state.text.codePoints[len(state.text.backing) - 1], 'a' + oc.utf32((len(state.text.backing) - 1) % 26))
+	testing.expect_value(t, host_log_calls, 3)
+}
+
+@(test)
+test_input_clipboard_paste :: proc(t: ^testing.T) {
+	arena: oc.arena
+	oc.arena_init(&arena)
+	defer oc.arena_cleanup(&arena)
+
+	state: oc.input_state
+	oc.input_next_frame(&state)
+	testing.expect(t, !oc.clipboard_pasted(&state))
+
+	host_clipboard = "pasted"
+	replay(&arena, &state, {{type = .CLIPBOARD_PASTE}})
+	testing.expect(t, oc.clipboard_pasted(&state))
+	testing.expect_value(t, oc.clipboard_pasted_text(&state), "pasted")
+
+	oc.input_next_frame(&state)
+	testing.expect(t, !oc.clipboard_pasted(&state))
+	testing.expect_value(t, oc.clipboard_pasted_text(&state), "")
+}
@@ -0,0 +1,175 @@
+package orca_tests
+
+import "core:math/rand"
+import "core:testing"
+
+import oc "../.."
+
+@(private = "file")
+pool_object :: struct {
+	id: u64,
+	payload: [5]u32,
+}
+
+@(test)
+test_pool_reuses_freed_objects :: proc(t: ^testing.T) {
+	pool: oc.typed_pool(pool_object)
+	oc.pool_init(&pool)
+	defer oc.pool_cleanup(&pool)
+
+	objects: [16]^pool_object
+	for &object in objects {
+		object = oc.pool_alloc(&pool)
+		object.id = 7
+	}
+
+	for object in objects {
+		oc.pool_free(&pool, object)
+	}
+
+	for _ in objects {
+		object := oc.pool_alloc(&pool)
+		testing.expect_value(t, object.id, 0)
+	}
+
+	testing.expect_value(t, pool.allocated, 16)
+	testing.expect_value(t, pool.reused, 16)
+	testing.expect_value(t, pool.live, 16)
+	testing.expect_value(t, pool.peak, 16)
+}
+
+// Random allocs and frees never hand out a live object twice, and the arena only grows when the free list is empty.
+@(test)
+test_pool_churn :: proc(t: ^testing.T) {
+	pool: oc.typed_pool(pool_object)
+	oc.pool_init(&pool)
+	defer oc.pool_cleanup(&pool)
+
+	live := make([dynamic]^pool_object)
+	defer delete(live)
+	owners := make(map[^pool_object]u64)
+	defer delete(owners)
+
+	// the test runner seeds the random generator and prints the seed of a failing test
+	next_id: u64 = 1
+
+	for step in 0 ..< 20000 {
+		if len(live) == 0 || rand.float32() < 0.55 {
+			object := oc.pool_alloc(&pool)
+			testing.expectf(t, object.id == 0 && object.payload == [5]u32{}, "step %d: object not zeroed", step)
+			testing.expectf(t, object not_in owners, "step %d: live object handed out twice", step)
+			testing.expectf(t, uintptr(object) % align_of(pool_object) == 0, "step %d: misaligned object", step)
+
+			object.id = next_id
+			object.payload[0] = u32(next_id)
+			owners[object] = next_id
+			next_id += 1
+			append(&live, object)
+		} else {
+			index := rand.int_max(len(live))
+			object := live[index]
+			testing.expectf(t, object.id == owners[object], "step %d: object overwritten while live", step)
+
+			delete_key(&owners, object)
+			unordered_remove(&live, index)
+			oc.pool_free(&pool, object)
+		}
+
+		testing.expect_value(t, pool.live, u64(len(live)))
+		testing.expect_value(t, pool.allocated, pool.peak)
+	}
+
+	testing.expect(t, pool.reused > 0)
+}
+
+@(test)
+test_pool_reserve_fills_the_free_list :: proc(t: ^testing.T) {
+	pool: oc.typed_pool(pool_object)
+	oc.pool_init(&pool)
+	defer oc.pool_cleanup(&pool)
+
+	oc.pool_reserve(&pool, 32)
+	for _ in 0 ..< 32 {
+		oc.pool_alloc(&pool)
+	}
+
+	testing.expect_value(t, pool.allocated, 32)
+	testing.expect_value(t, pool.reused, 32)
+
+	oc.pool_alloc(&pool)
+	testing.expect_value(t, pool.allocated, 33)
+}
+
+@(test)
+test_pool_clear_releases_everything :: proc(t: ^testing.T) {
+	pool: oc.typed_pool(pool_object)
+	oc.pool_init(&pool)
+	defer oc.pool_cleanup(&pool)
+
+	for round in 0 ..< 4 {
+		for _ in 0 ..< 100 {
+			oc.pool_alloc(&pool)
+		}
+
+		testing.expectf(t, pool.allocated == 100, "round %d: %d allocated", round, pool.allocated)
+		oc.pool_clear(&pool)
+		testing.expect_value(t, pool.live, 0)
+	}
+}
+
+// Objects smaller than a list link still get a whole block.
+@(test)
+test_pool_small_objects :: proc(t: ^testing.T) {
+	pool: oc.typed_pool(u8)
+	oc.pool_init(&pool)
+	defer oc.pool_cleanup(&pool)
+
+	testing.expect_value(t, pool.blockSize, u64(size_of(oc.list_elt)))
+
+	a := oc.pool_alloc(&pool)
+	b := oc.pool_alloc(&pool)
+	distance := uintptr(b) - uintptr(a) if uintptr(b) > uintptr(a) else uintptr(a) - uintptr(b)
+	testing.expect(t, distance >= size_of(oc.list_elt))
+
+	oc.pool_free(&pool, a)
+	testing.expect_value(t, oc.pool_alloc(&pool), a)
+}
+
+// 20 bytes, not a multiple of the alignment of a list link on 64-bit targets.
+@(private = "file")
+odd_object :: struct {
+	payload: [5]u32,
+}
+
+// Reserved blocks are contiguous, the block size keeps every link and object aligned.
+@(test)
+test_pool_reserve_keeps_blocks_aligned :: proc(t: ^testing.T) {
+	pool: oc.typed_pool(odd_object)
+	oc.pool_init(&pool)
+	defer oc.pool_cleanup(&pool)
+
+	align := uintptr(max(align_of(odd_object), align_of(oc.list_elt)))
+	testing.expect_value(t, uintptr(pool.blockSize) % align, 0)
+	testing.expect(t, pool.blockSize >= u64(size_of(odd_object)))
+
+	oc.pool_reserve(&pool, 7)
+	objects: [7]^odd_object
+	for &object, i in objects {
+		object = oc.pool_alloc(&pool)
+		testing.expectf(t, uintptr(object) % align == 0, "block %d is misaligned", i)
+		object.payload = {u32(i), u32(i), u32(i), u32(i), u32(i)}
+	}
+
+	// freeing writes links into the blocks, neighbours stay intact
+	for object, i in objects {
+		if i % 2 == 0 {
+			oc.pool_free(&pool, object)
+		}
+	}
+
+	for object, i in objects {
+		if i % 2 == 1 {
+			testing.expectf(t, object.payload == [5]u32{u32(i), u32(i), u32(i), u32(i), u32(i)}, "block %d overwritten", i)
+		}
+	}
+}
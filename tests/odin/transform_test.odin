@@ -0,0 +1,116 @@
+package orca_tests
+
+import "core:log"
+import "core:testing"
+import "core:time"
+
+import oc "../.."
+
+TRANSFORM_POINTS :: 1 << 16
+TRANSFORM_ROUNDS :: 64
+
+@(private = "file")
+transform_matrix :: oc.mat2x3{0.8, -0.6, 12, 0.6, 0.8, -7}
+
+@(private = "file")
+near :: proc(a, b: f32) -> bool {
+	return abs(a - b) <= 1e-3 * max(1, abs(a), abs(b))
+}
+
+@(test)
+test_transform_points_matches_per_point :: proc(t: ^testing.T) {
+	// odd, so the scalar tail runs as well
+	src := make([]oc.vec2, 37)
+	defer delete(src)
+	dst := make([]oc.vec2, 37)
+	defer delete(dst)
+
+	for &p, i in src {
+		p = {f32(i) * 0.5, 3 - f32(i)}
+	}
+
+	oc.mat2x3_transform_points(transform_matrix, src, dst)
+
+	for p, i in src {
+		want := oc.mat2x3_mul(transform_matrix, p)
+		testing.expectf(t, near(dst[i].x, want.x) && near(dst[i].y, want.y), "point %d: %v, want %v", i, dst[i], want)
+	}
+}
+
+@(test)
+test_transform_points_stops_at_shorter_slice :: proc(t: ^testing.T) {
+	src := []oc.vec2{{1, 2}, {3, 4}, {5, 6}}
+	dst := []oc.vec2{{-1, -1}, {-1, -1}, {-1, -1}}
+
+	oc.mat2x3_transform_points(transform_matrix, src[:2], dst)
+	testing.expect_value(t, dst[2], oc.vec2{-1, -1})
+}
+
+@(test)
+test_rects_transform_bounds_the_corners :: proc(t: ^testing.T) {
+	src := []oc.rect{{0, 0, 10, 5}, {-3, 4, 1, 20}}
+	dst := make([]oc.rect, len(src))
+	defer delete(dst)
+
+	oc.rects_transform(transform_matrix, src, dst)
+
+	for r, i in src {
+		corners := [4]oc.vec2{{r.x, r.y}, {r.x + r.w, r.y}, {r.x, r.y + r.h}, {r.x + r.w, r.y + r.h}}
+		lo := oc.mat2x3_mul(transform_matrix, corners[0])
+		hi := lo
+
+		for corner in corners[1:] {
+			p := oc.mat2x3_mul(transform_matrix, corner)
+			lo = {min(lo.x, p.x), min(lo.y, p.y)}
+			hi = {max(hi.x, p.x), max(hi.y, p.y)}
+		}
+
+		got := dst[i]
+		testing.expectf(
+			t,
+			near(got.x, lo.x) && near(got.y, lo.y) && near(got.w, hi.x - lo.x) && near(got.h, hi.y - lo.y),
+			"rect %d: %v",
+			i,
+			got,
+		)
+	}
+}
+
+// Time per point of `mat2x3_transform_points` against one `mat2x3_mul` call per point.
+@(test)
+bench_transform_points :: proc(t: ^testing.T) {
+	src := make([]oc.vec2, TRANSFORM_POINTS)
+	defer delete(src)
+	dst := make([]oc.vec2, TRANSFORM_POINTS)
+	defer delete(dst)
+
+	for &p, i in src {
+		p = {f32(i % 1024), f32(i / 1024)}
+	}
+
+	checksum: f32
+	start := time.tick_now()
+	for _ in 0 ..< TRANSFORM_ROUNDS {
+		for p, i in src {
+			dst[i] = oc.mat2x3_mul(transform_matrix, p)
+		}
+		checksum += dst[TRANSFORM_POINTS - 1].x
+	}
+	per_point := time.tick_since(start)
+
+	start = time.tick_now()
+	for _ in 0 ..< TRANSFORM_ROUNDS {
+		oc.mat2x3_transform_points(transform_matrix, src, dst)
+		checksum -= dst[TRANSFORM_POINTS - 1].x
+	}
+	batched := time.tick_since(start)
+
+	count := f64(TRANSFORM_POINTS * TRANSFORM_ROUNDS)
+	log.infof(
+		"%d points: mat2x3_mul %.2f ns/point, mat2x3_transform_points %.2f ns/point, checksum %v",
+		TRANSFORM_POINTS,
+		f64(time.duration_nanoseconds(per_point)) / count,
+		f64(time.duration_nanoseconds(batched)) / count,
+		checksum,
+	)
+}
@@ -0,0 +1,164 @@
+package orca_tests
+
+import "core:testing"
+
+import oc "../.."
+
+// What the host's oc_utf8_decode_at returns at the start of `text`, the codepoint is only checked for valid sequences.
+@(private = "file")
+decode_case :: struct {
+	text: string,
+	status: oc.utf8_status,
+	codepoint: oc.utf32,
+	size: u32,
+}
+
+@(private = "file")
+decode_cases := []decode_case{
+	{"A", .OK, 'A', 1},
+	{"\x00", .OK, 0, 1},
+	{"é", .OK, 0xe9, 2},
+	{"€", .OK, 0x20ac, 3},
+	{"\U0001f600", .OK, 0x1f600, 4},
+	{"\U0010ffff", .OK, 0x10ffff, 4},
+	// overlong encodings of '/' and of U+20AC
+	{"\xc0\xaf", .OVERLONG_ENCODING, 0, 2},
+	{"\xe0\x80\xaf", .OVERLONG_ENCODING, 0, 3},
+	{"\xf0\x82\x82\xac", .OVERLONG_ENCODING, 0, 4},
+	// utf16 surrogates and codepoints past U+10FFFF
+	{"\xed\xa0\x80", .INVALID_CODEPOINT, 0, 3},
+	{"\xed\xbf\xbf", .INVALID_CODEPOINT, 0, 3},
+	{"\xf4\x90\x80\x80", .INVALID_CODEPOINT, 0, 4},
+	// truncated sequences
+	{"\xc3", .OUT_OF_BOUNDS, 0, 1},
+	{"\xe2\x82", .OUT_OF_BOUNDS, 0, 2},
+	{"\xf0\x9f\x98", .OUT_OF_BOUNDS, 0, 3},
+	// a new sequence starts before the last one ended
+	{"\xe2\x82A", .UNEXPECTED_LEADING_BYTE, 0, 2},
+	{"\xc3\xc3\xa9", .UNEXPECTED_LEADING_BYTE, 0, 1},
+	// stray continuation bytes and bytes that never occur
+	{"\x80", .UNEXPECTED_CONTINUATION_BYTE, 0, 1},
+	{"\xbf\x80", .UNEXPECTED_CONTINUATION_BYTE, 0, 1},
+	{"\xf8\x88\x80\x80\x80", .INVALID_BYTE, 0, 1},
+	{"\xff", .INVALID_BYTE, 0, 1},
+}
+
+@(test)
+test_utf8_decode_malformed :: proc(t: ^testing.T) {
+	for c in decode_cases {
+		dec := oc.utf8_decode(c.text)
+		testing.expectf(t, dec.status == c.status && dec.size == c.size, "%q: %v size %d, want %v size %d", c.text, dec.status, dec.size, c.status, c.size)
+
+		if c.status == .OK {
+			testing.expectf(t, dec.codepoint == c.codepoint, "%q: codepoint %x, want %x", c.text, dec.codepoint, c.codepoint)
+		}
+	}
+
+	testing.expect_value(t, oc.utf8_decode("").status, oc.utf8_status.OUT_OF_BOUNDS)
+	testing.expect_value(t, oc.utf8_decode_at("ab", 2).status, oc.utf8_status.OUT_OF_BOUNDS)
+}
+
+// Codepoint count and decoded codepoints of the host, every malformed byte counts as one codepoint.
+@(private = "file")
+string_case :: struct {
+	text: string,
+	codepoints: []oc.utf32,
+}
+
+@(private = "file")
+string_cases := []string_case{
+	{"", {}},
+	{"hello", {'h', 'e', 'l', 'l', 'o'}},
+	{"aé€\U0001f600", {'a', 0xe9, 0x20ac, 0x1f600}},
+	// the string ends at its first zero byte, in the fast path and after it
+	{"ab\x00cd", {'a', 'b'}},
+	{"\x00abc", {}},
+	{"0123456789\x00abcdefgh", {'0', '1', '2', '3', '4', '5', '6', '7', '8', '9'}},
+	{"é\x00é", {0xe9}},
+	// malformed bytes are skipped one at a time
+	{"a\x80b", {'a', 0, 'b'}},
+	{"\xe2\x82", {0}},
+}
+
+@(private = "file")
+codepoints_equal :: proc(got: oc.str32, want: []oc.utf32, check_values: bool) -> bool {
+	if len(got) != len(want) {
+		return false
+	}
+
+	for cp, i in got {
+		if check_values && cp != want[i] {
+			return false
+		}
+	}
+
+	return true
+}
+
+@(test)
+test_utf8_strings_end_at_zero :: proc(t: ^testing.T) {
+	backing: [64]oc.utf32
+
+	for c in string_cases {
+		count := oc.utf8_codepoint_count_for_string(c.text)
+		testing.expectf(t, count == u64(len(c.codepoints)), "%q: %d codepoints, want %d", c.text, count, len(c.codepoints))
+
+		// the codepoint of a malformed sequence is up to the implementation
+		valid := true
+		for offset := u64(0); offset < u64(len(c.text)) && c.text[offset] != 0; {
+			dec := oc.utf8_decode_at(c.text, offset)
+			valid &&= dec.status == .OK
+			offset += u64(dec.size)
+		}
+
+		codepoints := oc.utf8_to_codepoints(len(backing), &backing[0], c.text)
+		testing.expectf(t, codepoints_equal(codepoints, c.codepoints, valid), "%q: %v, want %v", c.text, codepoints, c.codepoints)
+
+		limited := oc.utf8_to_codepoints(1, &backing[0], c.text)
+		testing.expectf(t, len(limited) == min(1, len(c.codepoints)), "%q: %d codepoints with maxCount 1", c.text, len(limited))
+	}
+
+	// a zero byte inside the string decodes like any other codepoint
+	dec := oc.utf8_decode_at("ab\x00cd", 2)
+	testing.expect_value(t, dec.status, oc.utf8_status.OK)
+	testing.expect_value(t, dec.codepoint, 0)
+	testing.expect_value(t, dec.size, 1)
+}
+
+// Long ascii runs go through the 8 byte fast path, the results match a byte by byte walk.
+@(test)
+test_utf8_ascii_fast_path :: proc(t: ^testing.T) {
+	text: [67]u8
+	for &b, i in text {
+		b = 'a' + u8(i % 26)
+	}
+
+	backing: [len(text)]oc.utf32
+
+	// a non-ascii byte or a zero at every position, the fast path has to stop at each one
+	for position in 0 ..< len(text) {
+		for stop in ([]u8{0x00, 0xc3}) {
+			saved := text[position]
+			text[position] = stop
+			defer text[position] = saved
+
+			s := string(text[:])
+			want := u64(position)
+			if stop != 0 {
+				// the lone leading byte is followed by an ascii byte
+				want = u64(len(text))
+			}
+
+			testing.expectf(t, oc.utf8_codepoint_count_for_string(s) == want, "%x at %d: %d codepoints, want %d", stop, position, oc.utf8_codepoint_count_for_string(s), want)
+
+			codepoints := oc.utf8_to_codepoints(len(backing), &backing[0], s)
+			testing.expectf(t, u64(len(codepoints)) == want, "%x at %d: %d decoded, want %d", stop, position, len(codepoints), want)
+
+			for cp, i in codepoints {
+				if i != position {
+					testing.expectf(t, cp == oc.utf32(text[i]), "%x at %d: codepoint %d is %x", stop, position, i, cp)
+				}
+			}
+		}
+	}
+}
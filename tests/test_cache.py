@@ -0,0 +1,157 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import API_PATH, GEN_PATH, every_option
+
+import gen
+
+def cached_files(cache_path, split):
+    odin_path = os.path.join(os.path.dirname(cache_path), "orca.odin")
+    cache = gen.ModuleCache(cache_path, gen.rules_fingerprint(dict(gen.gen_options, split=split)))
+    files = gen.generate_files(API_PATH, odin_path, cache, 1, split)
+    cache.save()
+    return files, cache
+
+# a cold and a warm cache produce the same bytes as a run without it
+@pytest.mark.parametrize("split", [False, True])
+@pytest.mark.parametrize("enabled", [False, True])
+def test_cached_output_is_identical(options, tmp_path, split, enabled):
+    if enabled:
+        options.update(every_option)
+
+    cache_path = str(tmp_path / "cache.json")
+    expected = gen.generate_files(API_PATH, str(tmp_path / "orca.odin"), None, 1, split)
+
+    cold, cold_cache = cached_files(cache_path, split)
+    warm, warm_cache = cached_files(cache_path, split)
+
+    assert cold == expected
+    assert warm == expected
+    assert cold_cache.hits == 0
+    assert warm_cache.misses == 0 and warm_cache.hits != 0
+
+# other options change the fingerprint, so nothing of the old cache is reused
+def test_options_invalidate_cache(options, tmp_path):
+    cache_path = str(tmp_path / "cache.json")
+    cached_files(cache_path, False)
+
+    options["algebra"] = "native"
+    files, cache = cached_files(cache_path, False)
+
+    assert cache.hits == 0
+    assert files == gen.generate_files(API_PATH, str(tmp_path / "orca.odin"), None, 1, False)
+
+# one cache over several runs like --watch, every run only counts and saves what it used
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_runs_reuse_modules_of_earlier_runs(options, tmp_path, jobs):
+    cache_path = str(tmp_path / "cache.json")
+    odin_path = str(tmp_path / "orca.odin")
+    cache = gen.ModuleCache(cache_path, gen.rules_fingerprint(dict(gen.gen_options, split=False)))
+    expected = gen.generate_files(API_PATH, odin_path, None, 1, False)
+
+    for run in range(3):
+        cache.reset_run()
+        assert gen.generate_files(API_PATH, odin_path, cache, jobs, False) == expected
+
+        if run == 0:
+            assert cache.hits == 0 and cache.misses != 0
+        else:
+            assert cache.misses == 0 and cache.hits != 0
+
+        cache.save()
+
+    with open(cache_path, "r") as cache_file:
+        saved = json.load(cache_file)["modules"]
+
+    assert saved.keys() == cache.used.keys()
+
+def write_api(path, api, **dump_args):
+    with open(path, "w") as api_file:
+        json.dump(api, api_file, **dump_args)
+
+def run_cached(api_path, cache_path):
+    odin_path = os.path.join(os.path.dirname(cache_path), "orca.odin")
+    cache = gen.ModuleCache(cache_path, gen.rules_fingerprint(dict(gen.gen_options, split=False)))
+    files = gen.generate_files(api_path, odin_path, cache, 1, False)
+    cache.save()
+    return files[odin_path], cache
+
+# editing a proc only regenerates its module and the modules above it
+def test_edited_proc_misses_its_modules(options, tmp_path):
+    with open(API_PATH, "r") as api_file:
+        api = json.load(api_file)
+
+    api_path = str(tmp_path / "api.json")
+    cache_path = str(tmp_path / "cache.json")
+    write_api(api_path, api)
+    run_cached(api_path, cache_path)
+
+    utility = next(module for module in api if module["name"] == "Utility")
+    nested = [node for node in utility["contents"] if node["kind"] == "module"]
+    clock = next(module for module in nested if module["name"] == "Clock")
+    proc = next(node for node in clock["contents"] if node["kind"] == "proc")
+    proc["doc"] = "Edited."
+    write_api(api_path, api)
+
+    text, cache = run_cached(api_path, cache_path)
+
+    assert "// Edited." in text
+    assert text == gen.generate_files(api_path, str(tmp_path / "orca.odin"), None, 1, False)[str(tmp_path / "orca.odin")]
+    assert cache.misses == 2
+    assert cache.hits == (len(api) - 1) + (len(nested) - 1)
+
+# top-level modules are keyed by their text, reformatting api.json misses them but not their nested modules
+def test_reformatted_api_reuses_nested_modules(options, tmp_path):
+    with open(API_PATH, "r") as api_file:
+        api = json.load(api_file)
+
+    api_path = str(tmp_path / "api.json")
+    cache_path = str(tmp_path / "cache.json")
+    write_api(api_path, api)
+    expected, _ = run_cached(api_path, cache_path)
+
+    write_api(api_path, api, indent=2)
+    text, cache = run_cached(api_path, cache_path)
+    nested = sum(1 for module in api for node in module["contents"] if node["kind"] == "module")
+
+    assert text == expected
+    assert cache.misses == len(api)
+    assert cache.hits == nested
+
+# like --batch, a later version only regenerates the modules that changed since an earlier one
+def test_batch_versions_share_modules(options, tmp_path):
+    with open(API_PATH, "r") as api_file:
+        api = json.load(api_file)
+
+    cache = gen.ModuleCache(None, None)
+    texts = []
+
+    for version in range(2):
+        directory = tmp_path / f"v{version}"
+        directory.mkdir()
+        if version == 1:
+            api[0]["brief"] = "Edited."
+
+        write_api(str(directory / "api.json"), api)
+        odin_path = str(directory / "orca.odin")
+        hits, misses = cache.hits, cache.misses
+
+        texts.append(gen.generate_files(str(directory / "api.json"), odin_path, cache, 1, False)[odin_path])
+        assert texts[-1] == gen.generate_files(str(directory / "api.json"), odin_path, None, 1, False)[odin_path]
+
+    nested = sum(1 for node in api[0]["contents"] if node["kind"] == "module")
+    assert cache.misses - misses == 1
+    assert cache.hits - hits == (len(api) - 1) + nested
+
+# --batch doesn't profile its runs, asking for it is an error rather than silently ignored
+@pytest.mark.parametrize("profile", [["--profile"], ["--profile-out", "batch.pstats"]])
+def test_batch_rejects_profile(tmp_path, profile):
+    result = subprocess.run([sys.executable, GEN_PATH, "--batch", API_PATH, *profile], capture_output=True, text=True, cwd=tmp_path)
+
+    assert result.returncode == 2
+    assert "--profile can't be combined with --watch or --batch" in result.stderr
+    assert list(tmp_path.iterdir()) == []
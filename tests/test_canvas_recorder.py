@@ -0,0 +1,73 @@
+import re
+
+from conftest import find_module
+
+import gen
+
+record_pattern = re.compile(r"^record_(\w+) :: proc.*?^}\n", re.MULTILINE | re.DOTALL)
+elision_pattern = re.compile(r"if rec\.state\.(\w+) == \.(\w+) && rec\.state\.\w+ == value")
+reset_pattern = re.compile(r"rec\.state\.(\w+) = \.NONE")
+
+# the elision checks and state resets of every recorded setter, read back from the generated code
+def recorded_setters(api_desc):
+    out = []
+    gen.gen_canvas_recorder(find_module(api_desc, "Canvas"), out)
+    setters = {}
+
+    for match in record_pattern.finditer("".join(out)):
+        body = match.group(0)
+        elision = elision_pattern.search(body)
+
+        if elision is not None:
+            setters[match.group(1)] = (elision.group(1), elision.group(2), reset_pattern.findall(body))
+
+    return setters
+
+# replay calls like the generated record procs do, returns the calls that reach the command buffer
+def record(setters, calls):
+    state = {}
+    recorded = []
+
+    for name, value in calls:
+        group, kind, resets = setters[name]
+
+        if state.get(group) == (kind, value):
+            continue
+
+        state[group] = (kind, value)
+        for reset in resets:
+            state.pop(reset, None)
+
+        recorded.append((name, value))
+
+    return recorded
+
+def test_repeated_setter_is_elided(options, api_desc):
+    setters = recorded_setters(api_desc)
+    calls = [("set_width", 2), ("set_width", 2), ("set_width", 3)]
+
+    assert record(setters, calls) == [("set_width", 2), ("set_width", 3)]
+
+def test_setters_of_a_group_invalidate_each_other(options, api_desc):
+    setters = recorded_setters(api_desc)
+    calls = [("set_color", "red"), ("set_color_rgba", "blue"), ("set_color", "red")]
+
+    assert record(setters, calls) == calls
+
+def test_set_image_forgets_the_source_region(options, api_desc):
+    setters = recorded_setters(api_desc)
+    calls = [("set_image_source_region", "r"), ("set_image", "img"), ("set_image_source_region", "r")]
+
+    assert record(setters, calls) == calls
+
+def test_repeated_set_image_keeps_the_source_region(options, api_desc):
+    setters = recorded_setters(api_desc)
+    calls = [("set_image", "img"), ("set_image_source_region", "r"), ("set_image", "img"), ("set_image_source_region", "r")]
+
+    assert record(setters, calls) == calls[:2]
+
+def test_every_state_group_is_tracked(options, api_desc):
+    setters = recorded_setters(api_desc)
+
+    for name, group in gen.canvas_state_groups.items():
+        assert setters[name][0] == group
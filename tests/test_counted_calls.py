@@ -0,0 +1,33 @@
+import gen
+
+def counted_text(proc):
+    out = []
+    gen.gen_counted_proc(proc, out)
+    return "".join(out)
+
+# directives are part of the param declaration, not of the forwarded argument
+def test_wrapper_forwards_bare_param_names():
+    proc = gen.Proc("ui_style_next", [gen.Param("#by_ptr style", "ui_style"), gen.Param("mask", "ui_style_mask")], None)
+    text = counted_text(proc)
+
+    assert "ui_style_next :: proc \"contextless\" (#by_ptr style: ui_style, mask: ui_style_mask) {" in text
+    assert "\thost_ui_style_next(style, mask)\n" in text
+
+def test_wrapper_returns_the_host_result():
+    proc = gen.Proc("clock_time", [gen.Param("clock", "clock_kind")], "f64")
+    text = counted_text(proc)
+
+    assert "\t_result := host_clock_time(clock)\n" in text
+    assert "\treturn _result\n" in text
+
+def test_forwarded_args_spread_variadic_params():
+    params = [gen.Param("fmt", "cstring"), gen.Param("#c_vararg args", "..any")]
+    assert gen.get_forwarded_args(params) == "fmt, ..args"
+
+# procs that never return or take C varargs are declared directly
+def test_unwrapped_procs(options):
+    options["calls"] = "counted"
+
+    assert not gen.is_counted_proc(gen.Proc("abort_ext", [gen.Param("#c_vararg args", "..any")], "!"))
+    assert not gen.is_counted_proc(gen.Proc("log_ext", [gen.Param("#c_vararg args", "..any")], None))
+    assert gen.is_counted_proc(gen.Proc("clock_time", [gen.Param("clock", "clock_kind")], "f64"))
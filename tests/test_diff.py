@@ -0,0 +1,126 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import API_PATH, GEN_PATH
+
+def run_diff(*args):
+    return subprocess.run([sys.executable, GEN_PATH, "diff", *args], capture_output=True, text=True)
+
+def find_object(obj, kind, name):
+    if isinstance(obj, dict):
+        if obj.get("kind") == kind and obj.get("name") == name:
+            return obj
+
+        values = obj.values()
+    elif isinstance(obj, list):
+        values = obj
+    else:
+        return None
+
+    for value in values:
+        result = find_object(value, kind, name)
+        if result is not None:
+            return result
+
+    return None
+
+# api.json with a change applied by edit, written next to the test
+@pytest.fixture
+def edited_api(tmp_path):
+    def edit(change):
+        with open(API_PATH, "r") as api_file:
+            api = json.load(api_file)
+
+        change(api)
+        path = tmp_path / "api.json"
+        path.write_text(json.dumps(api))
+        return str(path)
+
+    return edit
+
+def test_identical_files_exit_0():
+    result = run_diff(API_PATH, API_PATH, "--json")
+
+    assert result.returncode == 0
+    report = json.loads(result.stdout)
+    assert all(len(report[name]) == 0 for name in ("added", "removed", "changed", "moved"))
+
+def test_changed_proc_exits_1(edited_api):
+    def change(api):
+        find_object(api, "proc", "oc_clock_time")["return"]["kind"] = "f32"
+
+    result = run_diff(API_PATH, edited_api(change), "--json")
+
+    assert result.returncode == 1
+    changed = json.loads(result.stdout)["changed"]
+    assert [(entry["name"], entry["new"]) for entry in changed] == [("clock_time", "clock_time :: proc(clock: clock_kind) -> f32")]
+
+def test_removed_proc_exits_1(edited_api):
+    def change(api):
+        module = find_object(api, "module", "Clock")
+        module["contents"] = [node for node in module["contents"] if node.get("name") != "oc_clock_time"]
+
+    result = run_diff(API_PATH, edited_api(change), "--json")
+
+    assert result.returncode == 1
+    assert [entry["name"] for entry in json.loads(result.stdout)["removed"]] == ["clock_time"]
+
+# doc changes are reported as such, but still count as a difference
+def test_doc_change_exits_1(edited_api):
+    def change(api):
+        find_object(api, "enum-constant", "OC_CLOCK_MONOTONIC")["doc"] = "changed"
+
+    result = run_diff(API_PATH, edited_api(change), "--json")
+
+    assert result.returncode == 1
+    changed = json.loads(result.stdout)["changed"]
+    assert [(entry["name"], entry["doc_only"]) for entry in changed] == [("clock_kind", True)]
+
+def test_text_report_exits_1(edited_api):
+    def change(api):
+        find_object(api, "proc", "oc_clock_time")["return"]["kind"] = "f32"
+
+    result = run_diff(API_PATH, edited_api(change))
+
+    assert result.returncode == 1
+    assert "clock_time" in result.stdout
+
+def test_unreadable_files_exit_2(tmp_path):
+    broken = tmp_path / "broken.json"
+    broken.write_text('[{"kind": "module"} {"kind": "module"}]')
+
+    assert run_diff(API_PATH, str(broken)).returncode == 2
+    assert run_diff(API_PATH, str(tmp_path / "missing.json")).returncode == 2
+    assert run_diff(API_PATH).returncode == 2
+
+# well-formed json that isn't shaped like api.json is trouble too, not a difference
+@pytest.mark.parametrize("text", [
+    '[{"name": "x"}]',
+    '[{"kind": "module", "name": "x", "contents": [{"kind": "typename", "name": "oc_x"}]}]',
+    '[{"kind": "module", "name": "x", "contents": [1]}]',
+])
+def test_malformed_api_exits_2(tmp_path, text):
+    malformed = tmp_path / "malformed.json"
+    malformed.write_text(text)
+
+    result = run_diff(API_PATH, str(malformed))
+
+    assert result.returncode == 2
+    assert "malformed api.json" in result.stderr
+    assert "Traceback" not in result.stderr
+
+# unnamed members are keyed by their index among unnamed siblings, not by their position
+def test_inserted_field_keeps_unnamed_members(edited_api):
+    def change(api):
+        fields = find_object(api, "typename", "oc_io_req")["type"]["fields"]
+        fields.insert(0, {"name": "flags", "type": {"kind": "u32"}})
+
+    result = run_diff(API_PATH, edited_api(change), "--json")
+
+    assert result.returncode == 1
+    changed = json.loads(result.stdout)["changed"]
+    assert [entry["name"] for entry in changed] == ["io_req"]
+    assert [(member["change"], member["name"]) for member in changed[0]["members"]] == [("added", "flags")]
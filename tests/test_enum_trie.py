@@ -0,0 +1,66 @@
+import pytest
+
+import gen
+
+# the prefix tables applied one at a time, the longest prefix of the first tier that matches wins
+def reference_simplify(name):
+    for prefixes, base in gen.enum_prefix_tiers:
+        matches = [prefix for prefix in prefixes if name.startswith(prefix)]
+
+        if len(matches) != 0:
+            prefix = max(matches, key=len)
+            return name[len(base if base is not None else prefix):]
+
+    return name
+
+def enum_constant_names(obj, names):
+    if isinstance(obj, dict):
+        if obj.get("kind") == "enum-constant":
+            names.append(obj["name"])
+
+        for value in obj.values():
+            enum_constant_names(value, names)
+    elif isinstance(obj, list):
+        for value in obj:
+            enum_constant_names(value, names)
+
+    return names
+
+def test_every_api_constant_matches_reference(api_desc):
+    names = enum_constant_names(api_desc, [])
+    assert len(names) != 0
+
+    for name in names:
+        assert gen.simplify_enum_name(name) == reference_simplify(name), name
+
+@pytest.mark.parametrize("name, expected", [
+    # fully prefixed names only lose OC_UI_
+    ("OC_UI_ALIGN_X", "ALIGN_X"),
+    ("OC_UI_OVERFLOW_Y_ALLOW", "OVERFLOW_Y_ALLOW"),
+    # specific prefixes win over the broad ones
+    ("OC_UI_FLAG_CLICKABLE", "CLICKABLE"),
+    ("OC_FILE_OPEN_APPEND", "APPEND"),
+    ("OC_IO_ERR_OK", "OK"),
+    # the longest specific prefix wins
+    ("OC_UI_EDIT_MOVE_WORD", "WORD"),
+    ("OC_UI_ALIGN_START", "START"),
+    # broad prefixes are checked last
+    ("OC_FILE_OTHER", "OTHER"),
+    ("OC_IO_OTHER", "OTHER"),
+    # no prefix, or only part of one
+    ("FOO", "FOO"),
+    ("OC_", "OC_"),
+    ("OC_UI", "OC_UI"),
+])
+def test_prefix_priority(name, expected):
+    assert gen.simplify_enum_name(name) == expected
+
+# a prefix in several tables keeps the tier with the highest priority
+def test_duplicate_prefix_keeps_first_tier(monkeypatch):
+    monkeypatch.setattr(gen, "enum_prefix_tiers", [[{"OC_A_B"}, "OC_"], [{"OC_A_B", "OC_A_"}, None]])
+    node = gen.compile_enum_prefixes()
+
+    for char in "OC_A_B":
+        node = node[char]
+
+    assert node[""] == (0, len("OC_"))
@@ -0,0 +1,20 @@
+import pytest
+
+from conftest import API_PATH, every_option
+
+import gen
+
+# rendering in worker processes gives the same bytes as a serial run, with and without a cache
+@pytest.mark.parametrize("split", [False, True])
+@pytest.mark.parametrize("cached", [False, True])
+def test_jobs_output_is_identical(options, tmp_path, split, cached):
+    options.update(every_option)
+    odin_path = str(tmp_path / "orca.odin")
+    expected = gen.generate_files(API_PATH, odin_path, None, 1, split)
+
+    cache = None
+    if cached:
+        cache = gen.ModuleCache(str(tmp_path / "cache.json"), gen.rules_fingerprint(dict(gen.gen_options, split=split)))
+
+    for _ in range(2):
+        assert gen.generate_files(API_PATH, odin_path, cache, 4, split) == expected
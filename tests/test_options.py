@@ -0,0 +1,56 @@
+import os
+import re
+
+import pytest
+
+from conftest import API_PATH, ROOT
+
+import gen
+
+# a declaration each switch adds to the output
+option_declarations = {
+    "transform_helpers": "mat2x3_transform_points :: proc",
+    "canvas_recorder": "canvas_recorder :: struct",
+    "font_cache": "font_cache :: struct",
+    "event_ring": "event_ring :: struct",
+    "file_io": "file_reader :: struct",
+}
+
+def generate_text():
+    odin_path = os.path.join(ROOT, "orca.odin")
+    return gen.generate_files(API_PATH, odin_path, None, 1, False)[odin_path]
+
+# the defaults only generate the foreign bindings, like the committed orca.odin
+def test_default_output_matches_committed(options):
+    with open(os.path.join(ROOT, "orca.odin"), "r", newline="") as odin_file:
+        assert generate_text() == odin_file.read()
+
+def test_defaults_add_nothing(options):
+    text = generate_text()
+
+    for declaration in option_declarations.values():
+        assert declaration not in text
+
+    assert "#force_inline" not in text
+    assert "call_slot :: struct" not in text
+
+@pytest.mark.parametrize("option", sorted(option_declarations))
+def test_option_adds_only_its_subsystem(options, option):
+    options[option] = True
+    text = generate_text()
+
+    for other, declaration in option_declarations.items():
+        assert (declaration in text) == (other == option)
+
+# only the algebra leaf procs are forced inline
+def test_force_inline_only_on_algebra(options):
+    options.update(algebra="simd", input="native", utf8="native")
+    text = generate_text()
+    inlined = re.findall(r"^(\w+) :: #force_inline proc", text, re.MULTILINE)
+
+    assert len(inlined) != 0
+    for name in inlined:
+        assert name in gen.native_algebra_procs or name in gen.native_algebra_simd_procs
+
+    assert "input_process_event :: proc \"contextless\"" in text
+    assert "utf8_decode :: proc \"contextless\"" in text
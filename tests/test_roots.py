@@ -0,0 +1,60 @@
+import pytest
+
+from conftest import API_PATH, every_option, find_module
+
+import gen
+
+# generate the subset of roots next to no hand-written files, so only the roots decide what is kept
+def generate_subset(tmp_path, roots):
+    odin_path = str(tmp_path / "orca.odin")
+    subset = gen.build_subset(API_PATH, odin_path, roots)
+    text = gen.generate_files(API_PATH, odin_path, None, 1, False, subset)[odin_path]
+    return subset, text
+
+def declared_in(text):
+    return set(gen.declaration_names(text))
+
+@pytest.mark.parametrize("enabled", [False, True])
+@pytest.mark.parametrize("roots", [["canvas_render", "move_to"], ["UTF8"], ["oc_event"], ["mat2x3_mul", "rect"]])
+def test_subset_is_closed(options, tmp_path, enabled, roots):
+    if enabled:
+        options.update(every_option)
+
+    subset, text = generate_subset(tmp_path, roots)
+    full = gen.generate_files(API_PATH, str(tmp_path / "orca.odin"), None, 1, False)[str(tmp_path / "orca.odin")]
+    declared = declared_in(text)
+
+    # everything the output uses that the full bindings declare is declared in the output as well
+    missing = (gen.text_identifiers(text) & declared_in(full)) - declared
+    assert missing == set()
+
+    assert len(subset.dropped) != 0
+    assert len(declared) < len(declared_in(full))
+
+def test_roots_are_kept(tmp_path):
+    subset, text = generate_subset(tmp_path, ["canvas_render", "oc_move_to"])
+
+    assert "canvas_render" in subset.kept and "move_to" in subset.kept
+    assert "canvas_renderer" in subset.kept
+    assert "ui_box_draw_proc" in subset.dropped
+    assert "ui_box_draw_proc ::" not in text
+
+def test_module_root_keeps_the_module(tmp_path, api_desc):
+    subset, _ = generate_subset(tmp_path, ["UTF8"])
+    utf8 = find_module(api_desc, "UTF8")
+
+    for proc in utf8.procs:
+        assert proc.name in subset.kept
+
+    assert "utf8_dec" in subset.kept
+
+# the hand-written files next to the output are roots as well
+def test_hand_written_files_are_roots(tmp_path):
+    (tmp_path / "user.odin").write_text("package orca\n\nuse :: proc() {\n\tclock_time(.MONOTONIC)\n}\n")
+    subset, _ = generate_subset(tmp_path, ["vec2"])
+
+    assert "clock_time" in subset.kept and "clock_kind" in subset.kept
+
+def test_unknown_root_is_an_error(tmp_path):
+    with pytest.raises(ValueError):
+        generate_subset(tmp_path, ["no_such_proc"])
@@ -0,0 +1,69 @@
+import io
+import json
+
+import pytest
+
+from conftest import API_PATH
+
+import gen
+
+# a file that remembers how much of it was read
+class CountingFile(io.StringIO):
+    def __init__(self, text):
+        io.StringIO.__init__(self, text)
+        self.read_total = 0
+
+    def read(self, size=-1):
+        chunk = io.StringIO.read(self, size)
+        self.read_total += len(chunk)
+        return chunk
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096, 1 << 16])
+def test_api_json_matches_json_load(chunk_size):
+    with open(API_PATH, "r") as api_file:
+        expected = json.load(api_file)
+
+    with open(API_PATH, "r") as api_file:
+        assert list(gen.iter_api_modules(api_file, chunk_size)) == expected
+
+@pytest.mark.parametrize("text, expected", [
+    ("[]", []),
+    (" \n[ ]\n\n", []),
+    ('[{"a": 1}]', [{"a": 1}]),
+    ('[ {"a": "x,]"} ,\n{"b": [1, 2.5e3, true, null]} ]\r\n', [{"a": "x,]"}, {"b": [1, 2.5e3, True, None]}]),
+])
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 16])
+def test_valid_documents(text, expected, chunk_size):
+    assert list(gen.iter_api_modules(io.StringIO(text), chunk_size)) == expected
+
+@pytest.mark.parametrize("text", [
+    "",
+    "{}",
+    '[{"a": 1}',
+    '[{"a": 1},',
+    '[{"a": 1} {"b": 2}]',
+    '[{"a": 1},, {"b": 2}]',
+    '[{"a": 1},]',
+    '[,{"a": 1}]',
+    '[{"a": 1}] x',
+    '[{"a": 1}][]',
+    '[1]',
+    '[{"a": tru}]',
+    '[{"a": "x}]',
+    '[{"a": 1,}]',
+])
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 16])
+def test_invalid_documents(text, chunk_size):
+    with pytest.raises(ValueError):
+        list(gen.iter_api_modules(io.StringIO(text), chunk_size))
+
+# a syntax error is raised when it is read, not after the rest of the document
+@pytest.mark.parametrize("error", ['{"a": 1} {"b": 2}', '{"a": 1 "b": 2}', '{"a": x}'])
+def test_errors_raise_early(error):
+    text = "[" + error + "," + ",".join(['{"padding": "' + "x" * 100 + '"}'] * 1000) + "]"
+    api_file = CountingFile(text)
+
+    with pytest.raises(ValueError):
+        list(gen.iter_api_modules(api_file, 64))
+
+    assert api_file.read_total < 1000